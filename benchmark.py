@@ -0,0 +1,161 @@
+#Benchmarks for discrete_event.py
+#--------------------------------------------------------------------------------
+# Times populate(), introduce() and run() of each engine for populations of
+# 1e3 to 1e6 agents, varying the mixing rate, the number of diseases, the
+# shape of cpList and the use of campaigns and quarantines. The results are
+# written as JSON and can be compared with a saved baseline:
+#
+#   python benchmark.py --output new.json
+#   python benchmark.py --output new.json --baseline old.json --threshold 0.2
+#
+# The comparison exits with status 1 if a phase of a case got slower than
+# the baseline by more than the threshold (0.2 = 20%).
+import argparse
+import json
+import platform
+import sys
+import time
+import discrete_event as de
+
+# Shapes of cpList: contact probabilities between groups.
+SHAPES = {
+    'single': [[1.0]],                                      # one well mixed group
+    'blocks': [[1.0, 0.1, 0.1], [0.1, 1.0, 0.1], [0.1, 0.1, 1.0]],  # three groups mixing mostly inside
+    'skewed': [[2.0, 0.5], [0.5, 0.2]],                     # a busy group and a quiet one
+}
+
+# Largest population of each engine in the default run (the object and
+# event engines take minutes beyond that).
+LIMITS = {'object': 100000, 'event': 100000, 'numpy': 1000000, 'aggregate': 1000000}
+
+# The cases of the suite: (N, contacts per agent per day, diseases, shape,
+# interventions). m is contacts / N, so the epidemic looks the same at
+# every size.
+def cases(sizes):
+    '''List of the benchmark cases.'''
+    result = []
+    for N in sizes:
+        result.append((N, 2, 1, 'single', False))
+        result.append((N, 10, 1, 'single', False))
+        result.append((N, 2, 3, 'blocks', False))
+        result.append((N, 2, 1, 'skewed', True))
+        result.append((N, 2, 3, 'blocks', True))
+    return(result)
+
+# Name of a case in the results file.
+def caseName(engine, case):
+    '''Key of the case in the results.'''
+    (N, contacts, diseases, shape, interventions) = case
+    return('{} N={} contacts={} diseases={} cp={}{}'.format(engine, N, contacts, diseases, shape,
+                                                              ' interventions' if interventions else ''))
+
+# Runs one case and returns the seconds spent in each phase.
+def runCase(engine, case, days, seed):
+    '''Time the phases of one case.'''
+    (N, contacts, diseases, shape, interventions) = case
+    cpList = SHAPES[shape]
+    times = {}
+    S = de.Simulation(D=days, m=contacts / N, cpList=cpList, engine=engine, seed=seed)
+    # populate
+    start = time.perf_counter()
+    for group in range(len(cpList)):
+        S.populate(N // len(cpList), group, cpList[group])
+    times['populate'] = time.perf_counter() - start
+    # introduce
+    start = time.perf_counter()
+    for k in range(diseases):
+        S.introduce(de.Disease(name='d{}'.format(k), t=0.3, E=2, I=7, r=0.5))
+    times['introduce'] = time.perf_counter() - start
+    # seeds and events
+    start = time.perf_counter()
+    for disease in S.disease:
+        S.seed(disease, 10)
+        if interventions:
+            S.seeding(20, disease, 10)
+            S.quarantine(5, disease, 3)
+            S.campaign(15, disease, 0.5, 0.2)
+    times['seed'] = time.perf_counter() - start
+    # run
+    start = time.perf_counter()
+    S.run()
+    times['run'] = time.perf_counter() - start
+    times['days'] = len(S.history[S.disease[0]])
+    return(times)
+
+# Runs every case of every engine, repeat times, keeping the fastest time
+# of each phase.
+def runSuite(engines, sizes, days=100, repeat=3, seed=1):
+    '''Run the benchmark suite.'''
+    results = {}
+    for engine in engines:
+        for case in cases([ N for N in sizes if N <= LIMITS[engine] ]):
+            name = caseName(engine, case)
+            best = None
+            for r in range(repeat):
+                times = runCase(engine, case, days, seed + r)
+                if best is None:
+                    best = times
+                else:
+                    best = { phase: min(best[phase], times[phase]) if phase != 'days' else times[phase]
+                             for phase in times }
+            results[name] = best
+            print('{:70} {}'.format(name, '  '.join([ '{} {:.3f}s'.format(p, best[p]) for p in best if p != 'days' ])))
+            sys.stdout.flush()
+    return(results)
+
+# Compares the results with a baseline. Phases shorter than floor seconds
+# are too noisy to compare. Returns the list of regressions.
+def compare(results, baseline, threshold=0.2, floor=0.01):
+    '''Phases slower than the baseline by more than threshold.'''
+    regressions = []
+    for (name, times) in results.items():
+        if name not in baseline:
+            continue
+        for phase in ['populate', 'introduce', 'seed', 'run']:
+            old = baseline[name][phase]
+            new = times[phase]
+            if max(old, new) < floor:
+                continue
+            ratio = new / max(old, 1e-9)
+            print('{:70} {:9} {:8.3f}s -> {:8.3f}s  x{:.2f}{}'.format(name, phase, old, new, ratio,
+                                                                     '  REGRESSION' if ratio > 1 + threshold else ''))
+            if ratio > 1 + threshold:
+                regressions.append((name, phase, old, new))
+    return(regressions)
+
+def main(argv=None):
+    '''Command line of the benchmark suite.'''
+    parser = argparse.ArgumentParser(description='Benchmark discrete_event.Simulation.')
+    parser.add_argument('--engines', default='object,numpy,event,aggregate', help='comma separated engines')
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000', help='comma separated population sizes')
+    parser.add_argument('--days', type=int, default=100, help='days of each run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each case, the fastest is kept')
+    parser.add_argument('--output', default='benchmark.json', help='file for the results')
+    parser.add_argument('--baseline', help='results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown counted as a regression')
+    args = parser.parse_args(argv)
+    engines = args.engines.split(',')
+    # the numpy and aggregate engines both need numpy
+    if de.np is None:
+        engines = [ x for x in engines if x not in ['numpy', 'aggregate'] ]
+    results = runSuite(engines, [ int(x) for x in args.sizes.split(',') ], args.days, args.repeat)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'numpy': de.np.__version__ if de.np is not None else None,
+        'days': args.days,
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('{} regressions above {:.0%}'.format(len(regressions), args.threshold))
+            return(1)
+    return(0)
+
+if __name__ == '__main__':
+    sys.exit(main())
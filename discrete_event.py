@@ -1,622 +1,4569 @@
-#Discrete - Event Simulator 
-#Apurva Rajeshbhai Patel
-#Section 0A06
-#--------------------------------------------------------------------------------
-#Importing the random, randint, sample from the random module
-from random import random, randint, sample 
-# Importing the matplotlib library as plt
-import matplotlib.pyplot as plt
-#The os module provides dozens of functions for interacting with the operating system
-import os
-# imports the path
-import os.path
-
-# Function to roll a weighted die.
-#Returns True with probability p.
-# else False.
-def rolldie (p):
-    '''Returns True with probability p.'''
-    return(random() <= p)
-
-# Our infection model is quite simple (see Carrat et al, 2008). People
-# are exposed for E days (the incubation period), then infected for I
-# additional days (the symptomatic period). Individuals are infectious
-# as either E or I.  Carrat et al. (2008) indicate E~2 and I~7 for
-# influenza.
-#
-# Recall status[] starts at E+I and counts down to REC=0.
-#
-# If I=7, E=2:
-#   SUS REC                   I    E+I
-#     |  |                    |     | 
-#    -1  0  1  2  3  4  5  6  7  8  9
-#          |===================||====|
-# If I=7, E=2, Q =3 :
-#   SUS REC         I-Q       I    E+I
-#     |  |           |        |     | 
-#    -1  0  1  2  3  4  5  6  7  8  9
-#          |==========||======||==||====|
-
-# Disease model. Each disease has a name, transmissivity coefficient,
-# recovery coefficient, and exposure and infection times.  
-class Disease():
-    def __init__(self, name='influenza', t=0.95, E=2, I=7, r=0.0): 
-        self.name = name
-        self.t = t         # Transmissivity: how easy is it to pass on?
-        self.E = E         # Length of exposure (in days)
-        self.I = I         # Length of infection (in days)
-        self.r = r         # Probability of lifelong immunity at recovery
-        self.Q = 0         # Q is the number of days in a quarantine
-        
-#Compute the official String Representation of the object 
-    def __repr__(self):
-        '''Official String Representation of the object'''
-        #Returns the representation
-        return('<{}>'.format(self.name))
-
-    # introduce a quarantine time to a disease
-    # where Q cannot be longet than I
-    #If it is than it will become equal to self.I,
-    #Remains same otherwise
-    def quarantine(self, Q):
-        '''Quarantine for the Disease(Property of the Disease)'''
-        # If Q greater than self.I
-        if Q > self.I:
-            #Sets equal to self.I
-            self.Q = self.I
-        #else remains the same 
-        else:
-            self.Q = Q
-
-# Agent model. Each agent has a susceptibility value, a vaccination
-# state, and a counter that is used to model their current E, I, R or
-# S status.
-class Agent():
-    def __init__(self, group, cp):
-        self.s = 0.99            # Susceptibility: how frail is my immune system?
-        self.v = {}              # Vaccination state
-        self.disease = {}        # Creating an empty dictionary so that I can keep track of the disease , that the agent has 
-        self.q = 1.0             # probability of foolowing the quarantine which is set to 1.0(default)
-        self.cp = cp             # list of contact probabilities
-        self.group = group       # identifies the group of the agent
-        self.Qtime= 0            # time in the quarantine
-#Compute the Official String Representation of the object 
-    def __repr__(self):
-        '''Official String Representation of the object'''
-        #returns the representation
-        return('<{} v={} Q-time {}>'.format(self.disease, self.v, self.Qtime))
-
-    # Method to impose a quarantine.
-    #The quarantine is only imposed if the agent 
-    # has the specified quarantined disease and  is in the I state, not already in a quarantine,
-    # and is willing to be quarantined. 
-    def illness(self, disease):
-        '''Imposes quarantine when the agent is diseased and is willing to be quarantine'''
-        # if the time in quarantine is 0 and rolldie is ttrue
-        if self.Qtime== 0  and rolldie(self.q):
-            #Imposes the quarantine by increasing it to 1
-            self.Qtime= disease.Q + 1
-
-    # Return True if infectious (i.e., in I or E state), False
-    # otherwise.
-    def state(self):
-        '''Returns True if agent is infectious.'''
-        # for every disease in the disease dictionary 
-        for i in self.disease:
-            # if the values of that dictionary is greater than 0
-            if self.disease[i] > 0:
-                #return True
-                return(True)
-        #Else return False 
-        return(False)
-
-    # Set the agent's vaccination value of that disease , to whatever value you give.
-    def vaccinate(self, v, disease):
-        '''Models vaccination; v=0 denotes full immunity; v=1 denotes no immunity.'''
-        #Gives Vaccination for that particular Disease
-        self.v[disease] = v
-        
-    # Susceptible: if other is infected, roll the dice and update your
-    # state. No real need to check other.state() here, since it is
-    # checked prior to invoking the method, but it is included as per
-    # spec. Note also that I add 1 to I+E, because my first step in
-    # run() is to update state: your code may differ. Finally, it's
-    # important to "remember" which disease you have so that you can
-    # handle recovery and susceptibility correctly when the disease
-    # finally runs its course.
-    def infect(self, other, disease):
-        '''Other tries to infects self with disease.'''
-        # Checks the agent is not in Quarantine and also checks that that person is infected , self is susceptible, rolldie to see whether the disease is infected 
-        if other.Qtime == 0 and other.disease[disease] > 0 and self.disease[disease] == -1 and rolldie(self.s*self.v[disease]*disease.t*self.cp[other.group]):
-            #Infects with the disease 
-            self.disease[disease] = disease.I + disease.E + 1
-            #return True if done
-            return(True)
-        #Else False 
-        return(False)
-
-    # Update the status of the agent. This involves decrementing your
-    # internal counter if you are actively infected. When you get to
-    # 0, you need to flip a (weighted) coin to decide if the agent
-    # goes to state R (c=0) or back to state S (c=-1). Also, we need to
-    # count down the quarantine if one is imposed. Finally, if an agent goes
-    # into the Infected state, see if he will follow the quarantine (if one
-    # been imposed)
-    def update(self):
-        '''Daily status update.'''
-        # for the disease in disease dictionary
-        for disease in self.disease:
-            # if it is equal to 1 
-            if self.disease[disease] == 1:
-                # if it's False
-                if not rolldie(disease.r):
-                    # Revert to susceptible, c=-1.
-                    self.disease[disease] = -1
-                #Else
-                else:
-                    # recovery, c=0.
-                    self.disease[disease] = 0
-            #if the c is greater than 1
-            if self.disease[disease] > 1:
-                # One day closer to recovery.
-                self.disease[disease] = self.disease[disease] - 1
-            # if C is equal to I and Q is greater than 0
-            if self.disease[disease] == disease.I and disease.Q > 0:
-                    #Goes to illness and work accordingly 
-                    self.illness(disease)
-            #if the time in quarantine is greater than 0
-            if self.Qtime> 0:
-                    # Bring near to exit the quarantine
-                    self.Qtime= self.Qtime- 1
-   
-    
-            
-
-# Simulation model. Each simulation runs for at most a certain
-# duration, D, expressed in terms of days.
-class Simulation():
-    '''Simulation should run for the D Days'''
-    def __init__(self, D=500, m=0.001, cpList= [[1.0]]):
-        self.steps = D		    # Maximum Number of Days 
-        self.agents = []            # List of agents in the simulation
-        self.disease = []           # Disease being simulated
-        self.history = {}           # History of (E, I, S, Q) tuples
-        self.eventQ = []            # information of the quarantine (time, disease, Q)
-        self.eventCamp = []         # information of the campaign (time, disease, coverage, v)
-        self.history2 = []          # information of the seed
-        self.cpList = cpList        # list of the cp
-        self.m = m                  # mixing coefficient
-        self.dName ={}              # Creating the dictionary ,containing the name of the disease ,
-                                    #which will help calling the disease in the simulate as well as in the configuration method
-
-    #Populates method Simulates with a certain number of agents in each group
-    #having a list of contact probablities(cp), compliance probability q and
-    #susceptibility(S)
-    def populate(self, numGroup, group, cp):
-        '''Populate simulation with n agents of each group, with specified q and s.'''
-        #for i in the range of number of groups 
-        for i in range(numGroup):
-            # uses the join method to append the following information into the self.agent List 
-            self.join(Agent(group=group, cp=self.cpList[group]))
-
-
-    # Add agent to current simulation.
-    def join(self, agent):
-        '''Add specified agent to current simulation.'''
-        #Appends the following agent to the self.agent list 
-        self.agents.append(agent)
-        
-    # Compute the Official String Representation of the object
-    def __repr__(self):
-        '''Official String Representation of the Object'''
-        #Returns the representation
-        return("< simulation lasting {} days >".format(self.steps))
-
-    # Fumction that removes the agent if there are no disease left in the 
-    # Simulation 
-    def getOut(self):
-       '''Removes the agent if there are no disease left in the Simulation '''
-       # setting a value of i equal to 0 
-       i = 0
-       # for every disease in my self.disease list
-       for x in self.disease:
-           # if that disease in my history dictionary is having the value of tuple (0,0)
-           if self.history[x][-1][:2] == (0,0):
-               # increment the value of i by 1
-               i = i + 1
-       # if the i is equal to the length of self.disease list 
-       if i == len(self.disease):
-           # return true  else
-            return(True)
-       #false otherwise
-       return(False)
-
-    # Adds multiple disease in the simulation
-    # BY providing condition and vaccine state for each agentin the Simulation
-    # moreover creates the value of the dictionary for disease() having an empty list of the history which will be filled further in codes
-    def introduce(self, disease):
-        '''Add specified disease to current simulation.'''
-        # goes to the list of disease which was empty in the constructor
-        self.disease.append(disease)
-        # dictionary with disease name having the key == disease.name will have the value of the information of disease
-        self.dName[disease.name] = disease
-        #For the particular disease the value of that disease is equal to empty list which will be filled further in the codes 
-        self.history[disease]=[]
-        # for every agent in the self.agent List 
-        for agent in self.agents:
-            #Providing the condition
-            agent.disease[disease] = -1
-            #Providing the vaccination state
-            agent.v[disease] = 1.0
-            
-
-    # Seed the simulation with k agents having the specified disease.
-    def seed(self, disease, k=1):
-        '''Seed a certain number of agents with a particular disease.'''
-        # Add the disease to the simulation.
-        # self.introduce(disease)
-        # update() runs before the infect() method, I+E+1,
-        #because my first step in run() is to update state
-        #Also, remember what disease you have
-        # for the agent in the sample(list, number of agent you want)
-        for agent in sample(self.agents, k):
-            #for the agent.disease dictionary of that disease --> infects by I+E+1
-            agent.disease[disease] = disease.I + disease.E + 1
-
-    # add a tuple with the particular information of campaign 
-    def campaign(self, time, disease, coverage, v):
-        # adds to the list of eventCamp
-        self.eventCamp.append((time, disease, coverage, v))
-
-    # add a tuple with the quarantine information 
-    def quarantine(self, time, disease, Q):
-        # adds to the list of eventQ
-        self.eventQ.append((time, disease, Q))
-
-    # add a tuple with seeding information 
-    def seeding(self, time, disease, number):
-        # adds the tuple to history2 List
-        self.history2.append((time, disease, number))
-
-    # This is where the simulation actually happens. The run() method
-    # performs at most self.steps iterations, where each iteration
-    # updates the agents, counts how many are in E and I states,
-    # checks if there is an early termination (i.e., no contagious
-    # agents left) and then is vaccination campaigns or quarantines have been
-    # issued then they go into affect on the specified day. 
-    def run(self):
-        '''Run the simulation.'''
-        i = 0
-        while i < self.steps:
-            # Update each agent, counting how many are still exposed
-            # or infected.  Finding infected agents first avoids
-            # letting the infection infect a friend's friend in one
-            # pass.
-            # Creating for the people who are contagious with some disease 
-            contagious = [ a for a in self.agents if a.state() ]
-            # creating for the people who are healthy with no disease 
-            healthy = [ a for a in self.agents if not a.state() ]
-            # for the contagious people updating there status 
-            for a in contagious:
-                # updated the status
-                a.update()
-            # if there is a quarantine run,
-            # see if every agent will go into quarantine by calling the illness method
-            # so , if the len of the history2 list is greater than 0
-            if len(self.history2) > 0:
-                # for j in the range of the len of the history2 list 
-                for j in range(len(self.history2)):
-                    # seed days == to value at the 0th place of  the history2[j]
-                    sdDay = self.history2[j][0]
-                    # seed disease == to the value at the 1st place of the history2[j]
-                    sdDisease = self.history2[j][1]
-                    # number of times goes to seed == to the value at the 2nd place of the history2[j]
-                    sdNum = self.history2[j][2]
-                    # if the value of i is equal to the number of days in the seed 
-                    if i == sdDay:
-                        #goes to the seed method having the parameter equal to disease in seed and num in seed
-                        self.seed(sdDisease, sdNum)
-            # if the length of the eventQ list is greater than 0
-            if len(self.eventQ) > 0:
-                # multiple quarantines can be issued
-                #  run through the list of tuples in the self.eventQ
-                # for j in the range of len of the self.eventQ List 
-                for j in range(len(self.eventQ)):
-                    # quarantine days is equal to the value at the 0th place of self.eventQ[j]
-                    quarDay = self.eventQ[j][0]
-                    # quarantine days is equal to the value at the 1st place of self.eventsQ[j]
-                    quarDisease = self.eventQ[j][1]
-                    # quarantine days is eqaul to the value at the 2nd place of self.eventsQ[j]
-                    quarLen = self.eventQ[j][2]
-                    # if today is the the quarantine event then rolldie on the contagious list
-                    # to see if they follow a quarantine
-                    if i == quarDay:
-                        quarDisease.quarantine(quarLen)
-            #if there is a campaign,
-            #run the vaccine method for the list
-            #of healthy agents with the probability  of coverage
-            #Coverage here means  is the probability with which I vaccinate any given agent.
-            #So if a vaccination campaign is in force with coverage=0.8 and vaccine effectiveness v=0.2,
-            #I will consider each agent, flip a weighted coin that comes up True 80% of the time,
-            #and if its True this time, I will set that agents internal v value to be 1-0.2=0.8
-            # So if the len of the eventCamp list is greater than 0
-            if len(self.eventCamp) > 0:
-                # multiple campaigns can be issued 
-                # run through the list of tuples in the self.eventCamp
-                # for j in the range of the len of eventCamp List
-                for j in range(len(self.eventCamp)):
-                    # Campaign Day is equal to the value at the 0th place of the self.eventCamp[j]
-                    campDay = self.eventCamp[j][0]
-                    # Campaign Disease is equal to the value at the 1th place of the self.eventCamp[j]
-                    campDisease = self.eventCamp[j][1]
-                    # Campaign Coverage is equal to the value at the 2th place of the self.eventCamp[j]
-                    campCoverage = self.eventCamp[j][2]
-                    # Campaign Vaccine is equal to the value at the 3th place of the self.eventCamp[j]
-                    campVaccine = self.eventCamp[j][3]
-                    # if today is the campaign day then rolldie , so that
-                    # I can know if a healthy agent will
-                    # recieve the vaccine or not
-                    # So if i is equal to CampDay
-                    if i == campDay:
-                        # for every agent in the healty which is mentioned above 
-                        for agent in healthy:
-                            # roll the die with the coverage of campaign as a parameter
-                                if rolldie(campCoverage):
-                                    # if rolldie is True vaccinate the agent with that particular disease 
-                                    agent.vaccinate(campVaccine, campDisease)
-            # Update the history with exposed and infected counts.
-            # create a dict for each disease and add the number of E, I, Susceptible, and Quarantined
-            # note that S is represented by the sum of the vaccine values in the healthy list
-            # for every disease in the self.disease dictionary
-            for disease in self.disease:
-                # for that disease key -- value ( append to the value to that list with the particula information)which contains the tuple of
-                # number of infected days , exposed days , vaccination for that disease , condition.
-                self.history[disease].append((len([ a for a in contagious if a.disease[disease] > disease.I ]),
-                                              len([ a for a in contagious if a.disease[disease] <= disease.I ]),
-                                              sum([ a.v[disease] for a in self.agents]),
-                                              len([ a for a in contagious if a.Qtime > 0 and a.disease[disease] <= disease.I])))
-            #Exit early if there are no infected agents left.
-            # if the guy terminate and the value of i is greater than maximum value of time step
-            if self.getOut() and i > max([x[0] for x in self.history2]):
-                #return my history list having the tuple(I,E,S,Q)
-                return(self.history)
-            # if it terminate early it won't get into the next step but if it doesn't then the following things.
-            # for agent in the contagious 
-            for a1 in contagious:
-                # Let's see who a1 can infect. No need to check
-                # a2.state() here, as a2.infect() will check it for
-                # you. Note the use of the mixing parameter to
-                # determine if a1 and a2 have been in contact with
-                # each other today. Also, allow all diseases a chance to
-                # infect self
-                # only change in project 2 is to allow an agent to infect their neighbor with all disease
-                # they have (run through the dict of diseases)
-                # for agent is self.agents 
-                for a2 in self.agents:
-                    # checks if the agents came into contact
-                    if rolldie(self.m):
-                        #if True , means aget came in contact
-                        # for disease in self.disease 
-                        for k in self.disease:
-                            #agent k infects agent a1
-                            a2.infect(a1, k)
-            #incrementing the value of i by 1
-            i = i + 1
-        # Return the history of (E, I,S,Q) tuples.
-        #return([self.history[disease] for disease in self.history])
-
-    # Plots the Graph
-    def plot(self, disease):
-        '''Produce a pandemic curve for the simulation.'''
-        #Title of the plot
-        plt.title(disease.name)
-        #x - axis label
-        plt.xlabel('Days')
-        #y - axis label 
-        plt.ylabel('N')
-        # plotting for the expose
-        plt.plot( [ i for i in range(len(self.history[disease])) ], [ e for (e, i, s, q) in self.history[disease] ], 'g-', label='Exposed' )
-        # plotting for infected
-        plt.plot( [ i for i in range(len(self.history[disease])) ], [ i for (e, i, s, q) in self.history[disease] ], 'r-', label='Infected' )
-        # plotting for susceptible
-        plt.plot( [ i for i in range(len(self.history[disease])) ], [ s for (e, i, s, q) in self.history[disease] ], 'b-', label='Susceptible' )
-        # plotting for quarantine
-        plt.plot( [ i for i in range(len(self.history[disease])) ], [ q for (e, i, s, q) in self.history[disease] ], 'y-', label='Quarantine' )
-        # plt.legend will make a block of information at upper right conner of the graph providing information about the plotting pandamic curve
-        plt.legend(['Exposed','Infected','Susceptible','Quarantine'],loc = 'upper right')
-        # show the graph
-        plt.show()
-    #Config method opens the file and reads the file in the simulation (like the Simulate top level Function)
-    def config(self,filename):
-        '''Takes the input from the file and run accordingly'''
-        if not os.path.isfile(filename) and not os.access(filename, os.R_OK):
-            print ("Either {} is missing or is not readable".format(filename))
-        else:          
-            # opens the file and read it ('r' indicates reading)
-            file=open(filename, 'r')
-            # for every line in file
-            for lines in file:
-                # lowering the lines and splitting it which will give a list of splitted input commands
-                A = lines.lower().split()
-                # if the  first word of the line  is equal to add
-                if A[0] =='add':
-                    # call the populate function
-                    self.populate(eval(A[1]), eval(A[2]), self.cpList[eval(A[2])])
-                    # String representation
-                    print("{} agents of group {} having cp of {}".format(A[1],A[2],self.cpList[eval(A[2])]))
-                # if its equal to disease 
-                elif A[0] == 'disease':
-                    # call the introduce function
-                    self.introduce(Disease(name=eval("A[1]"), t=eval(A[2]), E=eval(A[3]), I=eval(A[4]), r=eval(A[5])))
-                    # String representation 
-                    print("introduce {} with transitivity {},  {} exposed days, {} infected days and having recovery {}".format(A[1],A[2],A[3],A[4],A[5]))                    
-                # if its equal to the seed
-                elif A[0] == 'seed':
-                    #calls the seed method
-                    self.seeding(eval(A[1]), self.dName[eval("A[2]")], eval(A[3]))
-                    # String representation
-                    print("Day {} : seeding {} agents with {}".format(A[1],A[3],self.dName[eval("A[2]")]))
-                # if its equal to the quarantine
-                elif A[0] == 'quarantine':
-                    #calls the quarantitne method
-                    self.quarantine(eval(A[1]), self.dName[eval("A[2]")], eval(A[3]))
-                    #String representation
-                    print("{}: Establishing {} agents with {}".format(A[1],A[3],self.dName[eval("A[2]")]))
-                # if its equal to campaign
-                elif A[0] == 'campaign':
-                    #calls the campaign method
-                    self.campaign(eval(A[1]), self.dName[eval("A[2]")], eval(A[3]), eval(A[4]))
-                    #String Representation 
-                    print("Day {} : {}  of uninfected agents by {} will be vaccinated with effectiveness {}".format(A[1],A[3] , self.dName[eval("A[2]")], A[4])) 
-                    # if its equal to run
-                elif A[0] == 'run':
-                    # runs the code
-                    self.run()
-                    #String representation
-                    print("{} the Simulation ".format(A[0]))
-                # print(a.history)(for debugging the codes)
-                # if its equal to plot
-                elif A[0] == 'plot':
-                    # plots the graph
-                    self.plot(self.dName[eval("A[1]")])
-                    #String representation
-                    print("plot graph for {}".format(self.dName[eval("A[1]")]))
-                else:
-                    # prints an error if the commands provided by the user is not correct 
-                    print("Error , Please! enter a valid commands in the File")
-        
-
-
-# Creating a test Function to check the codes at a certain point 
-def test():
-    '''Test the codes'''
-    # Creating the Simulation object
-    S=Simulation(D=1000)
-    # setting the value of mixing probability
-    S.m = 0.001
-    # creating a contact probability List
-    S.cpList = [[.5,0,0],[0,.5,0],[0,1,1]]
-    # Calling the populate for every agent type with its cp
-    S.populate(100, 0, S.cpList[0])
-    S.populate(100, 1, S.cpList[1])
-    S.populate(100, 2, S.cpList[2])
-    # creating the disease object
-    x=Disease(name = "influenza",t=.95, E=2, I = 7, r=.2)
-    #creating another disease object
-    y=Disease(name = "mumps")
-    # calling the introduce method on x object of the disease
-    S.introduce(x)
-    #calling the introduce method on y object of the disease
-    S.introduce(y)
-    #calling the seeding method x
-    S.seeding(10,x, 1)
-    #calling the seeding method for y
-    S.seeding(40,y,1)
-    #Calling the campaign method
-    S.campaign(20, x, .9, .1)
-    #Calling the quarantine method 
-    S.quarantine(0, y, 5)
-    #calling my seed method on x
-    S.seed(x,1)
-    #calling my seed method on y 
-    S.seed(y,1)
-    #runs the codes 
-    S.run()
-    #plot for x 
-    S.plot(x)
-    # Plot for y 
-    S.plot(y)
-    #returns Simulation object
-    return(S)
-
-def Simulate():
-    '''Takes input from user and implement the codes  accordingly'''
-    #setting a variable equal to True 
-    B = True
-    #This step will iterate till the user inputs "Bye"
-    #Thus creating a While loop
-    while B == True:
-        # Creating the input command 
-        C = input('Sim> ')
-        # if the user doesn't provide an command in the input 
-        if C == '' :
-            # it will print the following message 
-            print("Please, try again by putting a valid command , Thank you :)".format())
-        #Else it will work according to the commands provided by the user
-        else:
-            # Splitting whatever the user puts the input and converting all the string values in the lower case
-            #so that even if the user says "QUARANTINE" i can implement it as quarantine
-            A = C.lower().split()
-            # if the first element in the list is new 
-            if A[0] == 'new':
-                # Creating an object for simulation
-                S=Simulation(eval(A[1]))
-                # mixing probability
-                S.m = eval(A[2])
-                # contact probability 
-                S.cpList = eval(A[3])
-                # prints the format with the new days assigned 
-                print('Simulation with {} days, {} mixing probability, {} contact probability(cp) list'.format(A[1],A[2],A[3]))
-            # if the firt element is add
-            elif A[0] =='add':
-                # calling the populate method of the simulation 
-                S.populate(eval(A[1]), eval(A[2]), S.cpList[eval(A[2])])
-                print("Simulation with {} agents of group {} having contact probability  at position {} of cpList".format(A[1],A[2],A[2]))
-            # if the first element is disease
-            elif A[0] == 'disease':
-                # calling the introduce method of the Simulation
-                S.introduce(Disease(name=A[1], t=eval(A[2]), E=eval(A[3]), I=eval(A[4]), r=eval(A[5])))
-                # String representation 
-                print("introduce {} with transitivity {}, {} exposed days,  {} infected days and having recovery {}".format(A[1],A[2],A[3],A[4],A[5]))  
-            # if the first element is seed
-            elif A[0] == 'seed':
-                #a = self.dName[eval("A[2]")]
-                #calling my seeding method
-                S.seeding(eval(A[1]), S.dName[A[2]], eval(A[3]))
-                # String representation
-                print("Day {} : seeding {} agents with {}".format(A[1],A[3],A[2]))
-            # if the first element is quarantine
-            elif A[0] == 'quarantine':
-                #calling the quarantine method of the simulation 
-                S.quarantine(eval(A[1]),S.dName[A[2]], eval(A[3]))
-                #String representation
-                print("{}: Establishing {} agents with {}".format(A[1],A[3],A[2]))
-            # if the first element is campaign
-            elif A[0] == 'campaign':
-                #calling the campaign method of the simulation                
-                S.campaign(eval(A[1]), S.dName[A[2]], eval(A[3]), eval(A[4]))
-                #String Representation 
-                print("Day {} : {}  of uninfected agents by {} will be vaccinated with effectiveness {}".format(A[1],A[3] , A[2], A[4]))
-            # if the first element is run 
-            elif A[0] == 'run':
-                #runs the simuation 
-                S.run()
-                #String representation
-                print("{} the Simulation ".format(A[0]))
-                #print(a.history)( for debugging my codes)
-            # if the first element is plot
-            elif A[0] == 'plot':
-                # plot the graph
-                S.plot(S.dName[A[1]])
-                #String representation
-                print("plot graph for {}".format(A[1]))
-            # if the first element is bye 
-            elif A[0] == 'bye':
-                #String representation
-                print('Good{}! See you again . Have a great Day!, My Friend!'.format(A[0]))
-                # return the history of the simulation
-                return(S.history)              
-                
-                # set the value of B = False when the user says bye so that it stops iterating
-                B = False
-            # else ,if the user doesnt input a valid command 
-            else:
-                # print this statement 
-                print("Oh! No! ,It's an error, My Friend!"
-                      "Please! print a valid command".format())
-
-
-        
-    
-
-
+#Discrete - Event Simulator 
+#Apurva Rajeshbhai Patel
+#Section 0A06
+#--------------------------------------------------------------------------------
+#Importing Random from the random module (every draw comes from the
+#random stream of a simulation)
+from random import Random
+# matplotlib is only imported by the plotting code, see pyplot()
+#The os module provides dozens of functions for interacting with the operating system
+import os
+# imports the path
+import os.path
+import sys
+# log is used to skip ahead to the next contact (geometric distribution)
+from math import log, isfinite
+# heapq keeps the calendar of the event engine sorted by day
+from heapq import heappush, heappop
+# compact per-agent disease state
+from array import array
+# the ensemble runs replicates in worker processes
+import pickle
+from hashlib import sha256
+from concurrent.futures import ProcessPoolExecutor
+# the parallel numpy engine keeps its arrays in shared memory, the regions
+# of a metapopulation run in processes of their own
+from multiprocessing import shared_memory, Process, Pipe
+# confidence intervals of compare()
+from statistics import NormalDist
+# checkpoints are compressed pickles, forks are copies
+import zlib
+import copy
+# scenarios of a sweep are hashed from their JSON form
+import json
+from itertools import product
+# the numbers of the configuration files are read as literals, see parseCommand()
+import ast
+# command line, see main()
+import argparse
+# the history can be streamed to a binary file and read back with mmap
+import struct
+import mmap
+# population tables can be CSV files
+import csv
+# wall time of the phases of a day, see Profile
+from time import perf_counter
+# the background shell runs the simulations in threads, see Shell
+import asyncio
+import threading
+# numpy is optional: it is only needed by the vectorized engine (engine="numpy")
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# matplotlib.pyplot, imported the first time something is plotted (the
+# simulation itself and the worker processes never need it). Without a
+# display the Agg backend is used, which can only write files.
+plt = None
+
+def pyplot():
+    '''matplotlib.pyplot, imported on first use.'''
+    global plt
+    if plt is None:
+        import matplotlib
+        if os.name == 'posix' and sys.platform != 'darwin' and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            matplotlib.use('Agg')
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return(plt)
+
+# Random stream counting its random() calls (every die roll, and every
+# skip ahead of contacts()), used while a Simulation is profiled.
+class CountingRandom(Random):
+    def __init__(self, seed=None):
+        self.draws = 0
+        Random.__init__(self, seed)
+
+    def random(self):
+        '''Next number of the stream, counted.'''
+        self.draws = self.draws + 1
+        return(Random.random(self))
+
+    # Defined too so that sample() and randint() keep drawing the same
+    # numbers as a plain Random (it only uses random() when a subclass
+    # replaces random() but not getrandbits()).
+    def getrandbits(self, k):
+        '''k random bits, not counted.'''
+        return(Random.getrandbits(self, k))
+
+# Statistics of a profiled run (see Simulation.profile()): the wall time of
+# each phase of the day and the counts of random draws, contacts and
+# infections, for the current day (today) and the whole run (total), and
+# the largest number of contagious agents at the start of a day (peak).
+# After every day, callback(day, today) is called when given.
+class Profile():
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.today = {}             # {phase: seconds, count: n} of the current day
+        self.total = {}             # the same summed over the days
+        self.days = 0               # days profiled
+        self.peak = 0               # largest contagious set
+        self.clock = perf_counter()
+        self.draws = 0              # draws of the random stream at the start of the day
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<profile of {} days: {}>'.format(self.days, ', '.join([ '{} {:.3g}'.format(k, x) for (k, x) in sorted(self.total.items()) ])))
+
+    # The callback is not pickled with a checkpoint.
+    def __getstate__(self):
+        '''State of the profile, without the callback.'''
+        state = self.__dict__.copy()
+        state['callback'] = None
+        return(state)
+
+    # Starts a day: the time from now on is charged to its phases.
+    def begin(self, rng):
+        '''Start profiling a day.'''
+        self.today = {}
+        self.draws = getattr(rng, 'draws', 0)
+        self.clock = perf_counter()
+
+    # Number of agents contagious at the start of the day.
+    def contagious(self, n):
+        '''Record the size of the contagious set.'''
+        self.today['contagious'] = n
+        self.peak = max(self.peak, n)
+
+    # Charges the time since the last lap to the phase.
+    def lap(self, phase):
+        '''End a phase of the day.'''
+        now = perf_counter()
+        self.today[phase] = self.today.get(phase, 0.0) + now - self.clock
+        self.clock = now
+
+    # Adds n to a count of the day.
+    def count(self, name, n=1):
+        '''Count n contacts, infections, ...'''
+        self.today[name] = self.today.get(name, 0) + n
+
+    # Ends the day: adds it to the total and hands it to the callback.
+    def end(self, day, rng):
+        '''Finish profiling day.'''
+        self.today['draws'] = getattr(rng, 'draws', 0) - self.draws
+        for (name, x) in self.today.items():
+            if name != 'contagious':
+                self.total[name] = self.total.get(name, 0) + x
+        self.days = self.days + 1
+        if self.callback is not None:
+            self.callback(day, self.today)
+
+# Function to roll a weighted die.
+#Returns True with probability p.
+# else False.
+# rng is the random stream (random.Random) of a simulation.
+def rolldie (p, rng):
+    '''Returns True with probability p.'''
+    return(rng.random() <= p)
+
+# Seed of the i-th random stream derived from seed base. Hashing (base, i)
+# gives streams that don't overlap, whatever the seeds.
+def streamSeed(base, i):
+    '''Seed of random stream i of base.'''
+    return(int.from_bytes(sha256('{}:{}'.format(base, i).encode()).digest()[:8], 'big'))
+
+# Poisson random number of mean lam (Knuth's product of uniforms, or the
+# normal approximation for big means).
+def poisson(lam, rng):
+    '''Poisson distributed random number.'''
+    if lam <= 0:
+        return(0)
+    if lam > 30:
+        return(max(0, int(round(rng.gauss(lam, lam ** 0.5)))))
+    (k, p, limit) = (0, rng.random(), 2.718281828459045 ** -lam)
+    while p > limit:
+        k = k + 1
+        p = p * rng.random()
+    return(k)
+
+# Binomial random number of n trials of probability p, by skipping from
+# one success to the next (geometric gaps, as in Simulation.contacts()):
+# the cost is proportional to the number of successes.
+def binomial(n, p, rng):
+    '''Binomially distributed random number.'''
+    if p <= 0 or n <= 0:
+        return(0)
+    if p >= 1:
+        return(n)
+    if p > 0.5:
+        return(n - binomial(n, 1 - p, rng))
+    skip = log(1.0 - p)
+    (k, j) = (0, int(log(1.0 - rng.random()) / skip))
+    while j < n:
+        k = k + 1
+        j = j + 1 + int(log(1.0 - rng.random()) / skip)
+    return(k)
+
+# k different positions, in random order, among 0 to n-1 for which busy(j)
+# is False (free of them). They are drawn at random and redrawn when busy
+# or already drawn, so the cost is proportional to k, unless k is most of
+# the free positions: those are then listed and sampled.
+def pickFree(n, free, k, busy, rng):
+    '''k random positions that are not busy.'''
+    if 2 * k > free:
+        return(rng.sample([ j for j in range(n) if not busy(j) ], k))
+    picked = []
+    seen = set()
+    while len(picked) < k:
+        j = rng.randrange(n)
+        if j not in seen and not busy(j):
+            seen.add(j)
+            picked.append(j)
+    return(picked)
+
+# Our infection model is quite simple (see Carrat et al, 2008). People
+# are exposed for E days (the incubation period), then infected for I
+# additional days (the symptomatic period). Individuals are infectious
+# as either E or I.  Carrat et al. (2008) indicate E~2 and I~7 for
+# influenza.
+#
+# Recall status[] starts at E+I and counts down to REC=0.
+#
+# If I=7, E=2:
+#   SUS REC                   I    E+I
+#     |  |                    |     | 
+#    -1  0  1  2  3  4  5  6  7  8  9
+#          |===================||====|
+# If I=7, E=2, Q =3 :
+#   SUS REC         I-Q       I    E+I
+#     |  |           |        |     | 
+#    -1  0  1  2  3  4  5  6  7  8  9
+#          |==========||======||==||====|
+
+# Disease model. Each disease has a name, transmissivity coefficient,
+# recovery coefficient, and exposure and infection times.  
+class Disease():
+    def __init__(self, name='influenza', t=0.95, E=2, I=7, r=0.0): 
+        self.name = name
+        self.t = t         # Transmissivity: how easy is it to pass on?
+        self.E = E         # Length of exposure (in days)
+        self.I = I         # Length of infection (in days)
+        self.r = r         # Probability of lifelong immunity at recovery
+        self.Q = 0         # Q is the number of days in a quarantine
+        self.id = None     # position in Simulation.disease, set by Simulation.introduce()
+        
+#Compute the official String Representation of the object 
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        #Returns the representation
+        return('<{}>'.format(self.name))
+
+    # introduce a quarantine time to a disease
+    # where Q cannot be longet than I
+    #If it is than it will become equal to self.I,
+    #Remains same otherwise
+    def quarantine(self, Q):
+        '''Quarantine for the Disease(Property of the Disease)'''
+        # If Q greater than self.I
+        if Q > self.I:
+            #Sets equal to self.I
+            self.Q = self.I
+        #else remains the same 
+        else:
+            self.Q = Q
+
+# Running (E, I, S, Q) counts of every disease, kept up to date by the
+# Agent methods as the agents change state, so that run() can record the
+# history of a day in O(diseases) instead of counting all the agents:
+#
+#   E   agents with counter c > I
+#   I   agents with 0 < c <= I
+#   S   sum of the vaccination values
+#   Q   agents in quarantine (Qtime > 0) counted in I
+#
+# With byGroup the same counts are also kept for each group of agents.
+class Tally():
+    E, I, S, Q = 0, 1, 2, 3         # position of each count in the tuple
+
+    def __init__(self, byGroup=False):
+        self.byGroup = byGroup
+        self.count = {}             # [E, I, S, Q] of each disease
+        self.groups = {}            # {group: [E, I, S, Q]} of each disease
+        # indexes of the agents, kept by Agent.recount() and recountQ(); the
+        # dicts are used as sets that remember the order agents were added
+        self.carriers = {}          # {agent: None} of the agents in E or I of each disease
+        self.contagious = {}        # {agent: number of diseases it is in E or I for}
+        self.quarantined = {}       # {agent: id of the disease that put it there} of the agents in quarantine
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<tally {}>'.format(self.count))
+
+    # Starts counting a new disease.
+    def introduce(self, disease):
+        '''Add a disease, with every count at 0.'''
+        self.count[disease] = [0, 0, 0.0, 0]
+        self.groups[disease] = {}
+        self.carriers[disease] = {}
+
+    # Adds n to one of the counts of a disease, for an agent of group.
+    def add(self, disease, group, slot, n):
+        '''Add n to count slot of the disease.'''
+        self.count[disease][slot] = self.count[disease][slot] + n
+        if self.byGroup:
+            if group not in self.groups[disease]:
+                self.groups[disease][group] = [0, 0, 0.0, 0]
+            self.groups[disease][group][slot] = self.groups[disease][group][slot] + n
+
+    # The agent starts (n=1) or stops (n=-1) carrying the disease.
+    def carry(self, agent, disease, n):
+        '''Add the agent to the carriers of the disease, or remove it.'''
+        if n > 0:
+            self.carriers[disease][agent] = None
+            self.contagious[agent] = self.contagious.get(agent, 0) + 1
+        else:
+            del self.carriers[disease][agent]
+            if self.contagious[agent] == 1:
+                del self.contagious[agent]
+            else:
+                self.contagious[agent] = self.contagious[agent] - 1
+
+    # Which count (E or I) an agent with counter c is in, None if neither.
+    def slot(self, c, disease):
+        '''E, I or None for counter c of the disease.'''
+        if c > disease.I:
+            return(self.E)
+        if c > 0:
+            return(self.I)
+        return(None)
+
+    # (E, I, S, Q) tuple of the disease, as stored in Simulation.history.
+    def row(self, disease):
+        '''Current (E, I, S, Q) of the disease.'''
+        return(tuple(self.count[disease]))
+
+    # {group: (E, I, S, Q)} of the disease, as stored in Simulation.groupHistory.
+    def rowGroups(self, disease):
+        '''Current (E, I, S, Q) of each group for the disease.'''
+        return({ group: tuple(c) for (group, c) in self.groups[disease].items() })
+
+# Agent model. Each agent has a susceptibility value, a vaccination
+# state, and a counter that is used to model their current E, I, R or
+# S status.
+# There can be millions of agents, so they have no __dict__ (__slots__) and
+# keep the counter and vaccination state of each disease in two small
+# arrays, indexed by the id the disease got in Simulation.introduce():
+# agent.disease[disease.id] is the counter, agent.v[disease.id] the
+# vaccination state.
+class Agent():
+    __slots__ = ('s', 'v', 'disease', 'q', 'cp', 'group', 'Qtime', 'tally', 'diseases')
+
+    def __init__(self, group, cp):
+        self.s = 0.99            # Susceptibility: how frail is my immune system?
+        self.v = array('d')      # Vaccination state of each disease
+        self.disease = array('i')# Counter of each disease, so that I can keep track of the disease , that the agent has 
+        self.q = 1.0             # probability of foolowing the quarantine which is set to 1.0(default)
+        self.cp = cp             # list of contact probabilities
+        self.group = group       # identifies the group of the agent
+        self.Qtime= 0            # time in the quarantine
+        self.tally = None        # Tally of the simulation, kept up to date by the methods below
+        self.diseases = ()       # diseases of the simulation (shared list), in id order
+#Compute the Official String Representation of the object 
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        #returns the representation
+        return('<{} v={} Q-time {}>'.format({ d: self.disease[d.id] for d in self.diseases },
+                                            { d: self.v[d.id] for d in self.diseases }, self.Qtime))
+
+    # Method to impose a quarantine.
+    #The quarantine is only imposed if the agent 
+    # has the specified quarantined disease and  is in the I state, not already in a quarantine,
+    # and is willing to be quarantined. rng is the random stream of the
+    # simulation.
+    def illness(self, disease, rng):
+        '''Imposes quarantine when the agent is diseased and is willing to be quarantine'''
+        # if the time in quarantine is 0 and rolldie is ttrue
+        if self.Qtime== 0  and rolldie(self.q, rng):
+            #Imposes the quarantine by increasing it to 1
+            self.Qtime= disease.Q + 1
+            self.recountQ(1, disease)
+
+    # Keeps the tally in step when the counter of a disease changed from old
+    # to its current value: the agent leaves the count it was in (E, I or
+    # none) and joins the one it is in now, and Q follows I while the agent
+    # is in quarantine.
+    def recount(self, disease, old):
+        '''Move the agent in the tally after its counter changed from old.'''
+        if self.tally is None:
+            return
+        was = self.tally.slot(old, disease)
+        now = self.tally.slot(self.disease[disease.id], disease)
+        if was == now:
+            return
+        # in or out of the carriers of the disease
+        if was is None or now is None:
+            self.tally.carry(self, disease, -1 if now is None else 1)
+        for (slot, n) in [(was, -1), (now, 1)]:
+            if slot is not None:
+                self.tally.add(disease, self.group, slot, n)
+                if slot == Tally.I and self.Qtime > 0:
+                    self.tally.add(disease, self.group, Tally.Q, n)
+
+    # Keeps Q in step when the agent enters (n=1, because of disease if
+    # known) or leaves (n=-1) quarantine.
+    def recountQ(self, n, disease=None):
+        '''Add n to Q of every disease the agent is in I for.'''
+        if self.tally is None:
+            return
+        if n > 0:
+            self.tally.quarantined[self] = -1 if disease is None else disease.id
+        else:
+            self.tally.quarantined.pop(self, None)
+        for disease in self.diseases:
+            if self.tally.slot(self.disease[disease.id], disease) == Tally.I:
+                self.tally.add(disease, self.group, Tally.Q, n)
+
+    # Return True if infectious (i.e., in I or E state), False
+    # otherwise.
+    def state(self):
+        '''Returns True if agent is infectious.'''
+        # for every disease counter
+        for c in self.disease:
+            # if the counter is greater than 0
+            if c > 0:
+                #return True
+                return(True)
+        #Else return False 
+        return(False)
+
+    # Set the agent's vaccination value of that disease , to whatever value you give.
+    def vaccinate(self, v, disease):
+        '''Models vaccination; v=0 denotes full immunity; v=1 denotes no immunity.'''
+        #Gives Vaccination for that particular Disease
+        if self.tally is not None:
+            self.tally.add(disease, self.group, Tally.S, v - self.v[disease.id])
+        self.v[disease.id] = v
+
+    # Starts the disease: the counter goes to I+E+1 (E, after the next
+    # update()), whatever it was before.
+    def expose(self, disease):
+        '''Catch the disease.'''
+        old = self.disease[disease.id]
+        self.disease[disease.id] = disease.I + disease.E + 1
+        self.recount(disease, old)
+        
+    # Susceptible: if other is infected, roll the dice and update your
+    # state. No real need to check other.state() here, since it is
+    # checked prior to invoking the method, but it is included as per
+    # spec. Note also that I add 1 to I+E, because my first step in
+    # run() is to update state: your code may differ. Finally, it's
+    # important to "remember" which disease you have so that you can
+    # handle recovery and susceptibility correctly when the disease
+    # finally runs its course.
+    # The contact probability cp defaults to self.cp[other.group]; the
+    # simulation passes what is left of it when it already folded cp into
+    # the chance of meeting (see Simulation.contacts()). rng is its random
+    # stream.
+    def infect(self, other, disease, rng, cp=None):
+        '''Other tries to infects self with disease.'''
+        if cp is None:
+            cp = self.cp[other.group]
+        # Checks the agent is not in Quarantine and also checks that that person is infected , self is susceptible, rolldie to see whether the disease is infected 
+        # (an agent infected today, still at I+E+1, only becomes infectious after its next update)
+        k = disease.id
+        if other.Qtime == 0 and 0 < other.disease[k] <= disease.I + disease.E and self.disease[k] == -1 and rolldie(self.s*self.v[k]*disease.t*cp, rng):
+            #Infects with the disease 
+            self.expose(disease)
+            #return True if done
+            return(True)
+        #Else False 
+        return(False)
+
+    # Update the status of the agent. This involves decrementing your
+    # internal counter if you are actively infected. When you get to
+    # 0, you need to flip a (weighted) coin to decide if the agent
+    # goes to state R (c=0) or back to state S (c=-1). Also, we need to
+    # count down the quarantine if one is imposed. Finally, if an agent goes
+    # into the Infected state, see if he will follow the quarantine (if one
+    # been imposed). rng is the random stream of the simulation.
+    def update(self, rng):
+        '''Daily status update.'''
+        # for the disease in the simulation
+        for disease in self.diseases:
+            k = disease.id
+            # if it is equal to 1 
+            if self.disease[k] == 1:
+                # if it's False
+                if not rolldie(disease.r, rng):
+                    # Revert to susceptible, c=-1.
+                    self.disease[k] = -1
+                #Else
+                else:
+                    # recovery, c=0.
+                    self.disease[k] = 0
+                self.recount(disease, 1)
+            #if the c is greater than 1
+            if self.disease[k] > 1:
+                # One day closer to recovery.
+                self.disease[k] = self.disease[k] - 1
+                # from E to I
+                if self.disease[k] == disease.I:
+                    self.recount(disease, disease.I + 1)
+            # if C is equal to I and Q is greater than 0
+            if self.disease[k] == disease.I and disease.Q > 0:
+                    #Goes to illness and work accordingly 
+                    self.illness(disease, rng)
+        #if the time in quarantine is greater than 0 (once a day, whatever
+        #the number of diseases, so a quarantine lasts Q days)
+        if self.Qtime> 0:
+                # Bring near to exit the quarantine
+                self.Qtime= self.Qtime- 1
+                # out of the quarantine
+                if self.Qtime == 0:
+                    self.recountQ(-1)
+   
+    
+            
+
+# Contact network used instead of homogeneous mixing (see
+# Simulation.connect()). Agents j and k (positions in Simulation.agents, or
+# rows of the numpy engine) are neighbours when an edge of some layer
+# (households, workplaces, random contacts, ...) joins them, and they meet
+# on a given day with the weight of that layer. The network is stored as
+# a CSR adjacency: the neighbours of j are neighbor[start[j]:start[j+1]],
+# and layer[] gives the layer of each of those edges, whose weight is
+# weights[layer]. A contagious agent only looks at its own neighbours, so
+# a day costs the number of edges of the contagious agents.
+class Network():
+    def __init__(self, N, layers):
+        '''Network of N agents from a list of (a, b, weight) layers of edges.'''
+        if len(layers) > 255:
+            raise ValueError('a network has at most 255 layers')
+        self.N = N
+        self.weights = [ float(w) for (a, b, w) in layers ]
+        if np is not None:
+            # both directions of every edge, sorted by their first agent
+            a = np.concatenate([ np.concatenate((np.asarray(x, dtype=np.int64), np.asarray(y, dtype=np.int64))) for (x, y, w) in layers ] or [np.zeros(0, dtype=np.int64)])
+            b = np.concatenate([ np.concatenate((np.asarray(y, dtype=np.int64), np.asarray(x, dtype=np.int64))) for (x, y, w) in layers ] or [np.zeros(0, dtype=np.int64)])
+            layer = np.concatenate([ np.full(2 * len(x), l, dtype=np.uint8) for (l, (x, y, w)) in enumerate(layers) ] or [np.zeros(0, dtype=np.uint8)])
+            if len(a) and (a.min() < 0 or a.max() >= N):
+                raise ValueError('the edges of a network of {} agents join agents 0 to {}'.format(N, N - 1))
+            order = np.argsort(a, kind='stable')
+            self.start = np.concatenate(([0], np.cumsum(np.bincount(a, minlength=N))))
+            self.neighbor = b[order].astype(np.int32)
+            self.layer = layer[order]
+        else:
+            # counting sort of both directions of every edge
+            degree = [0] * (N + 1)
+            for (x, y, w) in layers:
+                for (j, k) in zip(x, y):
+                    if not (0 <= j < N and 0 <= k < N):
+                        raise ValueError('the edges of a network of {} agents join agents 0 to {}'.format(N, N - 1))
+                    degree[j + 1] = degree[j + 1] + 1
+                    degree[k + 1] = degree[k + 1] + 1
+            for j in range(N):
+                degree[j + 1] = degree[j + 1] + degree[j]
+            self.start = array('q', degree)
+            fill = array('q', degree[:N])
+            self.neighbor = array('i', [0]) * degree[N]
+            self.layer = array('B', [0]) * degree[N]
+            # in the same order as the numpy version
+            for (l, (x, y, w)) in enumerate(layers):
+                for (first, second) in [(x, y), (y, x)]:
+                    for (u, v) in zip(first, second):
+                        self.neighbor[fill[u]] = v
+                        self.layer[fill[u]] = l
+                        fill[u] = fill[u] + 1
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<network of {} agents, {} edges in {} layers>'.format(self.N, len(self.neighbor) // 2, len(self.weights)))
+
+    # The neighbours agent j meets today, each with the weight of its layer.
+    def meet(self, j, rng):
+        '''Neighbours of j met today.'''
+        start = int(self.start[j])
+        end = int(self.start[j + 1])
+        neighbor = self.neighbor[start:end].tolist()
+        layer = self.layer[start:end].tolist()
+        weights = self.weights
+        return([ neighbor[x] for x in range(len(neighbor)) if rng.random() < weights[layer[x]] ])
+
+# Layer of households (or workplaces, schools, ...): the N agents are put
+# into groups of about size members (consecutive agents, or shuffled with
+# shuffle=True), and everybody is joined to everybody else of the group.
+# rng is the random stream of the simulation. Returns the (a, b) lists of
+# the edges.
+def cliques(N, size, rng, shuffle=False):
+    '''Edges of a layer of small groups.'''
+    agents = list(range(N))
+    if shuffle:
+        rng.shuffle(agents)
+    (a, b) = (array('i'), array('i'))
+    j = 0
+    while j < N:
+        # sizes between 1 and 2*size-1, size on average
+        n = rng.randint(1, 2 * size - 1)
+        members = agents[j:j + n]
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                a.append(members[x])
+                b.append(members[y])
+        j = j + n
+    return(a, b)
+
+# Layer of random contacts: N*degree/2 edges between agents picked at
+# random, so each agent has degree neighbours on average. rng is the
+# random stream of the simulation.
+def randomLayer(N, degree, rng):
+    '''Edges of a layer of random contacts.'''
+    (a, b) = (array('i'), array('i'))
+    for x in range(int(N * degree / 2)):
+        j = rng.randrange(N)
+        k = rng.randrange(N)
+        if j != k:
+            a.append(j)
+            b.append(k)
+    return(a, b)
+
+# Reads a network from a file of edges, one per line: a, b and the weight
+# of the edge (1.0 if missing), as CSV (or a .npy array with 2 or 3
+# columns). Each weight makes a layer. N is the number of agents (1 more
+# than the largest agent if missing).
+def readNetwork(filename, N=None):
+    '''Network of an edge list file.'''
+    if filename.endswith('.npy'):
+        if np is None:
+            raise ImportError('reading {} requires numpy to be installed'.format(filename))
+        data = np.load(filename)
+        edges = [ (int(x[0]), int(x[1]), float(x[2]) if len(x) > 2 else 1.0) for x in data.tolist() ]
+    else:
+        edges = []
+        file = open(filename, 'r', newline='')
+        for row in csv.reader(file):
+            # skips a header line
+            if row and row[0].strip().lstrip('-').isdigit():
+                edges.append((int(row[0]), int(row[1]), float(row[2]) if len(row) > 2 else 1.0))
+        file.close()
+    layers = {}
+    for (j, k, w) in edges:
+        if w not in layers:
+            layers[w] = (array('i'), array('i'))
+        layers[w][0].append(j)
+        layers[w][1].append(k)
+    if N is None:
+        N = max([ max(j, k) for (j, k, w) in edges ], default=-1) + 1
+    return(Network(N, [ (a, b, w) for (w, (a, b)) in layers.items() ]))
+
+# Vectorized population model used by Simulation(engine="numpy"). Instead
+# of one Agent object per person, the population is stored as a struct of
+# arrays: row j of every array describes agent j, and column k of c and v
+# describes the k-th disease introduced.
+#
+#   c[j, k]   disease counter (same E+I ... 0, -1 countdown as Agent.disease)
+#   v[j, k]   vaccination state
+#   s[j]      susceptibility
+#   q[j]      probability of following a quarantine
+#   Qtime[j]  time left in quarantine
+#   group[j]  group of the agent (row of cpList)
+#
+# S[g, k] is the running sum of v[:, k] over the agents of group g (the S
+# of the tally), kept up to date wherever v changes.
+#
+# Every phase of a day (update, seeding, campaigns, history and infection)
+# is the same as in Simulation.run(), but applied to all agents at once.
+#
+# With Simulation(crn=True) (common random numbers) every draw is keyed
+# instead of coming from the stream in turn: it is a hash of the seed, the
+# day, its purpose (one of the constants below) and the agents, disease or
+# contact it is for (see uniform()). Two runs with the same seed then make
+# the same draws for the same agents, and only differ where their
+# interventions changed what happens, see Simulation.compare().
+class NumpyEngine():
+    RECOVERY, COMPLIANCE, COVERAGE, SEED, CONTACTS, PARTNER, TRANSMISSION, MEET, IMPORT, ROLLOUT = range(10)
+
+    def __init__(self, simulation):
+        # numpy is an optional dependency, only this engine needs it
+        if np is None:
+            raise ImportError('engine="numpy" requires numpy to be installed')
+        self.sim = simulation
+        self.rng = np.random.default_rng(simulation.rngSeed)
+        self.c = np.zeros((0, 0), dtype=np.int32)
+        self.v = np.zeros((0, 0), dtype=np.float64)
+        self.s = np.zeros(0, dtype=np.float64)
+        self.q = np.zeros(0, dtype=np.float64)
+        self.Qtime = np.zeros(0, dtype=np.int32)
+        self.group = np.zeros(0, dtype=np.int32)
+        self.S = np.zeros((0, 0), dtype=np.float64)
+        self.col = {}               # column of each disease in c and v
+        self.base = None            # seed of the random streams of the parts of a day, see split()
+        self.pool = None            # worker processes of a parallel run
+        self.blocks = []            # shared memory of a parallel run, see share()
+        self.key = None             # seed of the keyed draws when the simulation has crn (None: off)
+        self.seeds = 0              # seed() calls so far, each picks its own agents with crn
+        if simulation.crn:
+            self.rekey(simulation.rngSeed)
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<numpy engine {} agents {} diseases>'.format(*self.c.shape))
+
+    # Key of the common random numbers, from the seed of the simulation.
+    def rekey(self, seed):
+        '''Seed the keyed draws.'''
+        self.key = streamSeed(seed if seed is not None else Random().getrandbits(64), 'crn')
+
+    # Uniform numbers in [0, 1) for the draws of purpose today, one per
+    # element of the (broadcast) keys: the same keys give the same numbers
+    # in every run with the same seed. A splitmix64 hash of the key, the
+    # day, the purpose and the keys in turn.
+    def uniform(self, purpose, *keys):
+        '''Keyed uniform random numbers.'''
+        keys = np.broadcast_arrays(*[ np.asarray(k) for k in keys ])
+        h = np.full(keys[0].shape, self.key, dtype=np.uint64)
+        for x in [np.uint64(self.sim.day), np.uint64(purpose)] + [ k.astype(np.uint64) for k in keys ]:
+            h = h ^ x
+            h = (h ^ (h >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+            h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+            h = h ^ (h >> np.uint64(31))
+        return((h >> np.uint64(11)) * 2.0**-53)
+
+    # Binomial(n, p) numbers from keyed uniforms, by inverting the cdf (a
+    # normal approximation from two uniforms when the mean is over 100).
+    def binomial(self, purpose, keys, n, p):
+        '''Keyed binomial random numbers.'''
+        (n, p) = np.broadcast_arrays(np.asarray(n, dtype=np.float64), np.minimum(np.asarray(p, dtype=np.float64), 1 - 1e-12))
+        u = self.uniform(purpose, *keys, 0)
+        mean = n * p
+        k = np.zeros(n.shape, dtype=np.int64)
+        pmf = np.exp(n * np.log1p(-p))
+        cdf = pmf.copy()
+        todo = (u > cdf) & (mean <= 100)
+        while todo.any():
+            pmf[todo] = pmf[todo] * (n[todo] - k[todo]) / (k[todo] + 1) * p[todo] / (1 - p[todo])
+            k[todo] = k[todo] + 1
+            cdf[todo] = cdf[todo] + pmf[todo]
+            todo = todo & (u > cdf) & (k < n)
+        big = mean > 100
+        if big.any():
+            z = np.sqrt(-2 * np.log1p(-u[big])) * np.cos(2 * np.pi * self.uniform(purpose, *[ np.broadcast_to(x, n.shape)[big] for x in keys ], 1))
+            k[big] = np.clip(np.round(mean[big] + z * np.sqrt(mean[big] * (1 - p[big]))), 0, n[big])
+        return(k)
+
+    # The workers and the shared memory only live during run().
+    def __getstate__(self):
+        '''State of the engine, without the workers.'''
+        state = self.__dict__.copy()
+        state['pool'] = None
+        state['blocks'] = []
+        return(state)
+
+    # Appends n agents of a group with the default s and q of an Agent. New
+    # agents start susceptible and unvaccinated for every known disease.
+    def populate(self, n, group, s=0.99, q=1.0):
+        '''Add n agents of the specified group.'''
+        D = len(self.col)
+        self.c = np.concatenate((self.c, np.full((n, D), -1, dtype=np.int32)))
+        self.v = np.concatenate((self.v, np.ones((n, D))))
+        self.s = np.concatenate((self.s, np.full(n, s)))
+        self.q = np.concatenate((self.q, np.full(n, q)))
+        self.Qtime = np.concatenate((self.Qtime, np.zeros(n, dtype=np.int32)))
+        self.group = np.concatenate((self.group, np.full(n, group, dtype=np.int32)))
+        self.grow(group + 1)
+        self.S[group] += n
+
+    # Appends the agents of a population table (see readPopulation()) in
+    # one go. Their vaccination is set by Simulation.vaccinateTable().
+    def load(self, table):
+        '''Add the agents of a population table.'''
+        n = len(table['group'])
+        D = len(self.col)
+        self.c = np.concatenate((self.c, np.full((n, D), -1, dtype=np.int32)))
+        self.v = np.concatenate((self.v, np.ones((n, D))))
+        self.s = np.concatenate((self.s, np.asarray(table['s'], dtype=np.float64)))
+        self.q = np.concatenate((self.q, np.asarray(table['q'], dtype=np.float64)))
+        self.Qtime = np.concatenate((self.Qtime, np.zeros(n, dtype=np.int32)))
+        self.group = np.concatenate((self.group, np.asarray(table['group'], dtype=np.int32)))
+        if n > 0:
+            self.grow(int(self.group[-n:].max()) + 1)
+            self.S += np.bincount(self.group[-n:], minlength=len(self.S))[:, None]
+
+    # Copies an Agent object into the arrays.
+    def join(self, agent):
+        '''Add specified agent to the arrays.'''
+        self.populate(1, agent.group, agent.s, agent.q)
+        for disease in agent.diseases:
+            self.c[-1, self.col[disease]] = agent.disease[disease.id]
+            self.revaccinate(len(self.s) - 1, self.col[disease], agent.v[disease.id])
+        self.Qtime[-1] = agent.Qtime
+
+    # Adds a column for the disease, every agent is susceptible and
+    # unvaccinated.
+    def introduce(self, disease):
+        '''Add specified disease to the arrays.'''
+        self.col[disease] = len(self.col)
+        N = len(self.s)
+        self.c = np.hstack((self.c, np.full((N, 1), -1, dtype=np.int32)))
+        self.v = np.hstack((self.v, np.ones((N, 1))))
+        self.S = np.hstack((self.S, np.bincount(self.group, minlength=len(self.S))[:, None].astype(np.float64)))
+
+    # Adds rows to S up to G groups.
+    def grow(self, G):
+        '''Make room in S for G groups.'''
+        if G > len(self.S):
+            self.S = np.vstack((self.S, np.zeros((G - len(self.S), len(self.col)))))
+
+    # Sets v[rows, k] to v, and S with it.
+    def revaccinate(self, rows, k, v):
+        '''Set the vaccination of the agents in rows.'''
+        rows = np.unique(rows)
+        old = self.v[rows, k]
+        self.v[rows, k] = v
+        np.add.at(self.S[:, k], self.group[rows], self.v[rows, k] - old)
+
+    # Infects k agents picked at random, like Simulation.seed().
+    def seed(self, disease, k=1):
+        '''Seed a certain number of agents with a particular disease.'''
+        if self.key is not None:
+            # the k agents with the smallest keyed numbers
+            picked = np.argsort(self.uniform(self.SEED, self.col[disease], self.seeds, np.arange(len(self.s))), kind='stable')[:k]
+        else:
+            picked = self.rng.choice(len(self.s), size=k, replace=False)
+        self.seeds = self.seeds + 1
+        self.c[picked, self.col[disease]] = disease.I + disease.E + 1
+        if self.sim.trace is not None:
+            self.sim.trace.extend(self.sim.day, TraceWriter.SEED, disease.id, picked)
+        return(picked)
+
+    # k contacts with infectious people from elsewhere, like
+    # Simulation.imports(). Returns the number of agents infected.
+    def imports(self, disease, k):
+        '''Infect the susceptible agents among k random contacts.'''
+        col = self.col[disease]
+        if self.key is not None:
+            rows = (self.uniform(self.IMPORT, col, np.arange(k), 0) * len(self.s)).astype(np.int64)
+            roll = self.uniform(self.IMPORT, col, np.arange(k), 1)
+        else:
+            rows = self.rng.integers(0, len(self.s), k)
+            roll = self.rng.random(k)
+        rows = np.unique(rows[(self.c[rows, col] == -1) & (roll <= self.s[rows] * self.v[rows, col] * disease.t)])
+        self.c[rows, col] = disease.I + disease.E + 1
+        if self.sim.trace is not None:
+            self.sim.trace.extend(self.sim.day, TraceWriter.IMPORT, disease.id, rows)
+        return(len(rows))
+
+    # Daily update of the agents in rows, disease by disease, exactly as
+    # Agent.update() does it for one agent: a counter of 1 rolls for
+    # immunity (0) or susceptibility (-1), bigger counters count down, and
+    # agents entering I roll to follow the quarantine of that disease.
+    def update(self, rows, rng=None):
+        '''Daily status update of the agents in rows.'''
+        rng = self.rng if rng is None else rng
+        trace = self.sim.trace
+        Qtime = self.Qtime[rows]
+        for disease, k in self.col.items():
+            c = self.c[rows, k]
+            # recovery rolls for the agents at the end of the infection
+            last = np.flatnonzero(c == 1)
+            roll = self.uniform(self.RECOVERY, k, rows[last]) if self.key is not None else rng.random(len(last))
+            c[last] = np.where(roll <= disease.r, 0, -1)
+            if trace is not None:
+                trace.extend(self.sim.day, TraceWriter.RECOVERY, disease.id, rows[last[c[last] == 0]])
+                trace.extend(self.sim.day, TraceWriter.SUSCEPTIBLE, disease.id, rows[last[c[last] == -1]])
+            # One day closer to recovery.
+            c[c > 1] -= 1
+            # agents entering I roll to follow the quarantine
+            if disease.Q > 0:
+                ill = np.flatnonzero((c == disease.I) & (Qtime == 0))
+                roll = self.uniform(self.COMPLIANCE, k, rows[ill]) if self.key is not None else rng.random(len(ill))
+                ill = ill[roll <= self.q[rows[ill]]]
+                Qtime[ill] = disease.Q + 1
+                if trace is not None:
+                    trace.extend(self.sim.day, TraceWriter.QUARANTINE, disease.id, rows[ill])
+            self.c[rows, k] = c
+        if trace is not None:
+            trace.extend(self.sim.day, TraceWriter.RELEASE, -1, rows[Qtime == 1])
+        # once a day, whatever the number of diseases
+        Qtime[Qtime > 0] -= 1
+        self.Qtime[rows] = Qtime
+
+    # Vaccinates each of the agents in rows with probability coverage.
+    def vaccinate(self, rows, disease, coverage, v):
+        '''Vaccinate agents in rows with probability coverage.'''
+        roll = self.uniform(self.COVERAGE, self.col[disease], rows) if self.key is not None else self.rng.random(len(rows))
+        self.give(rows[roll <= coverage], disease, v)
+
+    # Vaccinates the agents in rows.
+    def give(self, rows, disease, v):
+        '''Vaccinate the agents in rows.'''
+        self.revaccinate(rows, self.col[disease], v)
+        if self.sim.trace is not None:
+            self.sim.trace.extend(self.sim.day, TraceWriter.VACCINATION, disease.id, rows)
+
+    # Orders the agents offered a dose by a rollout, like
+    # Simulation.rolloutQueue(): the agents of its groups by random keys
+    # (keyed by agent with common random numbers, so that the arms of
+    # compare() share the order), then by priority if any.
+    def rolloutQueue(self, rollout):
+        '''Positions of the agents in the order of their turn.'''
+        rows = np.arange(len(self.s)) if rollout.groups is None else np.flatnonzero(np.isin(self.group, rollout.groups))
+        if self.key is not None:
+            keys = self.uniform(self.ROLLOUT, self.col[rollout.disease], rollout.day, rows)
+        else:
+            keys = self.rng.random(len(rows))
+        if rollout.priority == 'groups':
+            rank = np.zeros(len(self.sim.cpList), dtype=np.int64)
+            rank[rollout.groups] = np.arange(len(rollout.groups))
+            order = np.lexsort((keys, rank[self.group[rows]]))
+        elif rollout.priority is not None:
+            order = np.lexsort((keys, np.array([ rollout.priority(j) for j in rows ])))
+        else:
+            order = np.argsort(keys)
+        return(rows[order])
+
+    # Sorts the agents by group, so that the members of group g are
+    # order[start[g]:start[g] + size[g]]. Called once at the start of run().
+    def strata(self):
+        '''Index the agents by group.'''
+        self.order = np.argsort(self.group, kind='stable')
+        self.size = np.bincount(self.group, minlength=len(self.sim.cpList))
+        self.start = np.cumsum(self.size) - self.size
+
+    # Draws the contacts of every source agent, stratified by group like
+    # Simulation.contacts(): a source of group h meets each member of group g
+    # with probability m*min(cp[g][h], 1), so it meets Binomial(size[g], that)
+    # of them, sampled without replacement. The rest of cp is returned with
+    # each pair for the infection roll. Returns (source, partner, rest) arrays.
+    def contacts(self, sources, rng=None):
+        '''Sample the contacts made today by the source agents.'''
+        rng = self.rng if rng is None else rng
+        if self.sim.network is not None:
+            return(self.neighbours(sources, rng))
+        N = len(self.s)
+        cp = np.array(self.sim.cpList, dtype=np.float64)
+        fold = np.minimum(cp, 1.0)
+        G = len(self.size)
+        h = self.group[sources]
+        # number of members of each group met by each source
+        if self.key is not None:
+            return(self.keyedContacts(sources, cp, fold))
+        n = rng.binomial(self.size[None, :], self.sim.m * fold[:, h].T)
+        pair = np.repeat(np.arange(len(sources) * G, dtype=np.int64), n.ravel())
+        owner = pair // G
+        g = pair % G
+        pick = rng.integers(0, self.size[g])
+        # redraw the members a source has already met until every pair is
+        # distinct, which samples each source's partners without replacement
+        while True:
+            key = owner * N + self.order[self.start[g] + pick]
+            order = np.argsort(key, kind='stable')
+            dup = order[1:][key[order[1:]] == key[order[:-1]]]
+            if len(dup) == 0:
+                break
+            pick[dup] = rng.integers(0, self.size[g[dup]])
+        rest = cp[g, h[owner]] / fold[g, h[owner]]
+        return(sources[owner], self.order[self.start[g] + pick], rest)
+
+    # contacts() with keyed draws: the number of members of group g a source
+    # meets, and its n-th partner among them, are keyed by the source, g
+    # and n, so a source makes the same contacts in every run. A partner
+    # drawn twice is met once.
+    def keyedContacts(self, sources, cp, fold):
+        '''Sample the contacts of the sources with keyed draws.'''
+        N = len(self.s)
+        G = len(self.size)
+        h = self.group[sources]
+        n = self.binomial(self.CONTACTS, (sources[:, None], np.arange(G)[None, :]), self.size[None, :], self.sim.m * fold[:, h].T)
+        pair = np.repeat(np.arange(len(sources) * G, dtype=np.int64), n.ravel())
+        owner = pair // G
+        g = pair % G
+        nth = np.arange(len(pair)) - np.repeat(np.cumsum(n.ravel()) - n.ravel(), n.ravel())
+        pick = (self.uniform(self.PARTNER, sources[owner], g, nth) * self.size[g]).astype(np.int64)
+        keep = np.sort(np.unique(owner * N + self.order[self.start[g] + pick], return_index=True)[1])
+        (owner, g, pick) = (owner[keep], g[keep], pick[keep])
+        rest = cp[g, h[owner]] / fold[g, h[owner]]
+        return(sources[owner], self.order[self.start[g] + pick], rest)
+
+    # Contacts on the network of the simulation: every edge of a source is
+    # met with the weight of its layer, and cp is all left for the
+    # infection roll.
+    def neighbours(self, sources, rng):
+        '''Sample the neighbours met today by the source agents.'''
+        net = self.sim.network
+        first = net.start[sources]
+        degree = net.start[sources + 1] - first
+        owner = np.repeat(np.arange(len(sources)), degree)
+        # position of every edge of the sources in the adjacency
+        edge = np.arange(len(owner)) - np.repeat(np.cumsum(degree) - degree, degree) + np.repeat(first, degree)
+        weights = np.array(net.weights)[net.layer[edge]]
+        met = (self.uniform(self.MEET, edge) if self.key is not None else rng.random(len(edge))) < weights
+        (owner, edge) = (owner[met], edge[met])
+        dst = net.neighbor[edge].astype(np.int64)
+        cp = np.array(self.sim.cpList, dtype=np.float64)
+        return(sources[owner], dst, cp[self.group[dst], self.group[sources[owner]]])
+
+    # Infection phase: every contact tries each disease the source carries on
+    # a susceptible partner, with the same probability as Agent.infect().
+    # Returns the number of contacts and, for each disease, the (sources,
+    # partners) of the infections; nothing is changed until merge().
+    def hits(self, rows, rng=None):
+        '''Contacts and infections made by the agents in rows.'''
+        rng = self.rng if rng is None else rng
+        # quarantined agents and agents that just recovered infect nobody
+        rows = rows[(self.Qtime[rows] == 0) & (self.c[rows] > 0).any(axis=1)]
+        if len(rows) == 0:
+            return(0, [ (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)) for k in self.col ])
+        src, dst, rest = self.contacts(rows, rng)
+        p = self.s[dst] * rest
+        hits = []
+        for disease, k in self.col.items():
+            # only pairs where the source carries k (and was not infected
+            # today, see Agent.infect()) and the partner is susceptible
+            c = self.c[src, k]
+            pair = np.flatnonzero((c > 0) & (c <= disease.I + disease.E) & (self.c[dst, k] == -1))
+            roll = self.uniform(self.TRANSMISSION, k, src[pair], dst[pair]) if self.key is not None else rng.random(len(pair))
+            hit = pair[roll <= p[pair] * self.v[dst[pair], k] * disease.t]
+            hits.append((src[hit], dst[hit]))
+        return(len(src), hits)
+
+    # Infects the partners hit by one or more hits(). A partner hit twice
+    # (by two sources, or by two parts of a parallel day) is simply set
+    # twice to the same counter, so the order of the parts does not matter;
+    # the trace gives it its first source.
+    def merge(self, results):
+        '''Apply the infections of the hits() results.'''
+        contacts = sum([ n for (n, hits) in results ])
+        infections = 0
+        for (j, (disease, k)) in enumerate(self.col.items()):
+            src = np.concatenate([ hits[j][0] for (n, hits) in results ])
+            dst = np.concatenate([ hits[j][1] for (n, hits) in results ])
+            self.c[dst, k] = disease.I + disease.E + 1
+            infections = infections + len(dst)
+            if self.sim.trace is not None:
+                (dst, first) = np.unique(dst, return_index=True)
+                self.sim.trace.extend(self.sim.day, TraceWriter.INFECTION, disease.id, dst, src[first])
+        # contacts and infections, for Profile
+        return(contacts, infections)
+
+    def infect(self, rows):
+        '''Let the agents in rows infect their contacts.'''
+        return(self.merge([self.hits(rows)]))
+
+    # Counts (E, I, S, Q) of every disease into the tally of the simulation
+    # (see Tally), per group too if the tally has byGroup. Only the agents in
+    # rows can be in E or I: the contagious and the seeded ones.
+    def count(self, rows):
+        '''Count (E, I, S, Q) of every disease among the agents in rows.'''
+        tally = self.sim.tally
+        quarantined = self.Qtime[rows] > 0
+        group = self.group[rows]
+        G = len(self.size)
+        for disease, k in self.col.items():
+            c = self.c[rows, k]
+            exposed = c > disease.I
+            ill = (c > 0) & ~exposed
+            tally.count[disease] = [int(np.count_nonzero(exposed)), int(np.count_nonzero(ill)),
+                                    float(self.S[:, k].sum()), int(np.count_nonzero(quarantined & ill))]
+            if tally.byGroup:
+                E = np.bincount(group, weights=exposed, minlength=G)
+                I = np.bincount(group, weights=ill, minlength=G)
+                S = self.S[:, k]
+                Q = np.bincount(group, weights=quarantined & ill, minlength=G)
+                tally.groups[disease] = { g: [int(E[g]), int(I[g]), float(S[g]), int(Q[g])]
+                                          for g in range(G) if self.size[g] > 0 }
+
+    # Parallel mode (Simulation(workers=n) with n > 1): during run() the
+    # arrays live in shared memory, and the update and infection phases of
+    # a day are split into parts (see split()) run by a pool of n worker
+    # processes that attach the same memory (see _sharedStart()).
+    def share(self):
+        '''Move the arrays (and the network) to shared memory.'''
+        arrays = [ (self, name) for name in ['c', 'v', 's', 'q', 'Qtime', 'group', 'order'] ]
+        if self.sim.network is not None:
+            arrays = arrays + [ (self.sim.network, name) for name in ['start', 'neighbor', 'layer'] ]
+        for (owner, name) in arrays:
+            a = np.asarray(getattr(owner, name))
+            block = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+            view = np.ndarray(a.shape, dtype=a.dtype, buffer=block.buf)
+            view[...] = a
+            setattr(owner, name, view)
+            self.blocks.append((owner, name, block))
+
+    # Copies the arrays back to private memory and frees the shared blocks.
+    def unshare(self):
+        '''Bring the arrays back from shared memory.'''
+        for (owner, name, block) in self.blocks:
+            setattr(owner, name, np.array(getattr(owner, name)))
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    # What a worker needs to rebuild the engine on the shared memory.
+    def spec(self):
+        '''Description of the shared engine for _sharedStart().'''
+        net = self.sim.network
+        return({
+            'm': self.sim.m,
+            'cpList': self.sim.cpList,
+            'col': list(self.col.items()),
+            'key': self.key,
+            'size': self.size,
+            'start': self.start,
+            'network': None if net is None else (net.N, net.weights),
+            'blocks': [ ('engine' if owner is self else 'network', name, block.name,
+                         getattr(owner, name).shape, getattr(owner, name).dtype.str)
+                        for (owner, name, block) in self.blocks ],
+        })
+
+    # One part of a phase of the day: the update of its rows (written in
+    # place, the parts have no rows in common), or their hits() against the
+    # state at the start of the infection phase. Each part has its own
+    # random stream, seeded with (base, day, part, phase).
+    def part(self, phase, seed, rows, Q):
+        '''Run one part of a phase of the day.'''
+        # (the day of the keyed draws)
+        self.sim.day = seed[1]
+        # quarantines started today by the main process
+        for (disease, n) in zip(self.col, Q):
+            disease.Q = n
+        rng = np.random.default_rng(seed)
+        if phase == 0:
+            self.update(rows, rng)
+            return(None)
+        return(self.hits(rows, rng))
+
+    # Splits the rows of a phase into parts of about 4096 rows (64 at most),
+    # and runs them in the pool. The parts and their random streams only
+    # depend on the rows and the day, never on the number of workers, so a
+    # seed gives the same run with 2 or 16 workers. A day with a single part
+    # is run here.
+    def split(self, phase, day, rows):
+        '''Run a phase of the day in parts.'''
+        parts = np.array_split(rows, max(1, min(64, -(-len(rows) // 4096))))
+        Q = [ disease.Q for disease in self.col ]
+        tasks = [ (phase, [self.base, day, j, phase], part, Q) for (j, part) in enumerate(parts) ]
+        if self.pool is None or len(tasks) == 1:
+            return([ self.part(*task) for task in tasks ])
+        return(list(self.pool.map(_sharedTask, tasks)))
+
+    # The day loop, phase by phase the same as Simulation.run(), from day
+    # sim.day to the day before last (a day at a time if resumable, see
+    # Simulation.step()). With workers, the arrays are shared with a pool
+    # of processes for the length of the run.
+    def run(self, last, resumable=False):
+        '''Run the simulation.'''
+        self.strata()
+        if self.sim.workers <= 1:
+            yield from self.days(last, resumable)
+            return
+        # the updates of the workers are not traced
+        if self.sim.trace is not None:
+            raise ValueError('a traced simulation runs with workers=1')
+        if self.base is None:
+            self.base = int(self.rng.integers(2**62))
+        self.share()
+        try:
+            self.pool = ProcessPoolExecutor(self.sim.workers, initializer=_sharedStart, initargs=(self.spec(),))
+            yield from self.days(last, resumable)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+            self.unshare()
+
+    def days(self, last, resumable=False):
+        '''Run the days up to last.'''
+        sim = self.sim
+        stats = sim.stats
+        parallel = sim.workers > 1
+        (seeds, quarantines, campaigns, lastSeed) = sim.eventsByDay()
+        i = sim.day
+        while i < last:
+            sim.day = i
+            # agents contagious at the start of the day
+            infectious = (self.c > 0).any(axis=1)
+            contagious = np.flatnonzero(infectious)
+            if stats is not None:
+                stats.begin(sim.rng)
+                stats.contagious(len(contagious))
+            if parallel:
+                self.split(0, i, contagious)
+            else:
+                self.update(contagious)
+            if stats is not None:
+                stats.lap('update')
+            counted = [contagious]
+            for (sdDisease, sdNum) in seeds.get(i, ()):
+                counted.append(self.seed(sdDisease, sdNum))
+            for (quarDisease, quarLen) in quarantines.get(i, ()):
+                quarDisease.quarantine(quarLen)
+            for (campDisease, campCoverage, campVaccine) in campaigns.get(i, ()):
+                self.vaccinate(np.flatnonzero(~infectious), campDisease, campCoverage, campVaccine)
+            for rollout in sim.eventRoll:
+                if rollout.due(i):
+                    if rollout.queue is None:
+                        rollout.queue = self.rolloutQueue(rollout)
+                    self.give(rollout.take(~infectious), rollout.disease, rollout.v)
+            if stats is not None:
+                stats.lap('events')
+            self.count(np.unique(np.concatenate(counted)))
+            sim.record()
+            if stats is not None:
+                stats.lap('record')
+            #Exit early if there are no infected agents left.
+            if sim.getOut() and i > lastSeed and not resumable:
+                if stats is not None:
+                    stats.end(i, sim.rng)
+                sim.day = sim.steps
+                return(sim.history)
+            if parallel:
+                (contacts, infections) = self.merge(self.split(1, i, contagious))
+            else:
+                (contacts, infections) = self.infect(contagious)
+            if stats is not None:
+                stats.count('contacts', contacts)
+                stats.count('infections', infections)
+                stats.lap('infection')
+                stats.end(i, sim.rng)
+            i = i + 1
+            # the days of step() stop here until the next step()
+            if resumable:
+                sim.day = i
+                yield
+                i = sim.day
+        sim.day = i
+        return(sim.history)
+
+# Worker side of the parallel numpy engine: an engine without a population
+# of its own, on the arrays shared by the main process.
+_shared = None
+
+def _sharedStart(spec):
+    '''Attach the shared arrays in the worker.'''
+    global _shared
+    engine = NumpyEngine.__new__(NumpyEngine)
+    engine.sim = Simulation(m=spec['m'], cpList=spec['cpList'])
+    engine.col = dict(spec['col'])
+    engine.key = spec['key']
+    engine.size = spec['size']
+    engine.start = spec['start']
+    if spec['network'] is not None:
+        net = Network.__new__(Network)
+        (net.N, net.weights) = spec['network']
+        engine.sim.network = net
+    engine.blocks = []
+    for (owner, name, block, shape, dtype) in spec['blocks']:
+        block = shared_memory.SharedMemory(name=block)
+        setattr(engine if owner == 'engine' else engine.sim.network, name,
+                np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+        engine.blocks.append(block)
+    _shared = engine
+
+def _sharedTask(task):
+    '''Run one part of a phase of the day in the worker.'''
+    return(_shared.part(*task))
+
+# Aggregate model used by Simulation(engine="aggregate"). There are no
+# agents, only the number of people of each group in each state of each
+# disease, so a day costs the same for 10^3 or 10^8 people. For a disease
+# with counters up to L = I+E+1, X[disease][g, x, l] is the number of
+# people of group g in state x with the l-th vaccination state of
+# levels[disease]:
+#
+#   x = 0       susceptible (counter -1)
+#   x = 1       immune (counter 0)
+#   x = 1 + c   counter c, 1 <= c <= L (E for c > I, I for c <= I)
+#
+# XQ[disease] counts the people of I in quarantine the same way, and
+# qleft[disease][x] is the number of quarantine days left of the people
+# with that counter. A day is the same as in Simulation.run(), with
+# binomial draws for the numbers of people recovering, following the
+# quarantine, being vaccinated or being infected (chain binomial): a
+# susceptible of group g with vaccination v escapes each free source of
+# group h with probability 1 - m*cp[g][h]*s*v*t.
+#
+# Everybody has the s and q of populate() (0.99 and 1.0). Each disease is
+# counted on its own: the people in quarantine for the other diseases,
+# and those sick with them (for the campaigns), are taken as a share of
+# each group, the same whatever the state for this disease.
+class AggregateEngine():
+    def __init__(self, simulation):
+        # numpy is an optional dependency, only this engine and the numpy one need it
+        if np is None:
+            raise ImportError('engine="aggregate" requires numpy to be installed')
+        self.sim = simulation
+        self.rng = np.random.default_rng(simulation.rngSeed)
+        self.N = np.zeros(0, dtype=np.int64)       # people per group, see grow()
+        self.s = 0.99               # susceptibility of everybody
+        self.q = 1.0                # probability of following a quarantine
+        self.X = {}                 # people per group, state and vaccination of each disease
+        self.XQ = {}                # the same for the people in quarantine
+        self.qleft = {}             # quarantine days left per state of each disease
+        self.levels = {}            # vaccination states of each disease
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<aggregate engine {} people {} diseases>'.format(int(self.N.sum()), len(self.X)))
+
+    # Adds n people to a group, susceptible and unvaccinated.
+    def populate(self, n, group):
+        '''Add n people to the specified group.'''
+        self.grow(group + 1)
+        self.N[group] = self.N[group] + n
+        for disease in self.X:
+            self.X[disease][group, 0, self.level(disease, 1.0)] += n
+
+    def join(self, agent):
+        '''Agents can't be added to the aggregate engine.'''
+        raise ValueError('the aggregate engine counts people, add them with populate()')
+
+    # Adds empty groups up to G. The groups are those populated so far, and
+    # at run() every row of sim.cpList (which may be set after the
+    # Simulation is made), as in NumpyEngine.strata().
+    def grow(self, G):
+        '''Make room for G groups.'''
+        more = G - len(self.N)
+        if more <= 0:
+            return
+        self.N = np.concatenate((self.N, np.zeros(more, dtype=np.int64)))
+        for counts in [self.X, self.XQ]:
+            for disease in counts:
+                counts[disease] = np.concatenate((counts[disease], np.zeros((more,) + counts[disease].shape[1:], dtype=np.int64)))
+
+    # Position of the vaccination state v in levels[disease], added if new.
+    def level(self, disease, v):
+        '''Index of the vaccination state v.'''
+        if v not in self.levels[disease]:
+            self.levels[disease].append(v)
+            G = len(self.N)
+            for counts in [self.X, self.XQ]:
+                counts[disease] = np.concatenate((counts[disease], np.zeros((G, counts[disease].shape[1], 1), dtype=np.int64)), axis=2)
+        return(self.levels[disease].index(v))
+
+    # Adds the counts of the disease: everybody susceptible and unvaccinated.
+    def introduce(self, disease):
+        '''Add specified disease.'''
+        L = disease.I + disease.E + 1
+        self.levels[disease] = [1.0]
+        self.X[disease] = np.zeros((len(self.N), L + 2, 1), dtype=np.int64)
+        self.X[disease][:, 0, 0] = self.N
+        self.XQ[disease] = np.zeros((len(self.N), L + 2, 1), dtype=np.int64)
+        self.qleft[disease] = np.zeros(L + 2, dtype=np.int64)
+
+    # Infects k people picked at random among everybody, like
+    # Simulation.seed(): their counter goes to L.
+    def seed(self, disease, k=1):
+        '''Seed a certain number of people with a particular disease.'''
+        L = disease.I + disease.E + 1
+        for counts in [self.X[disease], self.XQ[disease]]:
+            # people of every group, state and vaccination, in one vector
+            total = counts.sum()
+            if total == 0:
+                continue
+            picked = self.rng.multivariate_hypergeometric(counts.ravel(), min(k, int(total))).reshape(counts.shape)
+            counts -= picked
+            self.X[disease][:, L + 1, :] += picked.sum(axis=1)
+            k = k - int(picked.sum())
+
+    # k contacts with infectious people from elsewhere, like
+    # Simulation.imports(): the susceptible people met are infected with
+    # probability s*v*t.
+    def imports(self, disease, k):
+        '''Infect the susceptible people among k random contacts.'''
+        L = disease.I + disease.E + 1
+        X = self.X[disease]
+        total = int(X.sum())
+        if total == 0:
+            return(0)
+        met = self.rng.multivariate_hypergeometric(X.ravel(), min(k, total)).reshape(X.shape)
+        infected = self.rng.binomial(met[:, 0, :], self.s * np.array(self.levels[disease]) * disease.t)
+        X[:, 0, :] -= infected
+        X[:, L + 1, :] += infected
+        return(int(infected.sum()))
+
+    # Daily update of the disease, as Agent.update(): counter 1 rolls for
+    # immunity or susceptibility, the others count down (with the days
+    # of quarantine left), and the people entering I roll to follow the
+    # quarantine.
+    def update(self, disease):
+        '''Daily update of the counts of the disease.'''
+        (X, XQ, qleft) = (self.X[disease], self.XQ[disease], self.qleft[disease])
+        L = disease.I + disease.E + 1
+        done = X[:, 2, :] + XQ[:, 2, :]
+        immune = self.rng.binomial(done, disease.r)
+        X[:, 1, :] += immune
+        X[:, 0, :] += done - immune
+        X[:, 2:L + 1, :] = X[:, 3:L + 2, :]
+        X[:, L + 1, :] = 0
+        XQ[:, 2:L + 1, :] = XQ[:, 3:L + 2, :]
+        XQ[:, L + 1, :] = 0
+        qleft[2:L + 1] = qleft[3:L + 2] - 1
+        qleft[L + 1] = 0
+        # the end of their quarantine
+        out = np.flatnonzero((qleft <= 0) & (XQ.sum(axis=(0, 2)) > 0))
+        X[:, out, :] += XQ[:, out, :]
+        XQ[:, out, :] = 0
+        # entering I
+        if disease.Q > 0:
+            follow = self.rng.binomial(X[:, disease.I + 1, :], self.q)
+            X[:, disease.I + 1, :] -= follow
+            XQ[:, disease.I + 1, :] += follow
+            qleft[disease.I + 1] = disease.Q
+
+    # Share of each group in quarantine for another disease than this one.
+    def quarantined(self, disease):
+        '''Share of each group quarantined for the other diseases.'''
+        free = np.ones(len(self.N))
+        for other in self.XQ:
+            if other is not disease:
+                free = free * (1 - self.XQ[other].sum(axis=(1, 2)) / np.maximum(self.N, 1))
+        return(1 - free)
+
+    # People with a counter above 0 for the disease, per group.
+    def contagious(self, disease):
+        '''Number of people of each group in E or I.'''
+        return(self.X[disease][:, 2:, :].sum(axis=(1, 2)) + self.XQ[disease][:, 2:, :].sum(axis=(1, 2)))
+
+    # Vaccinates with probability coverage the people healthy at the start
+    # of the day (healthy: their susceptible and immune counts then),
+    # scaled by the share of each group not contagious for the other
+    # diseases (sick: their contagious people per group then).
+    def vaccinate(self, disease, coverage, v, healthy, sick):
+        '''Vaccinate healthy people with probability coverage.'''
+        share = np.ones(len(self.N))
+        for other in sick:
+            if other is not disease:
+                share = share * (1 - sick[other] / np.maximum(self.N, 1))
+        l = self.level(disease, v)
+        X = self.X[disease]
+        picked = self.rng.binomial(healthy[disease], np.clip(coverage * share, 0, 1)[:, None, None])
+        # (v may be a vaccination state added since the start of the day)
+        X[:, :2, :picked.shape[2]] -= picked
+        X[:, :2, l] += picked.sum(axis=2)
+
+    # The doses of the day of a rollout, among the people healthy at the
+    # start of the day (as in vaccinate()) of its groups that are not yet
+    # at its vaccination value: drawn without replacement from all of them,
+    # or group after group with priority 'groups'. Without agents, those
+    # who were sick on their turn are not remembered and can get the
+    # vaccine later.
+    def rollout(self, rollout, healthy, sick):
+        '''Vaccinate the doses of the day of a rollout.'''
+        disease = rollout.disease
+        share = np.ones(len(self.N))
+        for other in sick:
+            if other is not disease:
+                share = share * (1 - sick[other] / np.maximum(self.N, 1))
+        l = self.level(disease, rollout.v)
+        X = self.X[disease]
+        free = self.rng.binomial(healthy[disease], np.clip(share, 0, 1)[:, None, None])
+        # (a campaign may have vaccinated some of them today)
+        free = np.minimum(free, X[:, :2, :free.shape[2]])
+        if l < free.shape[2]:
+            free[:, :, l] = 0
+        groups = list(range(len(self.N))) if rollout.groups is None else rollout.groups
+        picked = np.zeros(free.shape, dtype=np.int64)
+        doses = rollout.doses
+        for part in ([ [g] for g in groups ] if rollout.priority == 'groups' else [groups]):
+            n = min(doses, int(free[part].sum()))
+            if n > 0:
+                picked[part] = self.rng.multivariate_hypergeometric(free[part].ravel(), n).reshape(free[part].shape)
+            doses = doses - n
+        rollout.given = rollout.given + rollout.doses - doses
+        X[:, :2, :picked.shape[2]] -= picked
+        X[:, :2, l] += picked.sum(axis=2)
+
+    # Counts (E, I, S, Q) of every disease into the tally of the
+    # simulation; S is the sum of the vaccination states of everybody.
+    def count(self):
+        '''Count (E, I, S, Q) of every disease.'''
+        tally = self.sim.tally
+        for disease in self.X:
+            every = self.X[disease] + self.XQ[disease]
+            E = every[:, disease.I + 2:, :].sum(axis=(1, 2))
+            I = every[:, 2:disease.I + 2, :].sum(axis=(1, 2))
+            S = (every.sum(axis=1) * np.array(self.levels[disease])).sum(axis=1)
+            # in quarantine for this disease, or the others
+            free = self.X[disease][:, 2:disease.I + 2, :].sum(axis=(1, 2))
+            Q = self.XQ[disease].sum(axis=(1, 2)) + np.rint(free * self.quarantined(disease)).astype(np.int64)
+            tally.count[disease] = [int(E.sum()), int(I.sum()), float(S.sum()), int(Q.sum())]
+            if tally.byGroup:
+                tally.groups[disease] = { g: [int(E[g]), int(I[g]), float(S[g]), int(Q[g])]
+                                          for g in range(len(self.N)) if self.N[g] > 0 }
+
+    # Infection phase: the susceptible people of group g with vaccination v
+    # are infected by the free sources (counters 1 to I+E, not in
+    # quarantine for any disease) of every group h with probability
+    # 1 - prod_h (1 - m*cp[g][h]*s*v*t)^sources[h].
+    def infect(self):
+        '''New infections of the day.'''
+        sim = self.sim
+        cp = np.array(sim.cpList, dtype=np.float64)
+        sources = {}
+        for disease in self.X:
+            sources[disease] = self.X[disease][:, 2:disease.I + disease.E + 2, :].sum(axis=(1, 2)) * (1 - self.quarantined(disease))
+        infections = 0
+        for disease in self.X:
+            X = self.X[disease]
+            L = disease.I + disease.E + 1
+            v = np.array(self.levels[disease])
+            pair = np.minimum(sim.m * cp[:, :, None] * self.s * disease.t * v[None, None, :], 1.0)
+            with np.errstate(divide='ignore'):
+                escape = (np.log1p(-pair) * sources[disease][None, :, None]).sum(axis=1)
+            new = self.rng.binomial(X[:, 0, :], -np.expm1(escape))
+            X[:, 0, :] -= new
+            X[:, L + 1, :] += new
+            infections = infections + int(new.sum())
+        return(infections)
+
+    # The day loop, phase by phase the same as Simulation.run(), from day
+    # sim.day to the day before last (a day at a time if resumable, see
+    # Simulation.step()).
+    def run(self, last, resumable=False):
+        '''Run the simulation.'''
+        sim = self.sim
+        if sim.trace is not None:
+            raise ValueError('the aggregate engine has no agents to trace, use engine "numpy"')
+        self.grow(len(sim.cpList))
+        stats = sim.stats
+        (seeds, quarantines, campaigns, lastSeed) = sim.eventsByDay()
+        i = sim.day
+        while i < last:
+            sick = { disease: self.contagious(disease) for disease in self.X }
+            if stats is not None:
+                stats.begin(sim.rng)
+                stats.contagious(int(sum([ x.sum() for x in sick.values() ])))
+            # susceptible and immune people at the start of the day, for the campaigns
+            healthy = { disease: self.X[disease][:, :2, :].copy() for disease in self.X }
+            for disease in self.X:
+                self.update(disease)
+            if stats is not None:
+                stats.lap('update')
+            for (sdDisease, sdNum) in seeds.get(i, ()):
+                self.seed(sdDisease, sdNum)
+            for (quarDisease, quarLen) in quarantines.get(i, ()):
+                quarDisease.quarantine(quarLen)
+            for (campDisease, campCoverage, campVaccine) in campaigns.get(i, ()):
+                self.vaccinate(campDisease, campCoverage, campVaccine, healthy, sick)
+            for rollout in sim.eventRoll:
+                if rollout.due(i):
+                    self.rollout(rollout, healthy, sick)
+            if stats is not None:
+                stats.lap('events')
+            self.count()
+            sim.record()
+            if stats is not None:
+                stats.lap('record')
+            #Exit early if there are no infected people left.
+            if sim.getOut() and i > lastSeed and not resumable:
+                if stats is not None:
+                    stats.end(i, sim.rng)
+                sim.day = sim.steps
+                return(sim.history)
+            infections = self.infect()
+            if stats is not None:
+                stats.count('infections', infections)
+                stats.lap('infection')
+                stats.end(i, sim.rng)
+            i = i + 1
+            # the days of step() stop here until the next step()
+            if resumable:
+                sim.day = i
+                yield
+                i = sim.day
+        sim.day = i
+        return(sim.history)
+
+# Event-calendar model used by Simulation(engine="event"). The population
+# is the same list of Agent objects, but instead of decrementing every
+# counter every day, each transition is put on a calendar (a heap) for the
+# day it happens, when the agent is infected:
+#
+#   infection on day t      E on day t, counter I+E+1
+#   EI       on day t+E+1   enters I (and may enter quarantine for Q days)
+#   REC      on day t+E+I+1 rolls for immunity (R) or back to S
+#   QEXIT    on day a+Q     leaves the quarantine entered on day a
+#
+# Seedings, quarantine orders and campaigns are calendar events too, so a
+# day only costs the events due that day plus the contacts of the agents
+# that are infectious, and days with nobody infectious are skipped.
+class EventEngine():
+    # order of the events within a day, the same as the phases of run()
+    UPDATE, SEED, QUARANTINE, CAMPAIGN = 0, 1, 2, 3
+
+    def __init__(self, simulation):
+        self.sim = simulation
+        self.calendar = []          # heap of (day, phase, disease, seq, kind, agent, stamp)
+        self.seq = 0                # tie breaker, keeps the heap stable
+        self.index = {}             # position of each agent in sim.agents
+        self.stage = []             # per disease, per agent: -1 S, 0 R, 1 E, 2 I
+        self.end = []               # per disease, per agent: day of the REC event
+        self.stamp = []             # per disease, per agent: bumped when a seeding cancels pending events
+        self.qEnd = []              # per agent: last day of the quarantine
+        self.active = set()         # agents in E or I for some disease
+        self.quarantined = set()    # agents in quarantine
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<event engine {} pending events>'.format(len(self.calendar)))
+
+    # Puts an event on the calendar.
+    def schedule(self, day, phase, k, kind, j=None, stamp=None):
+        '''Add an event to the calendar.'''
+        self.seq = self.seq + 1
+        heappush(self.calendar, (day, phase, k, self.seq, kind, j, stamp))
+
+    # Agent j gets disease k with its REC event on day end: schedules its
+    # EI and REC events. It is in E, or already in I if its REC is at most
+    # I days away (agents seeded before run() can be).
+    def start(self, j, k, end, day):
+        '''Start disease k for agent j, recovering on day end.'''
+        disease = self.sim.disease[k]
+        self.stamp[k][j] = self.stamp[k][j] + 1
+        self.end[k][j] = end
+        self.active.add(j)
+        if end - day > disease.I:
+            self.move(j, k, 1)
+            self.schedule(end - disease.I, self.UPDATE, k, 'EI', j, self.stamp[k][j])
+        else:
+            self.move(j, k, 2)
+        self.schedule(end, self.UPDATE, k, 'REC', j, self.stamp[k][j])
+
+    # Sets the stage of agent j for disease k and moves it in the tally of
+    # the simulation (its counts and its carrier indexes), like
+    # Agent.recount() does for the object engine.
+    def move(self, j, k, stage):
+        '''Move agent j to stage for disease k.'''
+        old = self.stage[k][j]
+        self.stage[k][j] = stage
+        disease = self.sim.disease[k]
+        agent = self.sim.agents[j]
+        group = agent.group
+        # in or out of the carriers of the disease
+        if (old > 0) != (stage > 0):
+            self.sim.tally.carry(agent, disease, 1 if stage > 0 else -1)
+        for (slot, n) in [(old, -1), (stage, 1)]:
+            # stage 1 is counted in E, stage 2 in I (and Q, in quarantine)
+            if slot == 1:
+                self.sim.tally.add(disease, group, Tally.E, n)
+            elif slot == 2:
+                self.sim.tally.add(disease, group, Tally.I, n)
+                if j in self.quarantined:
+                    self.sim.tally.add(disease, group, Tally.Q, n)
+
+    # Agent j enters (n=1, because of disease) or leaves (n=-1) quarantine,
+    # in the tally too like Agent.recountQ().
+    def quarantine(self, j, n, disease=None):
+        '''Add agent j to the quarantined agents (n=1) or remove it (n=-1).'''
+        if n > 0:
+            self.quarantined.add(j)
+            self.sim.tally.quarantined[self.sim.agents[j]] = -1 if disease is None else disease.id
+        else:
+            self.quarantined.discard(j)
+            self.sim.tally.quarantined.pop(self.sim.agents[j], None)
+        for (k, disease) in enumerate(self.sim.disease):
+            if self.stage[k][j] == 2:
+                self.sim.tally.add(disease, self.sim.agents[j].group, Tally.Q, n)
+
+    # Reads the counters of the agents (as left by seed() or an earlier run)
+    # and fills the calendar, for a run starting on day start. A counter c
+    # means the REC event is on day start+c-1. The agents are already
+    # counted in the tally of the simulation.
+    def load(self, start=0):
+        '''Build the calendar from the agents and the events of the simulation.'''
+        sim = self.sim
+        N = len(sim.agents)
+        self.index = { id(a): j for (j, a) in enumerate(sim.agents) }
+        self.stage = [ [ a.disease[k] for a in sim.agents ] for k in range(len(sim.disease)) ]
+        self.end = [ [0] * N for disease in sim.disease ]
+        self.stamp = [ [0] * N for disease in sim.disease ]
+        self.qEnd = [ start + a.Qtime - 1 for a in sim.agents ]
+        for (j, a) in enumerate(sim.agents):
+            if a.Qtime > 0:
+                self.quarantined.add(j)
+                self.schedule(self.qEnd[j], self.UPDATE, len(sim.disease), 'QEXIT', j)
+            for (k, disease) in enumerate(sim.disease):
+                c = a.disease[k]
+                if c > 0:
+                    self.end[k][j] = start + c - 1
+                    self.stamp[k][j] = 1
+                    self.active.add(j)
+                    self.stage[k][j] = 1 if c > disease.I else 2
+                    if c > disease.I:
+                        self.schedule(self.end[k][j] - disease.I, self.UPDATE, k, 'EI', j, 1)
+                    self.schedule(self.end[k][j], self.UPDATE, k, 'REC', j, 1)
+        # the events of the days already simulated are over
+        for (day, disease, number) in sim.history2:
+            if day >= start:
+                self.schedule(day, self.SEED, disease.id, 'SEED', number)
+        for (day, disease, Q) in sim.eventQ:
+            if day >= start:
+                self.schedule(day, self.QUARANTINE, disease.id, 'QUARANTINE', Q)
+        for (day, disease, coverage, v) in sim.eventCamp:
+            if day >= start:
+                self.schedule(day, self.CAMPAIGN, disease.id, 'CAMPAIGN', (coverage, v))
+        for (x, rollout) in enumerate(sim.eventRoll):
+            for day in range(max(start, rollout.day), rollout.day + rollout.days):
+                self.schedule(day, self.CAMPAIGN, rollout.disease.id, 'ROLLOUT', x)
+
+    # Runs the events of one day, in the same order as the phases of run().
+    # sick are the positions of the agents infectious at the start of the
+    # day (only known on the days of campaigns and rollouts).
+    def events(self, day, sick):
+        '''Process the events due on day.'''
+        sim = self.sim
+        trace = sim.trace
+        while self.calendar and self.calendar[0][0] == day:
+            (day, phase, k, seq, kind, j, stamp) = heappop(self.calendar)
+            # events of a disease that was seeded again since they were scheduled
+            if stamp is not None and stamp != self.stamp[k][j]:
+                continue
+            if kind == 'EI':
+                disease = sim.disease[k]
+                self.move(j, k, 2)
+                # the agent may follow the quarantine, as in Agent.illness()
+                if disease.Q > 0 and self.qEnd[j] < day and rolldie(sim.agents[j].q, sim.rng):
+                    self.qEnd[j] = day + disease.Q
+                    self.quarantine(j, 1, disease)
+                    self.schedule(self.qEnd[j], self.UPDATE, len(sim.disease), 'QEXIT', j)
+                    if trace is not None:
+                        trace.add(day, TraceWriter.QUARANTINE, k, -1, j)
+            elif kind == 'REC':
+                # recovery (0) or back to susceptible (-1), as in Agent.update()
+                self.move(j, k, 0 if rolldie(sim.disease[k].r, sim.rng) else -1)
+                if not [ 1 for stage in self.stage if stage[j] > 0 ]:
+                    self.active.discard(j)
+                if trace is not None:
+                    trace.add(day, TraceWriter.RECOVERY if self.stage[k][j] == 0 else TraceWriter.SUSCEPTIBLE, k, -1, j)
+            elif kind == 'QEXIT':
+                if self.qEnd[j] == day:
+                    self.quarantine(j, -1)
+                    if trace is not None:
+                        trace.add(day, TraceWriter.RELEASE, -1, -1, j)
+            elif kind == 'SEED':
+                for a in sim.rng.sample(sim.agents, j):
+                    disease = sim.disease[k]
+                    self.start(self.index[id(a)], k, day + disease.I + disease.E + 1, day)
+                    if trace is not None:
+                        trace.add(day, TraceWriter.SEED, k, -1, self.index[id(a)])
+            elif kind == 'QUARANTINE':
+                sim.disease[k].quarantine(j)
+            elif kind == 'CAMPAIGN':
+                (coverage, v) = j
+                # as many healthy agents as rolldie would vaccinate, drawn at
+                # once (see Simulation.vaccinate()); vaccinate() keeps S up
+                # to date in the tally
+                free = len(sim.agents) - len(sick)
+                picked = pickFree(len(sim.agents), free, binomial(free, coverage, sim.rng), sick.__contains__, sim.rng)
+                sim.give(day, picked, sim.disease[k], v)
+            elif kind == 'ROLLOUT':
+                rollout = sim.eventRoll[j]
+                if rollout.queue is None:
+                    rollout.queue = sim.rolloutQueue(rollout)
+                sim.give(day, rollout.take(lambda x: x not in sick), rollout.disease, rollout.v)
+
+    # Infection phase: the infectious agents that are not in quarantine meet
+    # their contacts (Simulation.contacts()) and try each disease they were
+    # not infected with today on them.
+    def spread(self, day, strata):
+        '''Let the infectious agents infect their contacts.'''
+        sim = self.sim
+        stats = sim.stats
+        # an agent infected on day t can infect others from day t+1, when its REC is at most E+I days away
+        limit = [ day + disease.I + disease.E for disease in sim.disease ]
+        for j in list(self.active):
+            if self.qEnd[j] > day:
+                continue
+            # diseases agent j can pass on today
+            carried = [ k for k in range(len(limit)) if self.stage[k][j] > 0 and self.end[k][j] <= limit[k] ]
+            if not carried:
+                continue
+            for (cp, partners) in sim.contacts(sim.agents[j], strata):
+                if stats is not None:
+                    stats.count('contacts', len(partners))
+                for a in partners:
+                    j2 = self.index[id(a)]
+                    for k in carried:
+                        disease = sim.disease[k]
+                        if self.stage[k][j2] == -1 and rolldie(a.s*a.v[k]*disease.t*cp, sim.rng):
+                            self.start(j2, k, day + disease.I + disease.E + 1, day)
+                            if stats is not None:
+                                stats.count('infections')
+                            if sim.trace is not None:
+                                sim.trace.add(day, TraceWriter.INFECTION, k, j, j2)
+
+    # Writes the state back into the agents, as the counters and quarantine
+    # times run() would have left after day.
+    def store(self, day):
+        '''Write the state of the calendar back into the agents.'''
+        sim = self.sim
+        for (j, a) in enumerate(sim.agents):
+            a.Qtime = max(self.qEnd[j] - day, 0)
+            for (k, disease) in enumerate(sim.disease):
+                if self.stage[k][j] > 0:
+                    a.disease[k] = self.end[k][j] - day
+                else:
+                    a.disease[k] = self.stage[k][j]
+
+    # The day loop, from day sim.day to the day before last. While somebody
+    # is infectious every day is simulated; otherwise the loop jumps to the
+    # next event on the calendar, adding the same history tuple for the days
+    # in between. If resumable it runs a day at a time (see
+    # Simulation.step()), keeping the calendar from one day to the next.
+    def run(self, last, resumable=False):
+        '''Run the simulation.'''
+        sim = self.sim
+        self.load(sim.day)
+        strata = sim.strata()
+        lastSeed = max([x[0] for x in sim.history2], default=-1)
+        campDays = sim.vaccinationDays()
+        i = sim.day
+        while i < last:
+            if not self.active and not resumable:
+                # nothing happens before the next event
+                nextDay = min(self.calendar[0][0] if self.calendar else last, last)
+                if nextDay > i:
+                    # run() exits on the first such day after the last seeding
+                    if max(i, lastSeed + 1) < nextDay:
+                        sim.record(max(i, lastSeed + 1) - i + 1)
+                        self.store(max(i, lastSeed + 1))
+                        sim.day = sim.steps
+                        return(sim.history)
+                    sim.record(nextDay - i)
+                    i = nextDay
+                    continue
+            if sim.stats is not None:
+                sim.stats.begin(sim.rng)
+                sim.stats.contagious(len(self.active))
+            # campaigns only reach the agents healthy at the start of the day
+            sick = None
+            if i in campDays:
+                sick = set(self.active)
+            self.events(i, sick)
+            if sim.stats is not None:
+                sim.stats.lap('events')
+            sim.record()
+            if sim.stats is not None:
+                sim.stats.lap('record')
+            #Exit early if there are no infected agents left.
+            if sim.getOut() and i > lastSeed and not resumable:
+                if sim.stats is not None:
+                    sim.stats.end(i, sim.rng)
+                self.store(i)
+                sim.day = sim.steps
+                return(sim.history)
+            self.spread(i, strata)
+            if sim.stats is not None:
+                sim.stats.lap('infection')
+                sim.stats.end(i, sim.rng)
+            if sim.trace is not None:
+                sim.trace.spill()
+            i = i + 1
+            # the days of step() stop here until the next step(), or until
+            # stop() closes them and the agents get their state back
+            if resumable:
+                sim.day = i
+                try:
+                    yield
+                except GeneratorExit:
+                    self.store(i - 1)
+                    raise
+                # the quarantines that ended on the days slept in between
+                i = sim.day
+                while self.calendar and self.calendar[0][0] < i:
+                    self.events(self.calendar[0][0], None)
+        self.store(i - 1)
+        sim.day = i
+        return(sim.history)
+
+    # k contacts with infectious people from elsewhere on the day of the
+    # next step(), like Simulation.imports() but on the calendar: an agent
+    # infected starts the disease like an agent seeded before run() (its
+    # REC is E+I days later).
+    def imports(self, disease, k):
+        '''Infect the susceptible agents among k random contacts.'''
+        sim = self.sim
+        infected = 0
+        for j in sim.rng.choices(range(len(sim.agents)), k=k) if sim.agents else []:
+            a = sim.agents[j]
+            if self.stage[disease.id][j] == -1 and rolldie(a.s*a.v[disease.id]*disease.t, sim.rng):
+                self.start(j, disease.id, sim.day + disease.I + disease.E, sim.day)
+                infected = infected + 1
+                if sim.trace is not None:
+                    sim.trace.add(sim.day, TraceWriter.IMPORT, disease.id, -1, j)
+        return(infected)
+
+# Streaming estimate of the p-quantile of a series of numbers, with the P^2
+# algorithm (Jain and Chlamtac, 1985): five markers follow the minimum, the
+# p/2, p and (1+p)/2 quantiles and the maximum, and are moved by parabolic
+# interpolation as numbers arrive, so no number needs to be kept.
+class Quantile():
+    def __init__(self, p):
+        self.p = p
+        self.q = []                                 # heights of the markers
+        self.n = [0, 1, 2, 3, 4]                    # positions of the markers
+        self.want = [0, 2*p, 4*p, 2 + 2*p, 4]       # desired positions
+        self.dn = [0, p/2, p, (1 + p)/2, 1]         # increments of the desired positions
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<{} quantile {}>'.format(self.p, self.value()))
+
+    # Adds a number to the series.
+    def add(self, x):
+        '''Add x to the series.'''
+        q = self.q
+        # the first five numbers are the markers
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        # cell k of the new number, stretching the extreme markers if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k = k + 1
+        for i in range(k + 1, 5):
+            self.n[i] = self.n[i] + 1
+        for i in range(5):
+            self.want[i] = self.want[i] + self.dn[i]
+        # moves the middle markers that are a position or more off
+        n = self.n
+        for i in [1, 2, 3]:
+            d = self.want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                h = q[i] + d / (n[i + 1] - n[i - 1]) * ((n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                                                       + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                # linear interpolation when the parabola overshoots a neighbour
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = h
+                n[i] = n[i] + d
+
+    # The estimate (exact while there are at most five numbers).
+    def value(self):
+        '''Current estimate of the p-quantile.'''
+        if not self.q:
+            return(None)
+        if len(self.q) < 5 or self.n[4] == 4:
+            return(self.q[int(round(self.p * (len(self.q) - 1)))])
+        return(self.q[2])
+
+# Results of many runs of the same scenario (see Simulation.ensemble()). The
+# histories are folded in as they arrive: for each disease, day and count
+# (E, I, S, Q) a running sum for the mean and a Quantile per band. A run that
+# ended early keeps its last tuple for the days after its end. Only that
+# last tuple of each run is kept, not the histories.
+class Ensemble():
+    def __init__(self, quantiles=(0.05, 0.5, 0.95)):
+        self.quantiles = quantiles
+        self.runs = 0               # number of runs folded in
+        self.sums = {}              # per disease name, per day: sums of (E, I, S, Q)
+        self.bands = {}             # per disease name, per day: [Quantile of E, I, S, Q] per quantile
+        self.last = {}              # per disease name: last tuple of every run so far
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<ensemble of {} runs>'.format(self.runs))
+
+    # Adds a day to the disease, where every run so far is at its last tuple.
+    def extend(self, name):
+        '''Add one more day to the disease.'''
+        sums = [0, 0, 0.0, 0]
+        bands = [ [ Quantile(p) for x in range(4) ] for p in self.quantiles ]
+        for row in self.last[name]:
+            for x in range(4):
+                sums[x] = sums[x] + row[x]
+                for band in bands:
+                    band[x].add(row[x])
+        self.sums[name].append(sums)
+        self.bands[name].append(bands)
+
+    # Folds in the history of one run, {disease name: [(E, I, S, Q), ...]}.
+    def add(self, history):
+        '''Add the history of a run.'''
+        for (name, rows) in history.items():
+            if not rows:
+                continue
+            if name not in self.sums:
+                self.sums[name] = []
+                self.bands[name] = []
+                self.last[name] = []
+            while len(self.sums[name]) < len(rows):
+                self.extend(name)
+            for (day, sums) in enumerate(self.sums[name]):
+                row = rows[day] if day < len(rows) else rows[-1]
+                for x in range(4):
+                    sums[x] = sums[x] + row[x]
+                    for band in self.bands[name][day]:
+                        band[x].add(row[x])
+            self.last[name].append(rows[-1])
+        self.runs = self.runs + 1
+
+    # Mean (E, I, S, Q) tuple of each day.
+    def mean(self, name):
+        '''Daily mean of the runs for the disease.'''
+        n = len(self.last[name])
+        return([ tuple([ x / n for x in sums ]) for sums in self.sums[name] ])
+
+    # p-quantile (E, I, S, Q) tuple of each day, p one of self.quantiles.
+    def band(self, name, p):
+        '''Daily p-quantile of the runs for the disease.'''
+        j = self.quantiles.index(p)
+        return([ tuple([ q.value() for q in bands[j] ]) for bands in self.bands[name] ])
+
+# Worker side of Simulation.ensemble(). Each worker process unpickles the
+# scenario once; every replicate then starts from a fresh copy of it.
+_scenario = None
+
+def _ensembleStart(blob):
+    '''Keep the pickled scenario in the worker.'''
+    global _scenario
+    _scenario = blob
+
+def _ensembleRun(seed, blob=None):
+    '''Run one replicate of the scenario with its own random stream.'''
+    S = pickle.loads(blob if blob is not None else _scenario)
+    S.reseed(seed)
+    S.run()
+    return({ disease.name: S.history[disease] for disease in S.disease })
+
+# Outcomes of a run compared by Simulation.compare(): for each disease, the
+# peak of I, the burden (days spent in I by everybody) and the length of
+# the epidemic.
+def outcomes(sim):
+    '''Default outcomes of a run.'''
+    result = {}
+    for disease in sim.disease:
+        (E, I, S, Q) = sim.series(disease)
+        result[disease.name + '.peak'] = max(I, default=0)
+        result[disease.name + '.burden'] = sum(I)
+        result[disease.name + '.days'] = len(I)
+    return(result)
+
+# Paired results of Simulation.compare(): values[arm][outcome] is the list
+# of the outcome in each replicate, replicate r of every arm having run on
+# the same random stream. The differences with the first arm (the
+# reference) are taken replicate by replicate, which cancels most of the
+# noise the arms share.
+class Comparison():
+    def __init__(self, arms, level=0.95):
+        self.arms = list(arms)      # names of the arms, the first one is the reference
+        self.level = level          # confidence level of the intervals
+        self.values = { arm: {} for arm in self.arms }
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        lines = [ '{:12} {:20} {:>12} {:>26} {:>8}'.format('arm', 'outcome', 'mean', 'difference ({:.0%} CI)'.format(self.level), 'gain') ]
+        for arm in self.arms:
+            for name in sorted(self.values[arm]):
+                mean = sum(self.values[arm][name]) / len(self.values[arm][name])
+                if arm == self.arms[0]:
+                    lines.append('{:12} {:20} {:12.4g}'.format(arm, name, mean))
+                    continue
+                (d, low, high) = self.difference(arm, name)
+                lines.append('{:12} {:20} {:12.4g} {:10.4g} [{:.4g}, {:.4g}] {:8.3g}'.format(arm, name, mean, d, low, high, self.gain(arm, name)))
+        return('\n'.join(lines))
+
+    # Adds the outcomes of replicate runs of an arm.
+    def add(self, arm, values):
+        '''Add the outcomes of one run of arm.'''
+        for (name, x) in values.items():
+            self.values[arm].setdefault(name, []).append(x)
+
+    # Replicate by replicate differences arm - reference of an outcome.
+    def differences(self, arm, name):
+        '''Paired differences with the reference.'''
+        return([ a - b for (a, b) in zip(self.values[arm][name], self.values[self.arms[0]][name]) ])
+
+    # Mean paired difference with its confidence interval (Student t).
+    def difference(self, arm, name):
+        '''(mean, low, high) of the difference with the reference.'''
+        d = self.differences(arm, name)
+        n = len(d)
+        mean = sum(d) / n
+        if n < 2:
+            return(mean, float('-inf'), float('inf'))
+        sd = (sum([ (x - mean)**2 for x in d ]) / (n - 1))**0.5
+        half = tQuantile((1 + self.level) / 2, n - 1) * sd / n**0.5
+        return(mean, mean - half, mean + half)
+
+    # Variance of the difference of independent runs over that of the
+    # paired differences: how many times fewer runs the pairing needs for
+    # the same precision.
+    def gain(self, arm, name):
+        '''Variance reduction of the pairing.'''
+        def variance(x):
+            m = sum(x) / len(x)
+            return(sum([ (y - m)**2 for y in x ]) / max(len(x) - 1, 1))
+        paired = variance(self.differences(arm, name))
+        independent = variance(self.values[arm][name]) + variance(self.values[self.arms[0]][name])
+        if paired == 0:
+            return(float('inf') if independent > 0 else 1.0)
+        return(independent / paired)
+
+# p-quantile of Student's t with df degrees of freedom (Cornish-Fisher
+# expansion around the normal quantile, good to 3 digits from df=3).
+def tQuantile(p, df):
+    '''Quantile of the t distribution.'''
+    z = NormalDist().inv_cdf(p)
+    return(z + (z**3 + z) / (4 * df) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+           + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3))
+
+# Worker side of Simulation.compare(): the scenario and its arms are kept
+# in the worker, a task is one arm of one replicate.
+_arms = None
+
+def _compareStart(blob, arms, measure):
+    '''Keep the scenario and its arms in the worker.'''
+    global _scenario, _arms
+    _scenario = blob
+    _arms = (arms, measure)
+
+def _compareRun(task, blob=None, arms=None, measure=None):
+    '''Run one arm of one replicate and measure it.'''
+    (name, seed) = task
+    if blob is None:
+        (blob, (arms, measure)) = (_scenario, _arms)
+    S = pickle.loads(blob)
+    S.reseed(seed)
+    arms[name](S)
+    S.run()
+    return(measure(S))
+
+# History sink writing the (E, I, S, Q) counts of a simulation to a binary
+# file as they are recorded, instead of Simulation.history (see
+# Simulation(sink=...)). A sink has record(sim, n), flush() and close().
+#
+# The file is a header (magic, days, chunk, offset of the data, length of
+# the JSON, then the JSON list of the columns) followed by chunks of chunk
+# days. A column is E, I, S or Q of a disease, or of a group of a disease
+# when the tally is byGroup; inside a chunk each column is chunk doubles
+# in a row, so it can be read from a memory map without parsing (see
+# ColumnReader). Only the current chunk is kept in memory.
+class ColumnWriter():
+    MAGIC = b'DESHIST1'
+    HEADER = '<8sQQQQ'
+
+    def __init__(self, filename, chunk=1024):
+        self.filename = filename
+        self.chunk = chunk          # days per chunk
+        self.file = None            # opened by the first record()
+        self.columns = []           # [disease name, group or None, 'E', 'I', 'S' or 'Q']
+        self.groups = {}            # groups with columns, per disease
+        self.rows = []              # rows of the current chunk
+        self.done = 0               # days in the complete chunks
+        self.offset = 0             # position of the first chunk in the file
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<history file {}, {} days>'.format(self.filename, self.done + len(self.rows)))
+
+    # The open file is not pickled: a restored simulation reopens it and
+    # carries on writing after the days it had. The copies of fork(),
+    # ensemble() and compare() are made without the sink.
+    def __getstate__(self):
+        '''State of the writer, without the file.'''
+        self.flush()
+        state = self.__dict__.copy()
+        state['file'] = None
+        return(state)
+
+    def __setstate__(self, state):
+        '''Reopen the file of the writer.'''
+        self.__dict__.update(state)
+        if self.columns:
+            self.file = open(self.filename, 'r+b')
+
+    # Writes the header and lays out the columns, from the diseases and
+    # groups of the simulation at its first recorded day.
+    def open(self, sim):
+        '''Create the file for the simulation.'''
+        for disease in sim.disease:
+            self.groups[disease.name] = sorted(sim.tally.groups[disease]) if sim.tally.byGroup else []
+            for group in [None] + self.groups[disease.name]:
+                for kind in 'EISQ':
+                    self.columns.append([disease.name, group, kind])
+        meta = json.dumps(self.columns).encode()
+        # the data starts on a page boundary
+        size = struct.calcsize(self.HEADER) + len(meta)
+        self.offset = (size // mmap.PAGESIZE + 1) * mmap.PAGESIZE
+        self.file = open(self.filename, 'w+b')
+        self.file.write(struct.pack(self.HEADER, self.MAGIC, 0, self.chunk, self.offset, len(meta)) + meta)
+
+    # Adds the counts of today, n times, from the tally of the simulation.
+    def record(self, sim, n=1):
+        '''Append the current counts of sim for n days.'''
+        if self.file is None:
+            self.open(sim)
+        row = []
+        for disease in sim.disease:
+            row.extend(sim.tally.row(disease))
+            for group in self.groups[disease.name]:
+                row.extend(sim.tally.groups[disease].get(group, [0, 0, 0.0, 0]))
+        while n > 0:
+            k = min(n, self.chunk - len(self.rows))
+            self.rows.extend([row] * k)
+            n = n - k
+            if len(self.rows) == self.chunk:
+                self.write()
+                self.done = self.done + self.chunk
+                self.rows = []
+                self.days(self.done)
+
+    # Writes the current chunk (padded with zeros) at its place in the file.
+    def write(self):
+        '''Write the current chunk.'''
+        data = array('d')
+        for c in range(len(self.columns)):
+            data.extend([ row[c] for row in self.rows ])
+            data.extend([0.0] * (self.chunk - len(self.rows)))
+        self.file.seek(self.offset + self.done * len(self.columns) * 8)
+        self.file.write(data.tobytes())
+
+    # Sets the number of days in the header.
+    def days(self, n):
+        '''Write the number of days to the header.'''
+        self.file.seek(8)
+        self.file.write(struct.pack('<Q', n))
+
+    # Writes what was recorded so far, so that readers see every day (the
+    # current chunk is written again when it fills up).
+    def flush(self):
+        '''Make every recorded day readable.'''
+        if self.file is None:
+            return
+        if self.rows:
+            self.write()
+        self.days(self.done + len(self.rows))
+        self.file.flush()
+
+    def close(self):
+        '''Flush and close the file.'''
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# Reads a file written by ColumnWriter through a memory map. column()
+# copies the bytes of one column out of its chunks, nothing is parsed.
+class ColumnReader():
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        head = self.file.read(struct.calcsize(ColumnWriter.HEADER))
+        (magic, self.days, self.chunk, offset, n) = struct.unpack(ColumnWriter.HEADER, head)
+        if magic != ColumnWriter.MAGIC:
+            raise ValueError("{} is not a history file".format(filename))
+        self.columns = [ tuple(c) for c in json.loads(self.file.read(n).decode()) ]
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self.map)[offset:]
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<history of {} days, {} columns>'.format(self.days, len(self.columns)))
+
+    # The kind ('E', 'I', 'S' or 'Q') of the disease (a name), of its group
+    # if given, for every day.
+    def column(self, disease, kind, group=None):
+        '''One column of the history, as an array of doubles.'''
+        c = self.columns.index((disease, group, kind))
+        size = self.chunk * 8
+        result = array('d')
+        for day in range(0, self.days, self.chunk):
+            start = (day // self.chunk * len(self.columns) + c) * size
+            result.frombytes(self.data[start:start + min(self.chunk, self.days - day) * 8])
+        return(result)
+
+    def close(self):
+        '''Unmap and close the file.'''
+        self.data.release()
+        self.map.close()
+        self.file.close()
+
+# Event trace of a simulation (see Simulation(trace=...)): one record of
+# (day, kind, disease, source, target) per infection, recovery, loss of
+# immunity, quarantine entry and exit, vaccination, seeding and import.
+# source and target are positions in Simulation.agents (rows of the numpy
+# engine), source is -1 when there is none (and disease for a quarantine
+# exit); disease is Disease.id. The infections are the transmission tree.
+#
+# The records of a day are appended to a list, and moved in one go to
+# preallocated typed buffers of chunk records by spill() at the end of the
+# day (or flush()); the buffers are written to the file when full. The file is a header (magic, records, chunk)
+# followed by the chunks, each the chunk days, sources and targets (int32),
+# diseases (int16) and kinds (int8) in a row, read back by TraceReader.
+class TraceWriter():
+    MAGIC = b'DESTRACE'
+    HEADER = '<8sQQ'
+    INFECTION, RECOVERY, SUSCEPTIBLE, QUARANTINE, RELEASE, VACCINATION, SEED, IMPORT = range(8)
+    KINDS = ['infection', 'recovery', 'susceptible', 'quarantine', 'release', 'vaccination', 'seed', 'import']
+    FIELDS = [('day', 'i'), ('source', 'i'), ('target', 'i'), ('disease', 'h'), ('kind', 'b')]
+
+    def __init__(self, filename, chunk=65536):
+        if chunk < 8:
+            raise ValueError('a trace chunk holds at least 8 records, not {}'.format(chunk))
+        self.filename = filename
+        self.chunk = chunk - chunk % 8  # records per chunk (keeps the columns aligned)
+        self.file = open(filename, 'w+b')
+        self.file.write(struct.pack(self.HEADER, self.MAGIC, 0, self.chunk))
+        self.done = 0                   # records in the complete chunks
+        self.n = 0                      # records in the buffers
+        self.pending = []               # records not in the buffers yet
+        self.day = array('i', [0]) * self.chunk
+        self.source = array('i', [0]) * self.chunk
+        self.target = array('i', [0]) * self.chunk
+        self.disease = array('h', [0]) * self.chunk
+        self.kind = array('b', [0]) * self.chunk
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<trace file {}, {} records>'.format(self.filename, self.done + self.n))
+
+    # The open file is not pickled, as for ColumnWriter.
+    def __getstate__(self):
+        '''State of the writer, without the file.'''
+        self.flush()
+        state = self.__dict__.copy()
+        state['file'] = None
+        return(state)
+
+    def __setstate__(self, state):
+        '''Reopen the file of the writer.'''
+        self.__dict__.update(state)
+        self.file = open(self.filename, 'r+b')
+
+    # Adds one record.
+    def add(self, day, kind, disease, source, target):
+        '''Append a record.'''
+        self.pending.append((day, source, target, disease, kind))
+
+    # Moves the pending records to the buffers.
+    def spill(self):
+        '''Copy the pending records to the buffers.'''
+        if not self.pending:
+            return
+        columns = list(zip(*self.pending))
+        self.pending = []
+        start = 0
+        while start < len(columns[0]):
+            m = min(len(columns[0]) - start, self.chunk - self.n)
+            for ((name, code), values) in zip(self.FIELDS, columns):
+                getattr(self, name)[self.n:self.n + m] = array(code, values[start:start + m])
+            self.n = self.n + m
+            start = start + m
+            if self.n == self.chunk:
+                self.write()
+
+    # Adds one record per target (numpy arrays of the numpy engine), with
+    # the sources in sources, or -1.
+    def extend(self, day, kind, disease, targets, sources=None):
+        '''Append a record for every target.'''
+        if len(targets) == 0:
+            return
+        self.spill()
+        targets = np.asarray(targets, dtype=np.int32)
+        sources = np.full(len(targets), -1, dtype=np.int32) if sources is None else np.asarray(sources, dtype=np.int32)
+        start = 0
+        while start < len(targets):
+            m = min(len(targets) - start, self.chunk - self.n)
+            for (buffer, values) in [(self.day, np.full(m, day, dtype=np.int32)), (self.kind, np.full(m, kind, dtype=np.int8)),
+                                     (self.disease, np.full(m, disease, dtype=np.int16)),
+                                     (self.source, sources[start:start + m]), (self.target, targets[start:start + m])]:
+                memoryview(buffer)[self.n:self.n + m] = memoryview(values.tobytes()).cast(buffer.typecode)
+            self.n = self.n + m
+            start = start + m
+            if self.n == self.chunk:
+                self.write()
+
+    # Writes the buffers at the place of their chunk (past the records
+    # counted in the header they are ignored), and starts a new chunk when
+    # they are full.
+    def write(self):
+        '''Write the current chunk.'''
+        self.file.seek(struct.calcsize(self.HEADER) + self.done * 15)
+        for (name, code) in self.FIELDS:
+            self.file.write(getattr(self, name).tobytes())
+        if self.n == self.chunk:
+            self.done = self.done + self.chunk
+            self.n = 0
+        self.file.seek(8)
+        self.file.write(struct.pack('<Q', self.done + self.n))
+
+    # Writes what was recorded so far, so that readers see every record.
+    def flush(self):
+        '''Make every record readable.'''
+        if self.file is None:
+            return
+        self.spill()
+        if self.n:
+            self.write()
+        self.file.flush()
+
+    def close(self):
+        '''Flush and close the file.'''
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# Reads a file written by TraceWriter through a memory map.
+class TraceReader():
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        (magic, self.records, self.chunk) = struct.unpack(TraceWriter.HEADER, self.file.read(struct.calcsize(TraceWriter.HEADER)))
+        if magic != TraceWriter.MAGIC:
+            raise ValueError("{} is not a trace file".format(filename))
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self.map)[struct.calcsize(TraceWriter.HEADER):]
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<trace of {} records>'.format(self.records))
+
+    # One field ('day', 'source', 'target', 'disease' or 'kind') of every
+    # record.
+    def column(self, name):
+        '''One field of the trace, as an array.'''
+        offset = 0
+        for (field, code) in TraceWriter.FIELDS:
+            if field == name:
+                break
+            offset = offset + array(code).itemsize
+        else:
+            raise ValueError('unknown trace field {!r}'.format(name))
+        result = array(code)
+        for start in range(0, self.records, self.chunk):
+            begin = start * 15 + offset * self.chunk
+            result.frombytes(self.data[begin:begin + min(self.chunk, self.records - start) * result.itemsize])
+        return(result)
+
+    # The records, as (day, kind name, disease, source, target) tuples,
+    # only those of kind if given ('infection' gives the transmission tree).
+    def events(self, kind=None):
+        '''List of the records of the trace.'''
+        columns = [ self.column(name) for (name, code) in TraceWriter.FIELDS ]
+        return([ (day, TraceWriter.KINDS[k], disease, source, target)
+                 for (day, source, target, disease, k) in zip(*columns)
+                 if kind is None or TraceWriter.KINDS[k] == kind ])
+
+    def close(self):
+        '''Unmap and close the file.'''
+        self.data.release()
+        self.map.close()
+        self.file.close()
+
+# Raised by the callback of Simulation.run() to end the run.
+class StopRun(Exception):
+    pass
+
+# A vaccination rollout: from day, for days days, doses agents a day get
+# the vaccine (vaccination value v) against disease. The agents of groups
+# (every group if None) are offered a dose once each, in random order, or
+# group after group in the order of groups if priority is 'groups', or by
+# increasing priority(j) (j the position of the agent) if priority is a
+# function. Those in E or I at the start of their day lose their turn. The
+# queue is ordered on the first day, after that each day costs in
+# proportion to the doses given.
+class Rollout():
+    def __init__(self, day, disease, doses, v, days=1, groups=None, priority=None):
+        self.day = day              # first day
+        self.disease = disease      # disease of the vaccine
+        self.doses = doses          # doses a day
+        self.v = v                  # vaccination value given
+        self.days = days            # days of the rollout
+        self.groups = groups        # groups offered the vaccine (None: everybody)
+        self.priority = priority    # None, 'groups' or function of the position of an agent
+        self.queue = None           # positions of the agents in the order of their turn (list or array)
+        self.position = 0           # turns taken in the queue
+        self.given = 0              # doses given
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<rollout of {} from day {} for {} days: {} doses a day, {} given>'.format(
+            self.disease, self.day, self.days, self.doses, self.given))
+
+    def due(self, day):
+        '''True if doses are given on day.'''
+        return(self.day <= day < self.day + self.days)
+
+    # The agents of the queue whose turn comes today, up to doses of them
+    # that can get the vaccine: free(j) is True, or free[j] for a numpy
+    # queue (then an array of positions is returned).
+    def take(self, free):
+        '''Positions of the agents vaccinated today.'''
+        if isinstance(self.queue, list):
+            picked = []
+            while len(picked) < self.doses and self.position < len(self.queue):
+                j = self.queue[self.position]
+                self.position = self.position + 1
+                if free(j):
+                    picked.append(j)
+            self.given = self.given + len(picked)
+            return(picked)
+        picked = [self.queue[:0]]
+        count = 0
+        while count < self.doses and self.position < len(self.queue):
+            chunk = self.queue[self.position:self.position + self.doses - count]
+            self.position = self.position + len(chunk)
+            chunk = chunk[free[chunk]]
+            picked.append(chunk)
+            count = count + len(chunk)
+        self.given = self.given + count
+        return(np.concatenate(picked))
+
+# Simulation model. Each simulation runs for at most a certain
+# duration, D, expressed in terms of days.
+class Simulation():
+    '''Simulation should run for the D Days'''
+    def __init__(self, D=500, m=0.001, cpList= [[1.0]], engine='object', byGroup=False, seed=None, sink=None, workers=1, trace=None, crn=False):
+        self.steps = D		    # Maximum Number of Days 
+        self.agents = []            # List of agents in the simulation
+        self.disease = []           # Disease being simulated
+        self.history = {}           # History of (E, I, S, Q) tuples
+        self.eventQ = []            # information of the quarantine (time, disease, Q)
+        self.eventCamp = []         # information of the campaign (time, disease, coverage, v)
+        self.eventRoll = []         # vaccination rollouts, see rollout()
+        self.history2 = []          # information of the seed
+        self.cpList = cpList        # list of the cp
+        self.m = m                  # mixing coefficient
+        self.dName ={}              # Creating the dictionary ,containing the name of the disease ,
+                                    #which will help calling the disease in the simulate as well as in the configuration method
+        self.engine = engine        # 'object' (one Agent per person), 'numpy' (vectorized arrays) or 'event' (calendar of transitions)
+        self.arrays = None          # NumpyEngine (engine 'numpy') or AggregateEngine (engine 'aggregate') holding the population
+        self.tally = Tally(byGroup) # running (E, I, S, Q) counts, see Tally
+        self.rngSeed = seed         # seed of the random stream (None: seeded from the system)
+        self.rng = Random(seed)     # random stream of this simulation, same seed same run
+        self.groupHistory = {}      # History of {group: (E, I, S, Q)} dicts, when byGroup is True
+        self.day = 0                # next day to simulate (run() carries on from there)
+        self.sink = sink            # ColumnWriter taking the history instead of self.history (None: kept in memory)
+        self.tables = []            # (first agent, population table) of each loadPopulation(), for the vaccination
+        self.stats = None           # Profile of the run, see profile()
+        self.network = None         # contact Network (None: everybody can meet everybody), see connect()
+        self.workers = workers      # processes sharing the days of the numpy engine (1: none), see NumpyEngine.share()
+        self.recorded = {}          # (E, I, S, Q) of each disease on the last recorded day
+        self.trace = trace          # TraceWriter taking the events of the agents (None: not traced)
+        self.crn = crn              # keyed draws of the numpy engine (common random numbers), see compare()
+        self.callback = None        # function called on every recorded day of run(), see run()
+        self.session = None         # day loop paused between the days of step() (None: not stepping)
+        self.live = None            # EventEngine of those days (imports() go to its calendar)
+        # the numpy engine keeps the population as arrays instead of self.agents,
+        # the aggregate engine only counts people (both are kept in self.arrays)
+        if engine == 'numpy':
+            self.arrays = NumpyEngine(self)
+        elif engine == 'aggregate':
+            self.arrays = AggregateEngine(self)
+        elif engine not in ['object', 'event']:
+            raise ValueError("unknown engine {!r}, expected 'object', 'numpy', 'event' or 'aggregate'".format(engine))
+        if workers > 1 and engine != 'numpy':
+            raise ValueError('only engine="numpy" can run with workers')
+        if crn and engine != 'numpy':
+            raise ValueError('only engine="numpy" has common random numbers, compare() pairs the other engines by seed')
+
+    # Restarts the random stream of the simulation (and of the numpy engine)
+    # from seed.
+    def reseed(self, seed):
+        '''Use a new random stream, seeded with seed.'''
+        self.rngSeed = seed
+        self.rng = Random(seed) if self.stats is None else CountingRandom(seed)
+        if self.arrays is not None:
+            self.arrays.rng = np.random.default_rng(seed)
+        if self.engine == 'numpy':
+            self.arrays.base = None
+            if self.crn:
+                self.arrays.rekey(seed)
+
+    # Turns profiling of run() on (or off, with on=False). While on, every
+    # day records the wall time of its phases and the numbers of random
+    # draws, contacts and infections in self.stats (a Profile), calling
+    # callback(day, today) after each day. Off, run() only tests that
+    # self.stats is None a few times per day.
+    def profile(self, on=True, callback=None):
+        '''Profile the days of run().'''
+        state = self.rng.getstate()
+        if on:
+            self.stats = Profile(callback)
+            self.rng = CountingRandom()
+        else:
+            self.stats = None
+            self.rng = Random()
+        # the same stream, whether it is counted or not
+        self.rng.setstate(state)
+        return(self.stats)
+
+    # Runs the scenario (as set up so far, not run yet) runs times, each run
+    # on its own random stream streamSeed(seed, i), in a pool of worker
+    # processes (workers=None uses every core, workers=1 runs them here).
+    # The histories are folded into an Ensemble in the order of the runs,
+    # so the same seed gives the same result whatever the number of workers.
+    def ensemble(self, runs, workers=None, seed=None, quantiles=(0.05, 0.5, 0.95)):
+        '''Run many replicates of the simulation and summarize them.'''
+        if seed is None:
+            seed = self.rngSeed if self.rngSeed is not None else Random().getrandbits(64)
+        seeds = [ streamSeed(seed, i) for i in range(runs) ]
+        blob = self.detached()
+        result = Ensemble(quantiles)
+        if workers == 1:
+            for x in seeds:
+                result.add(_ensembleRun(x, blob))
+            return(result)
+        with ProcessPoolExecutor(workers, initializer=_ensembleStart, initargs=(blob,)) as pool:
+            for history in pool.map(_ensembleRun, seeds):
+                result.add(history)
+        return(result)
+
+    # Compares interventions on paired runs. arms is a dict of functions,
+    # each adding the interventions of its arm (campaign(), quarantine(),
+    # ...) to a copy of the scenario, the first arm being the reference
+    # (lambda S: None for no intervention). Replicate i runs every arm on
+    # the same random stream streamSeed(seed, i); with Simulation(crn=True)
+    # the numpy engine keys every draw (see NumpyEngine.uniform()), so the
+    # arms only differ where the interventions change what happens. Each
+    # run is measured with measure(sim), a dict of numbers (outcomes() by
+    # default). Returns a Comparison of the paired differences. Workers
+    # are used as in ensemble(); with more than one, the arms must be
+    # functions that can be sent to other processes (or the processes
+    # forked, as on Linux).
+    def compare(self, arms, runs=20, workers=None, seed=None, measure=outcomes, level=0.95):
+        '''Paired comparison of interventions.'''
+        if seed is None:
+            seed = self.rngSeed if self.rngSeed is not None else Random().getrandbits(64)
+        tasks = [ (name, streamSeed(seed, i)) for i in range(runs) for name in arms ]
+        blob = self.detached()
+        result = Comparison(arms, level)
+        if workers == 1:
+            for task in tasks:
+                result.add(task[0], _compareRun(task, blob, arms, measure))
+            return(result)
+        with ProcessPoolExecutor(workers, initializer=_compareStart, initargs=(blob, arms, measure)) as pool:
+            for (task, values) in zip(tasks, pool.map(_compareRun, tasks)):
+                result.add(task[0], values)
+        return(result)
+
+    # Saves the whole state of the simulation (agents, diseases and their
+    # counters, vaccination, quarantine times, the pending seedings,
+    # quarantines and campaigns, the history, the day and the random stream)
+    # as a compressed pickle. Returns it, and writes it to filename if given;
+    # restore() brings it back.
+    def checkpoint(self, filename=None):
+        '''Snapshot of the simulation, to be continued with restore().'''
+        blob = zlib.compress(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+        if filename is not None:
+            with open(filename, 'wb') as file:
+                file.write(blob)
+        return(blob)
+
+    # An independent copy of the simulation, to try another intervention
+    # from the same day: the days already simulated are not run again, and
+    # the history tuples of those days are shared with the copy. The copy
+    # has neither the sink nor the trace of this one: it keeps its history
+    # in memory (from this day on if this one has a sink).
+    def fork(self):
+        '''Copy of the simulation that can carry on on its own.'''
+        (sink, trace) = (self.sink, self.trace)
+        # the copy keeps its history in memory and writes no file of this one
+        self.sink = None
+        self.trace = None
+        # tuples of numbers are shared by deepcopy
+        copied = copy.deepcopy(self)
+        (self.sink, self.trace) = (sink, trace)
+        return(copied)
+
+    # The days of step() can't be pickled (checkpoint(), fork(), the copies
+    # and the workers of ensemble() and Metapopulation): they are stopped
+    # first, the next step() carries on from the same day.
+    def __getstate__(self):
+        '''State of the simulation, without the days of step().'''
+        self.stop()
+        return(self.__dict__)
+
+    # The simulation pickled without its sink and trace, for the copies
+    # run by ensemble() and compare(): they send their histories back
+    # instead of writing to the files of this one.
+    def detached(self):
+        '''Pickle of the simulation without its files.'''
+        (sink, trace) = (self.sink, self.trace)
+        self.sink = None
+        self.trace = None
+        blob = pickle.dumps(self)
+        (self.sink, self.trace) = (sink, trace)
+        return(blob)
+
+    #Populates method Simulates with a certain number of agents in each group
+    #having a list of contact probablities(cp), compliance probability q and
+    #susceptibility(S)
+    def populate(self, numGroup, group, cp):
+        '''Populate simulation with n agents of each group, with specified q and s.'''
+        # the numpy engine adds the whole group at once
+        if self.arrays is not None:
+            self.arrays.populate(numGroup, group)
+            return
+        #for i in the range of number of groups 
+        for i in range(numGroup):
+            # uses the join method to append the following information into the self.agent List 
+            self.join(Agent(group=group, cp=self.cpList[group]))
+
+
+    # Adds every agent of a population table (a file name or the dict of
+    # columns returned by readPopulation()) at once, with its own group,
+    # s, q and vaccination, instead of one populate() per group.
+    def loadPopulation(self, table):
+        '''Populate the simulation from a population table.'''
+        if self.engine == 'aggregate':
+            raise ValueError('the aggregate engine counts people, add them with populate()')
+        if isinstance(table, str):
+            table = readPopulation(table)
+        groups = table['group']
+        G = len(self.cpList)
+        for g in (set(groups) if np is None else np.unique(groups)):
+            if not 0 <= g < G:
+                raise ValueError("group {} has no contact probabilities in cpList".format(g))
+        if self.arrays is not None:
+            start = len(self.arrays.s)
+            self.arrays.load(table)
+        else:
+            start = len(self.agents)
+            D = len(self.disease)
+            states = array('i', [-1]) * D
+            unvaccinated = array('d', [1.0]) * D
+            count = {}
+            # plain numbers (tolist() works for arrays and numpy columns)
+            for (g, s, q) in zip(groups.tolist(), table['s'].tolist(), table['q'].tolist()):
+                g = int(g)
+                agent = Agent(g, self.cpList[g])
+                agent.s = s
+                agent.q = q
+                agent.disease = array('i', states)
+                agent.v = array('d', unvaccinated)
+                agent.tally = self.tally
+                agent.diseases = self.disease
+                self.agents.append(agent)
+                count[g] = count.get(g, 0) + 1
+            # every new agent is susceptible and unvaccinated
+            for disease in self.disease:
+                for (g, n) in count.items():
+                    self.tally.add(disease, g, Tally.S, float(n))
+        self.tables.append((start, table))
+        for disease in self.disease:
+            self.vaccinateTable(disease, start, table)
+
+    # Agents now meet their neighbours on the network (a Network, or the
+    # file of edges read by readNetwork()) instead of everybody with
+    # probability m. Agent j of the network is self.agents[j] (row j of
+    # the numpy engine), so the population must be complete.
+    def connect(self, network):
+        '''Use a contact network.'''
+        if self.engine == 'aggregate':
+            raise ValueError('the aggregate engine has no agents to connect, use engine "numpy"')
+        if isinstance(network, str):
+            network = readNetwork(network, len(self.agents) if self.arrays is None else len(self.arrays.s))
+        N = len(self.agents) if self.arrays is None else len(self.arrays.s)
+        if network.N != N:
+            raise ValueError('the network has {} agents, the simulation {}'.format(network.N, N))
+        self.network = network
+
+    # Sets the vaccination of the agents of a table for the disease from
+    # its v_<name of the disease> column, or its v column.
+    def vaccinateTable(self, disease, start, table):
+        '''Vaccinate the agents of a population table.'''
+        v = table.get('v_' + disease.name, table.get('v'))
+        if v is None:
+            return
+        if self.arrays is not None:
+            self.arrays.revaccinate(np.arange(start, start + len(v)), self.arrays.col[disease], v)
+            return
+        for (j, x) in enumerate(v.tolist()):
+            self.agents[start + j].vaccinate(x, disease)
+
+    # Add agent to current simulation.
+    def join(self, agent):
+        '''Add specified agent to current simulation.'''
+        # the numpy engine copies the agent into its arrays
+        if self.arrays is not None:
+            self.arrays.join(agent)
+            return
+        #Appends the following agent to the self.agent list 
+        self.agents.append(agent)
+        # the agent keeps the tally of the simulation up to date from now on
+        agent.tally = self.tally
+        agent.diseases = self.disease
+        # susceptible and unvaccinated for the diseases it doesn't know yet
+        missing = len(self.disease) - len(agent.disease)
+        if missing > 0:
+            agent.disease = agent.disease + array('i', [-1]) * missing
+            agent.v = agent.v + array('d', [1.0]) * missing
+        for disease in self.disease:
+            self.tally.add(disease, agent.group, Tally.S, agent.v[disease.id])
+            agent.recount(disease, -1)
+        if agent.Qtime > 0:
+            agent.recountQ(1)
+        
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the Object'''
+        #Returns the representation
+        return("< simulation lasting {} days >".format(self.steps))
+
+    # Fumction that removes the agent if there are no disease left in the 
+    # Simulation 
+    def getOut(self):
+       '''Removes the agent if there are no disease left in the Simulation '''
+       # for every disease in my self.disease list
+       for x in self.disease:
+           # somebody is still in E or I (from the running counts)
+           if self.tally.count[x][Tally.E] > 0 or self.tally.count[x][Tally.I] > 0:
+               return(False)
+       return(True)
+
+    # Appends today's (E, I, S, Q) tuple of every disease to the history,
+    # read from the tally (n times, for days where nothing changes).
+    def record(self, n=1):
+        '''Add the current counts to the history.'''
+        self.recorded = { disease: self.tally.row(disease) for disease in self.disease }
+        # long runs stream the history to a file instead
+        if self.sink is not None:
+            self.sink.record(self, n)
+        else:
+            for disease in self.disease:
+                self.history[disease].extend([self.tally.row(disease)] * n)
+                if self.tally.byGroup:
+                    self.groupHistory[disease].extend([self.tally.rowGroups(disease)] * n)
+        if self.callback is not None:
+            self.callback(self, n)
+
+    # Adds multiple disease in the simulation
+    # BY providing condition and vaccine state for each agentin the Simulation
+    # moreover creates the value of the dictionary for disease() having an empty list of the history which will be filled further in codes
+    def introduce(self, disease):
+        '''Add specified disease to current simulation.'''
+        # goes to the list of disease which was empty in the constructor
+        # (its id is its position in that list)
+        disease.id = len(self.disease)
+        self.disease.append(disease)
+        # dictionary with disease name having the key == disease.name will have the value of the information of disease
+        self.dName[disease.name] = disease
+        #For the particular disease the value of that disease is equal to empty list which will be filled further in the codes 
+        self.history[disease]=[]
+        self.groupHistory[disease]=[]
+        self.tally.introduce(disease)
+        # the numpy engine adds a column for the disease
+        if self.arrays is not None:
+            self.arrays.introduce(disease)
+        # for every agent in the self.agent List 
+        for agent in self.agents:
+            #Providing the condition
+            agent.disease.append(-1)
+            #Providing the vaccination state
+            agent.v.append(1.0)
+            self.tally.add(disease, agent.group, Tally.S, 1.0)
+        # the agents loaded from tables get the vaccination of their table
+        for (start, table) in self.tables:
+            self.vaccinateTable(disease, start, table)
+            
+
+    # Seed the simulation with k agents having the specified disease.
+    def seed(self, disease, k=1):
+        '''Seed a certain number of agents with a particular disease.'''
+        # the numpy engine seeds rows of its arrays
+        if self.arrays is not None:
+            return(self.arrays.seed(disease, k))
+        # Add the disease to the simulation.
+        # self.introduce(disease)
+        # update() runs before the infect() method, I+E+1,
+        #because my first step in run() is to update state
+        #Also, remember what disease you have
+        # for the agent in the sample(list, number of agent you want)
+        # (positions of the agents, for the trace)
+        picked = self.rng.sample(range(len(self.agents)), k)
+        seeded = [ self.agents[j] for j in picked ]
+        for agent in seeded:
+            #the counter of that disease --> infects by I+E+1
+            agent.expose(disease)
+        if self.trace is not None:
+            for j in picked:
+                self.trace.add(self.day, TraceWriter.SEED, disease.id, -1, j)
+        return(seeded)
+
+    # k contacts of random agents with infectious people from outside the
+    # simulation (travellers, see Metapopulation). Unlike seed(), only the
+    # susceptible agents met can be infected, with the chance of
+    # Agent.infect(). Returns the number of agents infected.
+    def imports(self, disease, k):
+        '''Infect the susceptible agents among k random contacts.'''
+        if self.arrays is not None:
+            return(self.arrays.imports(disease, k))
+        # between the days of step() the event engine holds the agents
+        if self.live is not None:
+            return(self.live.imports(disease, k))
+        infected = 0
+        for j in self.rng.choices(range(len(self.agents)), k=k) if self.agents else []:
+            agent = self.agents[j]
+            if agent.disease[disease.id] == -1 and rolldie(agent.s * agent.v[disease.id] * disease.t, self.rng):
+                agent.expose(disease)
+                infected = infected + 1
+                if self.trace is not None:
+                    self.trace.add(self.day, TraceWriter.IMPORT, disease.id, -1, j)
+        return(infected)
+
+    # add a tuple with the particular information of campaign 
+    def campaign(self, time, disease, coverage, v):
+        # adds to the list of eventCamp
+        self.eventCamp.append((time, disease, coverage, v))
+
+    # The seedings, quarantines and campaigns of each day, as {day: [(disease,
+    # ...), ...]} in the order they were added, and the last day of a
+    # seeding: the day loops look up the events of the day instead of going
+    # through all of them every day.
+    def eventsByDay(self):
+        '''Events of the simulation by day.'''
+        events = ({}, {}, {})
+        for (x, kind) in enumerate([self.history2, self.eventQ, self.eventCamp]):
+            for event in kind:
+                events[x].setdefault(event[0], []).append(event[1:])
+        return(events + (max([x[0] for x in self.history2], default=-1),))
+
+    # Days of the campaigns and rollouts, when run() needs to know who is
+    # healthy at the start of the day.
+    def vaccinationDays(self):
+        '''Days on which agents are vaccinated.'''
+        days = set([ x[0] for x in self.eventCamp ])
+        for rollout in self.eventRoll:
+            days.update(range(rollout.day, rollout.day + rollout.days))
+        return(days)
+
+    # Vaccinates with probability coverage each agent not in sick (the
+    # agents in E or I at the start of the day): the number of agents
+    # vaccinated is drawn first, then which ones (see pickFree()), so the
+    # cost is proportional to the doses rather than to the population.
+    def vaccinate(self, sick, disease, coverage, v):
+        '''Vaccinate healthy agents with probability coverage.'''
+        agents = self.agents
+        free = len(agents) - len(sick)
+        picked = pickFree(len(agents), free, binomial(free, coverage, self.rng), lambda j: agents[j] in sick, self.rng)
+        self.give(self.day, picked, disease, v)
+
+    # Vaccinates the agents at positions picked on day.
+    def give(self, day, picked, disease, v):
+        '''Vaccinate the agents at positions picked.'''
+        for j in picked:
+            self.agents[j].vaccinate(v, disease)
+        if self.trace is not None:
+            for j in picked:
+                self.trace.add(day, TraceWriter.VACCINATION, disease.id, -1, j)
+
+    # Vaccinates doses agents a day with v against disease, from day time
+    # for days days (see Rollout). groups are the groups offered the
+    # vaccine, priority None (random order), 'groups' (the groups in
+    # order) or a function of the position of an agent (the smallest
+    # first; not for the aggregate engine, which has no agents).
+    def rollout(self, time, disease, doses, v, days=1, groups=None, priority=None):
+        '''Schedule a vaccination rollout.'''
+        if doses < 0 or days < 1:
+            raise ValueError('a rollout needs doses >= 0 and days >= 1')
+        if groups is not None and [ g for g in groups if not 0 <= g < len(self.cpList) ]:
+            raise ValueError('the groups of a rollout are rows of cpList')
+        if priority == 'groups' and groups is None:
+            raise ValueError("priority 'groups' needs the list of groups")
+        if priority not in [None, 'groups'] and not callable(priority):
+            raise ValueError("priority is None, 'groups' or a function of the position of an agent")
+        if callable(priority) and self.engine == 'aggregate':
+            raise ValueError('the aggregate engine has no agents to order, use priority None or "groups"')
+        self.eventRoll.append(Rollout(time, disease, doses, v, days, groups, priority))
+        return(self.eventRoll[-1])
+
+    # Orders the agents offered a dose by a rollout (see Rollout): the
+    # agents of its groups shuffled, then sorted by priority if any (the
+    # sort is stable, so agents of the same priority stay shuffled).
+    def rolloutQueue(self, rollout):
+        '''Positions of the agents in the order of their turn.'''
+        agents = self.agents
+        if rollout.groups is None:
+            queue = list(range(len(agents)))
+        else:
+            groups = set(rollout.groups)
+            queue = [ j for j in range(len(agents)) if agents[j].group in groups ]
+        self.rng.shuffle(queue)
+        if rollout.priority == 'groups':
+            rank = { g: x for (x, g) in enumerate(rollout.groups) }
+            queue.sort(key=lambda j: rank[agents[j].group])
+        elif rollout.priority is not None:
+            queue.sort(key=rollout.priority)
+        return(queue)
+
+    # add a tuple with the quarantine information 
+    def quarantine(self, time, disease, Q):
+        # adds to the list of eventQ
+        self.eventQ.append((time, disease, Q))
+
+    # add a tuple with seeding information 
+    def seeding(self, time, disease, number):
+        # adds the tuple to history2 List
+        self.history2.append((time, disease, number))
+
+    # Traces what the daily update changed, from the indexes of the tally
+    # before it (carriers of each disease, quarantined agents): the agents
+    # that are no longer carriers recovered or went back to susceptible,
+    # and those who entered or left quarantine. index gives the position of
+    # each agent.
+    def traceUpdate(self, day, index, before):
+        '''Trace the changes of the daily update.'''
+        (carriers, quarantined) = before
+        for (disease, was) in zip(self.disease, carriers):
+            for j in sorted([ index[id(a)] for a in was.difference(self.tally.carriers[disease]) ]):
+                kind = TraceWriter.RECOVERY if self.agents[j].disease[disease.id] == 0 else TraceWriter.SUSCEPTIBLE
+                self.trace.add(day, kind, disease.id, -1, j)
+        now = self.tally.quarantined
+        for j in sorted([ index[id(a)] for a in now.keys() - quarantined ]):
+            # the disease recorded by illness(), whatever its counter is now
+            self.trace.add(day, TraceWriter.QUARANTINE, now[self.agents[j]], -1, j)
+        for j in sorted([ index[id(a)] for a in quarantined - now.keys() ]):
+            self.trace.add(day, TraceWriter.RELEASE, -1, -1, j)
+
+    # Splits the agents into strata sharing the same list of contact
+    # probabilities (with populate() that is one stratum per group), so the
+    # cp factor of Agent.infect() can be applied to the whole stratum.
+    def strata(self):
+        '''List of (cp, agents) pairs, one per contact probability list.'''
+        # on a network contacts() needs the position of each agent instead
+        if self.network is not None:
+            return({ id(agent): j for (j, agent) in enumerate(self.agents) })
+        buckets = {}
+        for agent in self.agents:
+            if id(agent.cp) not in buckets:
+                buckets[id(agent.cp)] = (agent.cp, [])
+            buckets[id(agent.cp)][1].append(agent)
+        return(list(buckets.values()))
+
+    # Draws the agents that agent meets today. Meeting each agent with
+    # probability m and then passing a disease with a chance scaled by cp is
+    # the same as meeting it with probability m*cp and passing the disease
+    # with the rest of cp (1 unless cp > 1). Within a stratum every member is
+    # met with the same probability p, so instead of rolling a die for each
+    # member the gap to the next member met is drawn from the geometric
+    # distribution: the cost is the number of contacts, not the stratum size.
+    # Returns a list of (rest of cp, agents met) pairs.
+    def contacts(self, agent, strata):
+        '''Sample the agents met today by agent.'''
+        # neighbours on the network, met with the weight of their layer,
+        # with all of their cp for the infection roll
+        if self.network is not None:
+            return([ (self.agents[k].cp[agent.group], [self.agents[k]])
+                     for k in self.network.meet(strata[id(agent)], self.rng) ])
+        met = []
+        for (cp, members) in strata:
+            # cp factor folded into the chance of meeting
+            fold = min(cp[agent.group], 1.0)
+            p = self.m * fold
+            if p <= 0:
+                continue
+            if p >= 1:
+                met.append((cp[agent.group] / fold, members))
+                continue
+            skip = log(1.0 - p)
+            partners = []
+            # index of the first member met, then jump from contact to contact
+            j = int(log(1.0 - self.rng.random()) / skip)
+            while j < len(members):
+                partners.append(members[j])
+                j = j + 1 + int(log(1.0 - self.rng.random()) / skip)
+            met.append((cp[agent.group] / fold, partners))
+        return(met)
+
+    # This is where the simulation actually happens. The run() method
+    # performs at most self.steps iterations, where each iteration
+    # updates the agents, counts how many are in E and I states,
+    # checks if there is an early termination (i.e., no contagious
+    # agents left) and then is vaccination campaigns or quarantines have been
+    # issued then they go into affect on the specified day. 
+    # run() carries on from self.day; with until, it stops before day until
+    # so that the simulation can be checkpointed or forked and run again.
+    # callback(sim, n), if given, is called every time n days are recorded
+    # (sim.recorded holds their counts); it can end the run by raising
+    # StopRun, which leaves the days recorded so far in the history (the
+    # state of the agents is then that of some point of the last day).
+    def run(self, until=None, callback=None):
+        '''Run the simulation.'''
+        self.stop()
+        self.callback = callback
+        try:
+            return(self.days(until))
+        except StopRun:
+            self.day = self.steps
+            return(self.history)
+        finally:
+            self.callback = None
+            # the days recorded so far can be read from the file
+            if self.sink is not None:
+                self.sink.flush()
+            if self.trace is not None:
+                self.trace.flush()
+
+    # Simulates the day self.day and pauses, so that something can be done
+    # between two days (Metapopulation imports the travellers of the other
+    # regions) without paying for the setup of run() again every day: the
+    # agents grouped by contact probabilities, the events by day, the
+    # calendar of the event engine and the workers of the numpy engine are
+    # kept for the next step(). Unlike run() it doesn't stop when nobody is
+    # left in E or I, imports() can start the epidemic again; the days
+    # skipped by moving self.day on are not simulated. Seedings, quarantines
+    # and campaigns added after the first step() only count after stop().
+    # Returns the counts of the day (self.recorded).
+    def step(self):
+        '''Simulate one day, resumable.'''
+        if self.session is None:
+            self.session = self.loop(self.steps, True)
+        try:
+            next(self.session)
+        except StopIteration:
+            self.session = None
+            self.live = None
+        return(self.recorded)
+
+    # Ends the days of step(): the event engine writes its state back into
+    # the agents, the numpy engine stops its workers and the files get the
+    # days recorded. run() does it first.
+    def stop(self):
+        '''End the days of step().'''
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+            self.live = None
+            if self.sink is not None:
+                self.sink.flush()
+            if self.trace is not None:
+                self.trace.flush()
+
+    # The day loop of run().
+    def days(self, until):
+        '''Simulate the days up to until.'''
+        last = self.steps if until is None else min(until, self.steps)
+        for day in self.loop(last):
+            pass
+        return(self.history)
+
+    # The days from self.day to the day before last, on the engine of the
+    # simulation. It's a generator pausing after every day if resumable
+    # (see step()), otherwise it runs them all at once.
+    def loop(self, last, resumable=False):
+        '''Simulate the days up to last.'''
+        # the numpy engine runs the same days on its arrays
+        if self.arrays is not None:
+            yield from self.arrays.run(last, resumable)
+            return
+        # the event engine runs the same model from a calendar of transitions
+        if self.engine == 'event':
+            engine = EventEngine(self)
+            if resumable:
+                self.live = engine
+            yield from engine.run(last, resumable)
+            return
+        # the agents grouped by contact probabilities, for contacts()
+        strata = self.strata()
+        stats = self.stats
+        campDays = self.vaccinationDays()
+        (seeds, quarantines, campaigns, lastSeed) = self.eventsByDay()
+        # positions of the agents, for the trace
+        trace = self.trace
+        if trace is not None:
+            index = { id(agent): j for (j, agent) in enumerate(self.agents) }
+        i = self.day
+        while i < last:
+            # the day being simulated (seedings are traced with it)
+            self.day = i
+            if stats is not None:
+                stats.begin(self.rng)
+            # Update each agent, counting how many are still exposed
+            # or infected.  Finding infected agents first avoids
+            # letting the infection infect a friend's friend in one
+            # pass.
+            # Creating for the people who are contagious with some disease
+            # (the tally keeps them as their counters change)
+            contagious = list(self.tally.contagious)
+            # the people who are not healthy at the start of the day
+            # (only needed by the campaigns and rollouts)
+            sick = None
+            if i in campDays:
+                sick = set(contagious)
+            if stats is not None:
+                stats.lap('partition')
+                stats.contagious(len(contagious))
+            # the carriers and quarantined agents before the update, to
+            # trace what it changed
+            if trace is not None:
+                before = ([ set(self.tally.carriers[k]) for k in self.disease ], set(self.tally.quarantined))
+            # for the contagious people updating there status 
+            for a in contagious:
+                # updated the status
+                a.update(self.rng)
+            if trace is not None:
+                self.traceUpdate(i, index, before)
+            if stats is not None:
+                stats.lap('update')
+            # the seedings, quarantines and campaigns of the day (see
+            # eventsByDay()): multiple quarantines and campaigns can be issued
+            for (sdDisease, sdNum) in seeds.get(i, ()):
+                #goes to the seed method having the parameter equal to disease in seed and num in seed
+                self.seed(sdDisease, sdNum)
+            for (quarDisease, quarLen) in quarantines.get(i, ()):
+                quarDisease.quarantine(quarLen)
+            #if there is a campaign,
+            #run the vaccine method for the list
+            #of healthy agents with the probability  of coverage
+            #Coverage here means  is the probability with which I vaccinate any given agent.
+            #So if a vaccination campaign is in force with coverage=0.8 and vaccine effectiveness v=0.2,
+            #I will consider each agent, flip a weighted coin that comes up True 80% of the time,
+            #and if its True this time, I will set that agents internal v value to be 1-0.2=0.8
+            for (campDisease, campCoverage, campVaccine) in campaigns.get(i, ()):
+                # as many healthy agents as rolldie would vaccinate,
+                # drawn at once (see vaccinate())
+                self.vaccinate(sick, campDisease, campCoverage, campVaccine)
+            # the rollouts give their doses of the day
+            for rollout in self.eventRoll:
+                if rollout.due(i):
+                    if rollout.queue is None:
+                        rollout.queue = self.rolloutQueue(rollout)
+                    self.give(i, rollout.take(lambda j: self.agents[j] not in sick), rollout.disease, rollout.v)
+            if stats is not None:
+                stats.lap('events')
+            # Update the history with exposed and infected counts.
+            # create a dict for each disease and add the number of E, I, Susceptible, and Quarantined
+            # note that S is represented by the sum of the vaccine values in the healthy list
+            # the agents keep the counts up to date as they change state (see Tally),
+            # so this is one tuple per disease
+            self.record()
+            if stats is not None:
+                stats.lap('record')
+            #Exit early if there are no infected agents left.
+            # if the guy terminate and the value of i is greater than maximum value of time step
+            # (the days of step() go on, imports() can bring new cases)
+            if self.getOut() and i > lastSeed and not resumable:
+                if stats is not None:
+                    stats.end(i, self.rng)
+                # nothing left to simulate
+                self.day = self.steps
+                #return my history list having the tuple(I,E,S,Q)
+                return(self.history)
+            # if it terminate early it won't get into the next step but if it doesn't then the following things.
+            # the infections of the day are the new E of every disease
+            if stats is not None:
+                exposed = sum([ self.tally.count[k][Tally.E] for k in self.disease ])
+            quarantined = self.tally.quarantined
+            # for agent in the contagious 
+            for a1 in contagious:
+                # agents in quarantine meet nobody, and the others only pass on
+                # the diseases they carry (not those caught today)
+                if a1 in quarantined:
+                    continue
+                carried = [ k for k in self.disease if 0 < a1.disease[k.id] <= k.I + k.E ]
+                if not carried:
+                    continue
+                # Let's see who a1 can infect. No need to check
+                # a2.state() here, as a2.infect() will check it for
+                # you. Note the use of the mixing parameter to
+                # determine if a1 and a2 have been in contact with
+                # each other today. Also, allow all diseases a chance to
+                # infect self
+                # only change in project 2 is to allow an agent to infect their neighbor with all disease
+                # they have (run through the dict of diseases)
+                # contacts() only returns the agents a1 came into contact with,
+                # the cp of their stratum is already part of the chance of meeting
+                for (cp, partners) in self.contacts(a1, strata):
+                    if stats is not None:
+                        stats.count('contacts', len(partners))
+                    for a2 in partners:
+                        # for disease a1 carries
+                        for k in carried:
+                            #agent k infects agent a1
+                            if a2.infect(a1, k, self.rng, cp) and trace is not None:
+                                trace.add(i, TraceWriter.INFECTION, k.id, index[id(a1)], index[id(a2)])
+            if stats is not None:
+                stats.count('infections', sum([ self.tally.count[k][Tally.E] for k in self.disease ]) - exposed)
+                stats.lap('infection')
+                stats.end(i, self.rng)
+            # the records of the day go to the buffers of the trace
+            if trace is not None:
+                trace.spill()
+            #incrementing the value of i by 1
+            i = i + 1
+            # the days of step() stop here until the next step()
+            if resumable:
+                self.day = i
+                yield
+                i = self.day
+        self.day = i
+        # Return the history of (E, I,S,Q) tuples.
+        return(self.history)
+
+    # The E, I, S and Q counts of every day, from self.history or from the
+    # file of the sink.
+    def series(self, disease):
+        '''Daily E, I, S and Q of the disease.'''
+        if self.sink is None:
+            if not self.history[disease]:
+                return([], [], [], [])
+            return([ list(x) for x in zip(*self.history[disease]) ])
+        self.sink.flush()
+        reader = ColumnReader(self.sink.filename)
+        result = [ reader.column(disease.name, kind) for kind in 'EISQ' ]
+        reader.close()
+        return(result)
+
+    # Plots the Graph. It is shown, or written to filename (the format
+    # comes from its extension: .png, .svg, ...). Histories longer than
+    # points days are drawn every few days.
+    def plot(self, disease, filename=None, points=2000):
+        '''Produce a pandemic curve for the simulation.'''
+        plt = pyplot()
+        (E, I, S, Q) = self.series(disease)
+        step = max(1, -(-len(E) // points))
+        days = range(0, len(E), step)
+        if step > 1:
+            (E, I, S, Q) = (E[::step], I[::step], S[::step], Q[::step])
+        #Title of the plot
+        plt.title(disease.name)
+        #x - axis label
+        plt.xlabel('Days')
+        #y - axis label 
+        plt.ylabel('N')
+        # plotting for the expose
+        plt.plot( days, E, 'g-', label='Exposed' )
+        # plotting for infected
+        plt.plot( days, I, 'r-', label='Infected' )
+        # plotting for susceptible
+        plt.plot( days, S, 'b-', label='Susceptible' )
+        # plotting for quarantine
+        plt.plot( days, Q, 'y-', label='Quarantine' )
+        # plt.legend will make a block of information at upper right conner of the graph providing information about the plotting pandamic curve
+        plt.legend(['Exposed','Infected','Susceptible','Quarantine'],loc = 'upper right')
+        # writes the graph to the file
+        if filename is not None:
+            plt.savefig(filename)
+            plt.close()
+            return(filename)
+        # show the graph
+        plt.show()
+    #Config method opens the file and reads the file in the simulation (like the Simulate top level Function)
+    # The file is compiled (see compileScenario(), through the cache
+    # directory cache if given) and its commands applied in order, telling
+    # what they do unless verbose is False. A 'new' line sets D, m and
+    # cpList (the engine cannot change).
+    def config(self, filename, verbose=True, cache=None):
+        '''Takes the input from the file and run accordingly'''
+        if not os.path.isfile(filename) and not os.access(filename, os.R_OK):
+            print ("Either {} is missing or is not readable".format(filename))
+        else:
+            scenario = compileScenario(filename, self.steps, self.m, self.cpList, self.engine, cache)
+            if scenario['engine'] != self.engine:
+                raise ValueError('{} is for engine {!r}, the simulation uses {!r}'.format(filename, scenario['engine'], self.engine))
+            (self.steps, self.m, self.cpList) = (scenario['D'], scenario['m'], scenario['cpList'])
+            for A in scenario['commands']:
+                applyCommand(self, A, print if verbose else None)
+
+
+
+# Many regions (cities, countries, ...), each a Simulation of its own with
+# its own agents, cpList and engine, coupled by travel: travel[(a, b)] is
+# the number of contacts a person of region a makes in region b per day.
+# Every day the contagious people (E and I, out of quarantine) of each
+# region make contacts elsewhere, in both directions: the travellers of a
+# meet people of b, and the travellers of b meet those of a and bring the
+# disease home. Each region then gets the Poisson number of such contacts
+# as imports() of every disease (by name) at the start of the next day.
+#
+# The regions run day by day in lockstep, in this process or spread over
+# worker processes (the main process exchanges the counts of the day and
+# the imports with them, which is the barrier of the day). A region with
+# no E or I, no imports and no event of its own that day sleeps: it is not
+# run, and records the days it slept when it wakes up.
+#
+# The regions run with Simulation.step(), which keeps their setup from
+# one day to the next. Without travel a region runs as on its own.
+class Metapopulation():
+    def __init__(self, regions, travel={}, seed=None):
+        self.regions = dict(regions)    # name: Simulation
+        self.travel = dict(travel)      # (from, to): contacts per person per day
+        self.rng = Random(seed)         # random stream of the imports
+        self.day = 0                    # next day to simulate
+        self.steps = max([ sim.steps for sim in self.regions.values() ], default=0)
+        self.idle = { name: 0 for name in self.regions }       # days slept since the last run of the region
+        self.recorded = { name: None for name in self.regions }  # {disease name: (E, I, S, Q)} of its last day
+        self.woken = 0                  # days run by some region, for the statistics
+        for (a, b) in self.travel:
+            if a not in self.regions or b not in self.regions:
+                raise ValueError('travel between unknown regions {!r} and {!r}'.format(a, b))
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<metapopulation of {} regions, {} travel routes, day {}>'.format(len(self.regions), len(self.travel), self.day))
+
+    # Number of people of a region.
+    def size(self, name):
+        '''Population of the region.'''
+        sim = self.regions[name]
+        if sim.engine == 'aggregate':
+            return(int(sim.arrays.N.sum()))
+        return(len(sim.agents) if sim.arrays is None else len(sim.arrays.s))
+
+    # Contacts with contagious travellers of every region, for tomorrow:
+    # {region: {disease name: contacts}}.
+    def pressure(self, sizes):
+        '''Imports of every region for the next day.'''
+        mean = { name: {} for name in self.regions }
+        for ((a, b), rate) in self.travel.items():
+            for (x, y) in [(a, b), (b, a)]:
+                if self.recorded[x] is None:
+                    continue
+                for (disease, (E, I, S, Q)) in self.recorded[x].items():
+                    sources = E + I - Q
+                    if sources <= 0:
+                        continue
+                    # the travellers of a meet people of b, the people of a
+                    # met by travellers of b bring it to b
+                    if x == a:
+                        contacts = rate * sources
+                    else:
+                        contacts = rate * sizes[y] * sources / max(sizes[x], 1)
+                    mean[y][disease] = mean[y].get(disease, 0.0) + contacts
+        imports = {}
+        for name in self.regions:
+            known = [ d.name for d in self.regions[name].disease ]
+            imports[name] = { disease: poisson(lam, self.rng) for (disease, lam) in sorted(mean[name].items()) if disease in known }
+            imports[name] = { disease: k for (disease, k) in imports[name].items() if k > 0 }
+        return(imports)
+
+    # A region sleeps today if nobody is in E or I, nobody arrives and no
+    # seeding, quarantine or campaign of its own falls on the day.
+    def asleep(self, name, day, imports):
+        '''Can the region skip the day?'''
+        sim = self.regions[name]
+        if imports or self.recorded[name] is None:
+            return(False)
+        if any([ E > 0 or I > 0 for (E, I, S, Q) in self.recorded[name].values() ]):
+            return(False)
+        events = sim.history2 + sim.eventQ + [ x[:2] for x in sim.eventCamp ]
+        return(all([ x[0] != day for x in events ]) and not [ 1 for x in sim.eventRoll if x.due(day) ])
+
+    # Runs every region up to the day before until (the longest D of the
+    # regions if None), with the regions spread over workers processes
+    # (1: all of them run here). The imports only depend on seed, so the
+    # run is the same whatever the number of workers. Returns the regions.
+    def run(self, until=None, workers=1):
+        '''Run the regions in lockstep.'''
+        last = self.steps if until is None else min(until, self.steps)
+        sizes = { name: self.size(name) for name in self.regions }
+        if workers == 1:
+            send = lambda day, work: { name: _regionDay(self.regions[name], day, *w) for (name, w) in work.items() }
+            self.days(last, sizes, send)
+            send(None, { name: (idle, {}) for (name, idle) in self.idle.items() })
+        else:
+            # regions of each worker, in turn
+            names = list(self.regions)
+            owner = { name: j % workers for (j, name) in enumerate(names) }
+            pipes = []
+            for j in range(workers):
+                (mine, theirs) = Pipe()
+                part = { name: self.regions[name] for name in names if owner[name] == j }
+                process = Process(target=_regionWorker, args=(theirs, pickle.dumps(part)))
+                process.start()
+                pipes.append((mine, process))
+            def send(day, work):
+                parts = [ {} for j in range(workers) ]
+                for (name, w) in work.items():
+                    parts[owner[name]][name] = w
+                busy = [ j for j in range(workers) if parts[j] or day is None ]
+                for j in busy:
+                    pipes[j][0].send((day, parts[j]))
+                result = {}
+                for j in busy:
+                    result.update(pipes[j][0].recv())
+                return(result)
+            try:
+                self.days(last, sizes, send)
+                # the regions come back with the days they slept
+                send(None, { name: (idle, {}) for (name, idle) in self.idle.items() })
+                for (pipe, process) in pipes:
+                    self.regions.update(pickle.loads(pipe.recv()))
+            finally:
+                for (pipe, process) in pipes:
+                    pipe.close()
+                    process.join()
+        self.idle = { name: 0 for name in self.regions }
+        return(self.regions)
+
+    # The days of run(): send(day, {region: (days slept, imports)}) runs the
+    # day in the regions awake and returns their counts of the day.
+    def days(self, last, sizes, send):
+        '''Run the days up to last.'''
+        while self.day < last:
+            imports = self.pressure(sizes)
+            work = {}
+            for name in self.regions:
+                if self.day >= self.regions[name].steps or self.asleep(name, self.day, imports[name]):
+                    self.idle[name] = self.idle[name] + 1
+                    continue
+                work[name] = (self.idle[name], imports[name])
+                self.idle[name] = 0
+            self.woken = self.woken + len(work)
+            self.recorded.update(send(self.day, work))
+            self.day = self.day + 1
+
+# One day of a region of a Metapopulation: the days it slept are recorded,
+# the imports are infected, and the day is run. A region that runs out of
+# E and I stays ready to be woken up by imports. day None only records the
+# days slept and ends the steps. Returns the counts of the day.
+def _regionDay(sim, day, idle, imports):
+    '''Run a day of a region.'''
+    idle = min(idle, sim.steps - sim.day)
+    if idle > 0:
+        sim.record(idle)
+        sim.day = sim.day + idle
+    if day is None:
+        sim.stop()
+        return(None)
+    diseases = { disease.name: disease for disease in sim.disease }
+    for (name, k) in imports.items():
+        sim.imports(diseases[name], k)
+    sim.step()
+    return({ disease.name: row for (disease, row) in sim.recorded.items() })
+
+def _regionWorker(conn, blob):
+    '''Run the regions of a worker process day by day.'''
+    regions = pickle.loads(blob)
+    while True:
+        (day, work) = conn.recv()
+        conn.send({ name: _regionDay(regions[name], day, *w) for (name, w) in work.items() })
+        if day is None:
+            conn.send(pickle.dumps(regions))
+            conn.close()
+            return
+
+# Writes the graph of every disease of every simulation to directory, as
+# <name>-<disease>.<format> (name is the position of the simulation in the
+# list, or its key when simulations is a dict). Returns the file names.
+def render(simulations, directory='.', format='png', points=2000):
+    '''Plot many simulations to files.'''
+    if not isinstance(simulations, dict):
+        simulations = { str(k): S for (k, S) in enumerate(simulations) }
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    files = []
+    for (name, S) in simulations.items():
+        for disease in S.disease:
+            filename = os.path.join(directory, '{}-{}.{}'.format(name, disease.name, format))
+            files.append(S.plot(disease, filename, points))
+    return(files)
+
+# Reads a population table, one row per agent: its group, s
+# (susceptibility), q (probability of following a quarantine) and,
+# optionally, its vaccination (as Agent.v: 1.0 not vaccinated, 0.0 fully
+# immune) in a v column for every disease or a v_<disease> column for one.
+# A .npy file (needs numpy) is memory-mapped: either a structured array
+# with those fields, or a 2-D array with the columns group, s, q and
+# optionally v. Any other file is CSV with a header line. Returns a dict
+# {column name: column}.
+def readPopulation(filename):
+    '''Columns of a population table.'''
+    if filename.endswith('.npy'):
+        if np is None:
+            raise ImportError('reading {} requires numpy to be installed'.format(filename))
+        data = np.load(filename, mmap_mode='r')
+        if data.dtype.names is not None:
+            table = { name: data[name] for name in data.dtype.names }
+        else:
+            table = { name: data[:, x] for (x, name) in enumerate(['group', 's', 'q', 'v'][:data.shape[1]]) }
+    else:
+        file = open(filename, 'r', newline='')
+        rows = csv.reader(file)
+        names = [ name.strip() for name in next(rows) ]
+        columns = [ array('d') for name in names ]
+        for row in rows:
+            if row:
+                for (column, x) in zip(columns, row):
+                    column.append(float(x))
+        file.close()
+        table = dict(zip(names, columns))
+        table['group'] = array('i', [ int(g) for g in table['group'] ])
+    for name in ['group', 's', 'q']:
+        if name not in table:
+            raise ValueError("population table {} has no {} column".format(filename, name))
+    return(table)
+
+# Brings back a simulation saved by Simulation.checkpoint(), from the
+# snapshot itself or from the file it was written to.
+def restore(checkpoint):
+    '''Simulation saved by Simulation.checkpoint().'''
+    if isinstance(checkpoint, str):
+        with open(checkpoint, 'rb') as file:
+            checkpoint = file.read()
+    return(pickle.loads(zlib.decompress(checkpoint)))
+
+# The commands of the configuration files and of the shells, with the
+# kind of each of their words: i an integer, n a number, l a list (cpList),
+# e an engine, f a file name, s the name of a new disease, d the name of a
+# disease already introduced and g a group (a row of cpList). The words
+# after ? can be left out, the last kind repeats if followed by *.
+COMMANDS = { 'new': 'inl?e', 'add': 'ig', 'population': 'f', 'network': 'f', 'disease': 's?niin',
+             'seed': 'idi', 'quarantine': 'idi', 'campaign': 'idnn', 'rollout': 'idini?g*', 'run': '', 'plot': 'd' }
+ENGINES = ['object', 'numpy', 'event', 'aggregate']
+
+# Parses the words of a command (see COMMANDS) into a list like
+# ['disease', 'flu', 0.5, 2, 7, 0.0]: the words are lowered (but the file
+# names) and the numbers read as Python literals, never run. The groups
+# are checked against cpList and the diseases against those introduced
+# (the names of diseases, updated by a disease command), if given.
+def parseCommand(words, cpList=None, diseases=None):
+    '''Command of the words of a line.'''
+    kind = words[0].lower()
+    if kind not in COMMANDS:
+        raise ValueError('unknown command {!r}'.format(words[0]))
+    spec = COMMANDS[kind].replace('?', '').replace('*', '')
+    needed = COMMANDS[kind].find('?') if '?' in COMMANDS[kind] else len(spec)
+    if len(words) - 1 < needed or (len(words) - 1 > len(spec) and not COMMANDS[kind].endswith('*')):
+        raise ValueError('{} takes {} words after it'.format(kind, needed if needed == len(spec) else '{} to {}'.format(needed, len(spec))))
+    command = [kind]
+    for (x, word) in enumerate(words[1:]):
+        c = spec[min(x, len(spec) - 1)]
+        if c == 'f':
+            command.append(os.path.abspath(word))
+            continue
+        word = word.lower()
+        if c == 's' or c == 'd':
+            if c == 'd' and diseases is not None and word not in diseases:
+                raise ValueError('no disease {!r} was introduced'.format(word))
+            command.append(word)
+            continue
+        if c == 'e':
+            if word not in ENGINES:
+                raise ValueError('the engine is one of {}'.format(', '.join(ENGINES)))
+            command.append(word)
+            continue
+        try:
+            if c == 'l':
+                value = ast.literal_eval(word)
+            elif c in 'ig':
+                value = int(word)
+            else:
+                value = float(word) if [ x for x in word if x in '.en' ] else int(word)
+        except (ValueError, SyntaxError):
+            raise ValueError('{!r} is not {}'.format(word, { 'l': 'a list', 'i': 'an integer', 'g': 'a group' }.get(c, 'a number')))
+        if c == 'l':
+            if not isinstance(value, list) or not value or [ row for row in value if not isinstance(row, list) or len(row) != len(value) ]:
+                raise ValueError('{!r} is not a square list of lists'.format(word))
+        elif not isfinite(value):
+            raise ValueError('{!r} is not a number'.format(word))
+        elif value < 0:
+            raise ValueError('{!r} is negative'.format(word))
+        elif c == 'g' and cpList is not None and value >= len(cpList):
+            raise ValueError('there is no group {} in cpList'.format(value))
+        command.append(value)
+    if kind == 'disease':
+        # the parameters left out keep their default (see Disease)
+        default = Disease()
+        command = command + [default.t, default.E, default.I, default.r][len(command) - 2:]
+        if diseases is not None:
+            diseases.add(command[1])
+    return(command)
+
+# Applies a command of parseCommand() to the simulation S, telling what it
+# did with output (nothing if None).
+def applyCommand(S, A, output=None):
+    '''Run a command on the simulation.'''
+    if A[0] == 'add':
+        S.populate(A[1], A[2], S.cpList[A[2]])
+        message = "{} agents of group {} having cp of {}".format(A[1], A[2], S.cpList[A[2]])
+    elif A[0] == 'population':
+        S.loadPopulation(A[1])
+        message = "{} agents loaded from {}".format(len(S.agents) if S.arrays is None else len(S.arrays.s), A[1])
+    elif A[0] == 'network':
+        S.connect(A[1])
+        message = "{} loaded from {}".format(S.network, A[1])
+    elif A[0] == 'disease':
+        S.introduce(Disease(name=A[1], t=A[2], E=A[3], I=A[4], r=A[5]))
+        message = "introduce {} with transitivity {}, {} exposed days, {} infected days and having recovery {}".format(*A[1:6])
+    elif A[0] == 'seed':
+        S.seeding(A[1], S.dName[A[2]], A[3])
+        message = "Day {} : seeding {} agents with {}".format(A[1], A[3], A[2])
+    elif A[0] == 'quarantine':
+        S.quarantine(A[1], S.dName[A[2]], A[3])
+        message = "{}: Establishing {} agents with {}".format(A[1], A[3], A[2])
+    elif A[0] == 'campaign':
+        S.campaign(A[1], S.dName[A[2]], A[3], A[4])
+        message = "Day {} : {}  of uninfected agents by {} will be vaccinated with effectiveness {}".format(A[1], A[3], A[2], A[4])
+    elif A[0] == 'rollout':
+        # the groups, if any, in the order of their turn
+        S.rollout(A[1], S.dName[A[2]], A[3], A[4], A[5], A[6:] or None, 'groups' if A[6:] else None)
+        message = "Day {} : {} doses a day against {} for {} days with effectiveness {}".format(A[1], A[3], A[2], A[5], A[4])
+    elif A[0] == 'run':
+        S.run()
+        message = "run the Simulation "
+    elif A[0] == 'plot':
+        S.plot(S.dName[A[1]])
+        message = "plot graph for {}".format(A[1])
+    else:
+        raise ValueError('{} is not a command of a simulation'.format(A[0]))
+    if output is not None:
+        output(message)
+
+# Reads a configuration file (the commands of Simulation.config()) into a
+# scenario: a dict of the Simulation arguments and the list of commands
+# of parseCommand(). A first line 'new D m cpList [engine]' sets the
+# Simulation arguments, else they are D, m, cpList and engine. Lines
+# starting with # are comments. A mistake raises a ValueError telling its
+# line.
+def readScenario(filename, D=500, m=0.001, cpList=[[1.0]], engine='object'):
+    '''Scenario of a configuration file.'''
+    scenario = { 'D': D, 'm': m, 'cpList': cpList, 'engine': engine, 'commands': [] }
+    diseases = set()
+    with open(filename, 'r') as file:
+        for (n, line) in enumerate(file):
+            words = line.split()
+            if not words or words[0].startswith('#'):
+                continue
+            try:
+                A = parseCommand(words, scenario['cpList'], diseases)
+                if A[0] == 'new' and scenario['commands']:
+                    raise ValueError('new comes before the other commands')
+            except ValueError as error:
+                raise ValueError('{}:{}: {}'.format(filename, n + 1, error))
+            if A[0] == 'new':
+                scenario.update(zip(['D', 'm', 'cpList', 'engine'], A[1:]))
+            # the table is read by every run (its digest makes the hash of
+            # the scenario change with the table)
+            elif A[0] in ['population', 'network']:
+                scenario['commands'].append(A + [fileDigest(A[1])])
+            else:
+                scenario['commands'].append(A)
+    return(scenario)
+
+# SHA-256 digest of the contents of a file.
+def fileDigest(filename):
+    '''Digest of a file.'''
+    with open(filename, 'rb') as file:
+        return(sha256(file.read()).hexdigest())
+
+# Size and time of modification of a file.
+def fileStamp(filename):
+    '''Stamp of a file, changing when it is written.'''
+    stat = os.stat(filename)
+    return((stat.st_size, stat.st_mtime_ns))
+
+# readScenario() through a cache of compiled scenarios (see Cache): a file
+# read before, with the same defaults and this version of the code, loads
+# in one unpickling, unless it or a table it uses was written since.
+# cache=None (the default) reads the file.
+def compileScenario(filename, D=500, m=0.001, cpList=[[1.0]], engine='object', cache=None):
+    '''Scenario of a configuration file, compiled once.'''
+    if cache is None:
+        return(readScenario(filename, D, m, cpList, engine))
+    key = sha256(json.dumps([os.path.abspath(filename), fileStamp(filename), D, m, cpList, engine, codeVersion()]).encode()).hexdigest()
+    store = Cache(cache)
+    found = store.get(key)
+    if found is not None:
+        (scenario, tables) = found
+        if all([ os.path.isfile(table) and fileStamp(table) == stamp for (table, stamp) in tables ]):
+            return(scenario)
+    scenario = readScenario(filename, D, m, cpList, engine)
+    tables = [ (A[1], fileStamp(A[1])) for A in scenario['commands'] if A[0] in ['population', 'network'] ]
+    store.put(key, (scenario, tables))
+    return(scenario)
+
+# Copy of the scenario with one parameter changed. The parameters are the
+# Simulation arguments ('D', 'm', 'cpList'), the disease parameters as
+# 'flu.t', 'flu.E', 'flu.I' and 'flu.r', and the events of a disease as
+# 'campaign.flu.day', 'campaign.flu.coverage', 'campaign.flu.v',
+# 'quarantine.flu.day', 'quarantine.flu.Q', 'seed.flu.day',
+# 'seed.flu.number', 'rollout.flu.day', 'rollout.flu.doses',
+# 'rollout.flu.v' and 'rollout.flu.days' (every event of that kind for
+# that disease).
+def setParameter(scenario, name, value):
+    '''Scenario with the parameter name set to value.'''
+    scenario = copy.deepcopy(scenario)
+    if name in ['D', 'm', 'cpList']:
+        scenario[name] = value
+        return(scenario)
+    words = name.lower().split('.')
+    # position of the parameter in the commands
+    fields = { 'disease': ['t', 'e', 'i', 'r'], 'campaign': ['day', None, 'coverage', 'v'],
+               'quarantine': ['day', None, 'q'], 'seed': ['day', None, 'number'],
+               'rollout': ['day', None, 'doses', 'v', 'days'] }
+    if len(words) == 2:
+        words = ['disease'] + words
+    if len(words) != 3 or words[0] not in fields or words[2] not in fields[words[0]]:
+        raise ValueError("unknown parameter {!r}".format(name))
+    (kind, disease, field) = words
+    found = False
+    for command in scenario['commands']:
+        if kind == 'disease' and command[0] == 'disease' and command[1] == disease:
+            command[fields[kind].index(field) + 2] = value
+            found = True
+        elif kind != 'disease' and command[0] == kind and command[2] == disease:
+            command[fields[kind].index(field) + 1] = value
+            found = True
+    if not found:
+        raise ValueError("parameter {!r} is not in the scenario".format(name))
+    return(scenario)
+
+# Hash of a scenario run with a seed by this version of the code: the key
+# of its result in the cache of sweep().
+def scenarioHash(scenario, seed):
+    '''Canonical hash of a scenario and seed.'''
+    text = json.dumps([scenario, seed, codeVersion()], sort_keys=True)
+    return(sha256(text.encode()).hexdigest())
+
+# Digest of this file: results and compiled scenarios of another version
+# of the code are not reused.
+def codeVersion():
+    '''Version of the code.'''
+    global _codeVersion
+    if _codeVersion is None:
+        _codeVersion = fileDigest(__file__)
+    return(_codeVersion)
+
+_codeVersion = None
+
+# Builds the Simulation of a scenario, with the seed, ready to run.
+def buildScenario(scenario, seed):
+    '''Simulation of the scenario.'''
+    S = Simulation(D=scenario['D'], m=scenario['m'], cpList=scenario['cpList'], engine=scenario['engine'], seed=seed)
+    # the runs are left to the caller
+    for A in scenario['commands']:
+        if A[0] not in ['run', 'plot']:
+            applyCommand(S, A)
+    return(S)
+
+# Builds, runs and returns the history of a scenario, as
+# {disease name: [(E, I, S, Q), ...]}.
+def runScenario(job):
+    '''Run the scenario with the seed.'''
+    S = buildScenario(*job)
+    S.run()
+    return({ disease.name: S.history[disease] for disease in S.disease })
+
+# Results of scenarios kept on disk, one file per scenarioHash(). When the
+# files take more than limit bytes, the least recently used are removed.
+class Cache():
+    def __init__(self, directory='sweep-cache', limit=256 * 2**20):
+        self.directory = directory
+        self.limit = limit
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<cache {}>'.format(self.directory))
+
+    # Result stored under key, None if there is none.
+    def get(self, key):
+        '''Result stored under key.'''
+        filename = os.path.join(self.directory, key)
+        # marks it as used for the eviction (it may be evicted meanwhile)
+        try:
+            os.utime(filename)
+            with open(filename, 'rb') as file:
+                return(pickle.loads(zlib.decompress(file.read())))
+        except FileNotFoundError:
+            return(None)
+
+    # Stores result under key, then evicts down to the limit.
+    def put(self, key, result):
+        '''Store result under key.'''
+        filename = os.path.join(self.directory, key)
+        # (worker processes may write the same cache)
+        part = '{}.{}.part'.format(filename, os.getpid())
+        with open(part, 'wb') as file:
+            file.write(zlib.compress(pickle.dumps(result, pickle.HIGHEST_PROTOCOL)))
+        os.replace(part, filename)
+        self.evict()
+
+    # Removes the least recently used results above the size limit.
+    def evict(self):
+        '''Keep the cache under its size limit.'''
+        files = []
+        for name in os.listdir(self.directory):
+            filename = os.path.join(self.directory, name)
+            # (another process may have removed it since)
+            if not name.endswith('.part') and os.path.isfile(filename):
+                try:
+                    files.append((os.path.getmtime(filename), os.path.getsize(filename), filename))
+                except FileNotFoundError:
+                    pass
+        size = sum([ x[1] for x in files ])
+        for (used, n, filename) in sorted(files):
+            if size <= self.limit:
+                break
+            if os.path.isfile(filename):
+                os.remove(filename)
+            size = size - n
+
+# Runs the scenario of a configuration file for every point of a grid,
+# {parameter: [values]} (see setParameter()), runs times per point with
+# the seeds streamSeed(seed, 0..runs-1). The runs are done in a pool of
+# worker processes (workers=1 runs them here), except those whose result
+# is already in the cache. Returns {point: [history of each run]}, a point
+# being a tuple of (parameter, value) pairs in the order of the grid.
+def sweep(filename, grid, runs=1, seed=0, workers=None, cache='sweep-cache', limit=256 * 2**20,
+          D=500, m=0.001, cpList=[[1.0]], engine='object'):
+    '''Run a configuration file over a grid of parameters.'''
+    base = readScenario(filename, D, m, cpList, engine)
+    store = Cache(cache, limit)
+    names = list(grid)
+    jobs = {}
+    results = {}
+    for values in product(*[ grid[name] for name in names ]):
+        point = tuple(zip(names, values))
+        scenario = base
+        for (name, value) in point:
+            scenario = setParameter(scenario, name, value)
+        results[point] = []
+        for i in range(runs):
+            job = (scenario, streamSeed(seed, i))
+            key = scenarioHash(*job)
+            results[point].append(key)
+            jobs[key] = job
+    # the results already in the cache
+    done = {}
+    for key in jobs:
+        result = store.get(key)
+        if result is not None:
+            done[key] = result
+    todo = [ key for key in jobs if key not in done ]
+    if workers == 1:
+        histories = map(runScenario, [ jobs[key] for key in todo ])
+        for (key, history) in zip(todo, histories):
+            store.put(key, history)
+            done[key] = history
+    elif todo:
+        with ProcessPoolExecutor(workers) as pool:
+            for (key, history) in zip(todo, pool.map(runScenario, [ jobs[key] for key in todo ])):
+                store.put(key, history)
+                done[key] = history
+    return({ point: [ done[key] for key in keys ] for (point, keys) in results.items() })
+
+# Distance of a run to a target, {series: [value of each day]}, where a
+# series is 'flu.E', 'flu.I', 'flu.S' or 'flu.Q' ('flu' is I): the root
+# mean square error over every day of every series of the target. As a
+# callback of run() it adds the error of each day as it is recorded, and
+# stops the run (StopRun) as soon as the error so far is already above
+# tolerance: the days still to come can only add to it.
+class Distance():
+    def __init__(self, target, tolerance=float('inf')):
+        self.series = []            # (disease name, position in the (E, I, S, Q) tuple, values)
+        for (name, values) in target.items():
+            words = name.split('.')
+            self.series.append((words[0], 'EISQ'.index(words[1]) if len(words) > 1 else Tally.I, list(values)))
+        self.days = max([ len(values) for (name, x, values) in self.series ], default=0)
+        self.total = sum([ len(values) for (name, x, values) in self.series ])
+        self.tolerance = tolerance
+        self.t = 0                  # days seen
+        self.error = 0.0            # sum of the squared errors so far
+        self.last = None            # counts of the last day seen
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        return('<distance {:.4g} after {} of {} days>'.format(self.value(), self.t, self.days))
+
+    def value(self):
+        '''Root mean square error so far.'''
+        return((self.error / max(self.total, 1))**0.5)
+
+    # Adds n days with the counts of sim.recorded.
+    def __call__(self, sim, n):
+        '''Add n recorded days of sim.'''
+        self.last = { disease.name: row for (disease, row) in sim.recorded.items() }
+        self.add(n)
+        if self.value() > self.tolerance:
+            raise StopRun()
+
+    def add(self, n):
+        '''Add the error of n days at the last counts.'''
+        for (name, x, values) in self.series:
+            y = self.last[name][x]
+            for t in range(self.t, min(self.t + n, len(values))):
+                self.error = self.error + (y - values[t])**2
+        self.t = self.t + n
+
+    # A run that ended before the last day of the target stays at its last
+    # counts (nobody in E or I).
+    def finish(self):
+        '''Add the days after the end of the run.'''
+        if self.last is not None and self.t < self.days:
+            self.add(self.days - self.t)
+        return(self.value())
+
+# Result of calibrate(): the accepted parameter sets, their distances, and
+# the days run and saved by the early rejections.
+class Calibration():
+    def __init__(self, names, tolerance):
+        self.names = list(names)    # parameters
+        self.tolerance = tolerance
+        self.accepted = []          # {parameter: value} of each accepted draw
+        self.distances = []         # distance of each accepted draw
+        self.draws = 0              # parameter sets tried
+        self.stopped = 0            # runs stopped early
+        self.days = 0               # days simulated
+        self.saved = 0              # days not simulated thanks to the early stops
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        lines = [ '{} accepted of {} draws (tolerance {}), {} stopped early, {:.0%} of the days saved'.format(
+            len(self.accepted), self.draws, self.tolerance, self.stopped, self.saved / max(self.days + self.saved, 1)) ]
+        for name in self.names:
+            (mean, sd, low, high) = self.summary(name)
+            lines.append('{:20} mean {:10.4g} sd {:10.4g} 90% [{:.4g}, {:.4g}]'.format(name, mean, sd, low, high))
+        return('\n'.join(lines))
+
+    # Mean, standard deviation and 5% and 95% quantiles of a parameter
+    # among the accepted draws.
+    def summary(self, name):
+        '''Posterior summary of a parameter.'''
+        values = sorted([ x[name] for x in self.accepted ])
+        n = len(values)
+        if n == 0:
+            return(float('nan'), float('nan'), float('nan'), float('nan'))
+        mean = sum(values) / n
+        sd = (sum([ (x - mean)**2 for x in values ]) / max(n - 1, 1))**0.5
+        return(mean, sd, values[int(0.05 * (n - 1))], values[int(0.95 * (n - 1))])
+
+# One particle of calibrate(): runs the scenario up to the end of the
+# target, stopping as soon as the distance is above the tolerance.
+# Returns (distance or None if stopped, days simulated).
+def _calibrateRun(job):
+    '''Run one particle of the calibration.'''
+    (scenario, seed, target, tolerance) = job
+    S = buildScenario(scenario, seed)
+    distance = Distance(target, tolerance)
+    S.steps = min(S.steps, distance.days)
+    S.run(callback=distance)
+    if distance.value() > tolerance:
+        return(None, distance.t)
+    d = distance.finish()
+    return(d if d <= tolerance else None, distance.t)
+
+# Draws a value of each parameter from its prior: (low, high) is uniform
+# (an integer between them if both are ints), and a function is called
+# with the Random generator.
+def drawPrior(priors, rng):
+    '''Parameter set drawn from the priors.'''
+    values = {}
+    for (name, prior) in priors.items():
+        if callable(prior):
+            values[name] = prior(rng)
+        elif isinstance(prior[0], int) and isinstance(prior[1], int):
+            values[name] = rng.randint(prior[0], prior[1])
+        else:
+            values[name] = rng.uniform(prior[0], prior[1])
+    return(values)
+
+# Calibrates the parameters of a configuration file (see sweep()) to a
+# target, {series: [value of each day]} (see Distance), by approximate
+# Bayesian computation with rejection: parameter sets are drawn from the
+# priors, {parameter: (low, high) or function(rng)}, and kept when their
+# run is within tolerance of the target, until accept sets are kept or
+# draws sets are tried. The runs are spread over workers processes, batch
+# at a time, and stopped as soon as they are too far from the target. The
+# accepted sets are the first ones in the order of the draws, so the
+# result does not depend on workers.
+def calibrate(filename, target, priors, tolerance, accept=100, draws=10000, seed=0, workers=None, batch=None,
+              D=500, m=0.001, cpList=[[1.0]], engine='object'):
+    '''Approximate Bayesian computation of the parameters of a configuration file.'''
+    base = readScenario(filename, D, m, cpList, engine)
+    # unknown parameters fail before any run
+    for name in priors:
+        setParameter(base, name, 0)
+    if batch is None:
+        batch = 4 * (workers or os.cpu_count() or 1)
+    rng = Random(seed)
+    result = Calibration(priors, tolerance)
+    full = min(base['D'], Distance(target).days)    # days of a run that is not stopped
+    pool = ProcessPoolExecutor(workers) if workers != 1 else None
+    try:
+        while len(result.accepted) < accept and result.draws < draws:
+            jobs = []
+            values = []
+            for i in range(result.draws, min(result.draws + batch, draws)):
+                x = drawPrior(priors, rng)
+                scenario = base
+                for (name, value) in x.items():
+                    scenario = setParameter(scenario, name, value)
+                values.append(x)
+                jobs.append((scenario, streamSeed(seed, i), target, tolerance))
+            runs = map(_calibrateRun, jobs) if pool is None else pool.map(_calibrateRun, jobs)
+            for (x, (d, days)) in zip(values, runs):
+                if len(result.accepted) >= accept:
+                    break
+                result.draws = result.draws + 1
+                result.days = result.days + days
+                if d is None:
+                    if days < full:
+                        result.stopped = result.stopped + 1
+                        result.saved = result.saved + full - days
+                else:
+                    result.accepted.append(x)
+                    result.distances.append(d)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return(result)
+
+# Creating a test Function to check the codes at a certain point 
+def test(engine='object'):
+    '''Test the codes'''
+    # Creating the Simulation object
+    S=Simulation(D=1000, engine=engine)
+    # setting the value of mixing probability
+    S.m = 0.001
+    # creating a contact probability List
+    S.cpList = [[.5,0,0],[0,.5,0],[0,1,1]]
+    # Calling the populate for every agent type with its cp
+    S.populate(100, 0, S.cpList[0])
+    S.populate(100, 1, S.cpList[1])
+    S.populate(100, 2, S.cpList[2])
+    # creating the disease object
+    x=Disease(name = "influenza",t=.95, E=2, I = 7, r=.2)
+    #creating another disease object
+    y=Disease(name = "mumps")
+    # calling the introduce method on x object of the disease
+    S.introduce(x)
+    #calling the introduce method on y object of the disease
+    S.introduce(y)
+    #calling the seeding method x
+    S.seeding(10,x, 1)
+    #calling the seeding method for y
+    S.seeding(40,y,1)
+    #Calling the campaign method
+    S.campaign(20, x, .9, .1)
+    #Calling the quarantine method 
+    S.quarantine(0, y, 5)
+    #calling my seed method on x
+    S.seed(x,1)
+    #calling my seed method on y 
+    S.seed(y,1)
+    #runs the codes 
+    S.run()
+    #plot for x 
+    S.plot(x)
+    # Plot for y 
+    S.plot(y)
+    #returns Simulation object
+    return(S)
+
+# Checks that the other engines behave like the object engine. Every
+# engine runs many times an epidemic that takes off (R0 about 3: about
+# 1.6 contacts a day, t=.3, contagious for 7 days) in three arms: no
+# intervention, a campaign before the peak and a quarantine of the ill.
+# The interventions change the epidemic a lot, so an engine that gets
+# transmission, vaccination or quarantine wrong stands out. For each arm
+# the mean peak of E+I, the mean number of days, the mean final S and the
+# mean number of agents infected are compared with the object engine. A
+# z score above 3 means they disagree.
+def testEngines(runs=40, engines=['numpy', 'event', 'aggregate']):
+    '''Compare the other engines with the object engine statistically.'''
+    stats = {}
+    for engine in ['object'] + engines:
+        stats[engine] = {}
+        for arm in ['none', 'campaign', 'quarantine']:
+            for r in range(runs):
+                S = Simulation(D=300, m=0.005, cpList=[[1,.3,.3],[.3,1,.3],[.3,.3,1]], engine=engine)
+                for group in range(3):
+                    S.populate(200, group, S.cpList[group])
+                x = Disease(name="influenza", t=.3, E=2, I=5, r=1.0)
+                S.introduce(x)
+                S.seed(x, 5)
+                if arm == 'campaign':
+                    S.campaign(5, x, .5, .1)
+                if arm == 'quarantine':
+                    S.quarantine(0, x, 5)
+                S.run()
+                h = S.history[x]
+                # every infected agent is counted E days in E
+                infected = sum([ e for (e, i, s, q) in h ]) / x.E
+                stats[engine].setdefault(arm, []).append((max([e + i for (e, i, s, q) in h]), len(h), h[-1][2], infected))
+    # mean and standard error of every statistic
+    def summary(values):
+        n = len(values)
+        mean = sum(values) / n
+        var = sum([(x - mean) ** 2 for x in values]) / max(n - 1, 1)
+        return(mean, (var / n) ** 0.5)
+    z = {}
+    for engine in engines:
+        for arm in stats['object']:
+            for j, label in enumerate(['peak E+I', 'days', 'final S', 'infected']):
+                (m1, e1) = summary([x[j] for x in stats['object'][arm]])
+                (m2, e2) = summary([x[j] for x in stats[engine][arm]])
+                z[(engine, arm, label)] = abs(m1 - m2) / max((e1 ** 2 + e2 ** 2) ** 0.5, 1e-9)
+                print("{} {}: object {:.1f} +- {:.1f}, {} {:.1f} +- {:.1f}, z = {:.2f}".format(arm, label, m1, e1, engine, m2, e2, z[(engine, arm, label)]))
+    return(z)
+
+# The commands of the shell that set up the simulation S (and plot), A
+# the words of the command (parseCommand() lowers them, but the file
+# names). Returns False if A is not one of them; a mistake in the command
+# is told with output, not raised.
+def shellCommand(S, A, output=print):
+    '''Run a set up command of the shell.'''
+    if A[0].lower() not in COMMANDS or A[0].lower() in ['new', 'run']:
+        return(False)
+    try:
+        applyCommand(S, parseCommand(A, S.cpList, set(S.dName)), output)
+    except ValueError as error:
+        output("Oh! No! ,It's an error, My Friend! {}".format(error))
+    return(True)
+
+# With background=True, the shell of Shell: runs go on in the background
+# while the shell takes commands.
+def Simulate(background=False):
+    '''Takes input from user and implement the codes  accordingly'''
+    if background:
+        return(asyncio.run(Shell().main()))
+    #setting a variable equal to True 
+    B = True
+    #This step will iterate till the user inputs "Bye"
+    #Thus creating a While loop
+    while B == True:
+        # Creating the input command 
+        C = input('Sim> ')
+        # if the user doesn't provide an command in the input 
+        if C == '' :
+            # it will print the following message 
+            print("Please, try again by putting a valid command , Thank you :)".format())
+        #Else it will work according to the commands provided by the user
+        else:
+            # Splitting whatever the user puts the input and converting the command in the lower case
+            #so that even if the user says "QUARANTINE" i can implement it as quarantine
+            # (parseCommand() lowers the rest, but the file names)
+            A = C.split()
+            A[0] = A[0].lower()
+            # if the first element in the list is new 
+            if A[0] == 'new':
+                # the days, mixing probability and contact probability list (see parseCommand())
+                (D, m, cpList) = parseCommand(A[:4])[1:4]
+                # Creating an object for simulation
+                S=Simulation(D, m=m, cpList=cpList)
+                # prints the format with the new days assigned 
+                print('Simulation with {} days, {} mixing probability, {} contact probability(cp) list'.format(A[1],A[2],A[3]))
+            # if the first element is run 
+            elif A[0] == 'run':
+                #runs the simuation 
+                S.run()
+                #String representation
+                print("{} the Simulation ".format(A[0]))
+                #print(a.history)( for debugging my codes)
+            # if the first element is bye 
+            elif A[0] == 'bye':
+                #String representation
+                print('Good{}! See you again . Have a great Day!, My Friend!'.format(A[0]))
+                # return the history of the simulation
+                return(S.history)              
+                
+                # set the value of B = False when the user says bye so that it stops iterating
+                B = False
+            # the commands that set up the simulation, see shellCommand()
+            # else ,if the user doesnt input a valid command 
+            elif not shellCommand(S, A):
+                # print this statement 
+                print("Oh! No! ,It's an error, My Friend!"
+                      "Please! print a valid command".format())
+
+
+        
+    
+
+# A simulation of the background shell (see Shell), run in a thread of
+# its own. The callback of run() (see Simulation.run()) sends a snapshot
+# of every day to the shell, waits there while the run is paused, and
+# ends it when it is cancelled.
+class Job():
+    def __init__(self, name, sim):
+        self.name = name            # name in the shell
+        self.sim = sim              # the Simulation
+        self.state = 'ready'        # ready, running, paused, done, cancelled or failed
+        self.first = sim.day        # first day of the run
+        self.days = 0               # days recorded by the run so far
+        self.watch = 1              # a snapshot is shown every watch days (0: none)
+        self.go = threading.Event() # cleared while paused
+        self.go.set()
+        self.stop = False           # set to cancel the run
+        self.error = None           # exception that ended the run, if it failed
+        self.done = None            # asyncio.Event set when the run ends
+        self.loop = None            # event loop of the shell
+        self.show = None            # function of the shell showing a snapshot
+
+    # Compute the Official String Representation of the object
+    def __repr__(self):
+        '''Official String Representation of the object'''
+        rows = '  '.join([ '{} {}'.format(disease, row) for (disease, row) in list(self.sim.recorded.items()) ])
+        return('{}: {} day {}/{} {}'.format(self.name, self.state, self.first + self.days, self.sim.steps, rows))
+
+    # Starts the run in a thread; show(job, day, rows) is then called in
+    # the loop of the shell for every snapshot, and show(job, None, None)
+    # when the run ends.
+    def start(self, loop, show):
+        '''Run the simulation in the background.'''
+        (self.loop, self.show) = (loop, show)
+        self.done = asyncio.Event()
+        self.state = 'running'
+        threading.Thread(target=self.work, daemon=True).start()
+
+    # The thread of the run.
+    def work(self):
+        '''Run the simulation.'''
+        try:
+            self.sim.run(callback=self.callback)
+            state = 'cancelled' if self.stop else 'done'
+        except Exception as error:
+            (state, self.error) = ('failed', error)
+        self.loop.call_soon_threadsafe(self.finish, state)
+
+    def finish(self, state):
+        '''End of the run (in the loop of the shell).'''
+        self.state = state
+        self.done.set()
+        self.show(self, None, None)
+
+    # Called by run() for every n days recorded, in the thread of the run.
+    def callback(self, sim, n):
+        '''Send the snapshot of the day, pause or cancel.'''
+        before = self.days
+        self.days = self.days + n
+        if self.watch > 0 and self.days // self.watch > before // self.watch:
+            rows = { disease: row for (disease, row) in sim.recorded.items() }
+            self.loop.call_soon_threadsafe(self.show, self, self.first + self.days - 1, rows)
+        self.go.wait()
+        if self.stop:
+            raise StopRun()
+
+    def pause(self):
+        '''Stop the run at the end of the day until resume().'''
+        self.go.clear()
+        self.state = 'paused'
+
+    def resume(self):
+        '''Carry on with a paused run.'''
+        self.go.set()
+        self.state = 'running'
+
+    def cancel(self):
+        '''End the run at the end of the day.'''
+        self.stop = True
+        self.go.set()
+
+# The shell of Simulate(background=True). It takes the commands of
+# Simulate(), but run starts the simulation in the background and the
+# shell keeps taking commands meanwhile; several named simulations can
+# run at once:
+#   new D m cpList [name]    new simulation, the current one (sim1, sim2, ... if no name)
+#   use name                 makes name the current simulation
+#   run [name]               starts the run, the (E, I, S, Q) of each day are shown as it goes
+#   watch [name] on|off|k    shows a snapshot every day, never, or every k days
+#   status                   day and last counts of every simulation
+#   history [name] [k]       the last k days (10) of the history so far
+#   pause, resume, cancel [name]
+#   wait [name]              waits for the end of the run
+#   bye                      cancels the runs and returns {name: history}
+# The other commands (add, disease, seed, ...) set up the current
+# simulation before its run.
+class Shell():
+    def __init__(self, output=print):
+        self.jobs = {}              # Job of each name
+        self.current = None         # name of the current simulation
+        self.output = output        # function printing the messages
+        self.loop = None            # running event loop
+
+    # Reads the commands from the keyboard (in a thread, so that the loop
+    # goes on meanwhile), or from the list commands. Returns the history of
+    # each simulation.
+    async def main(self, commands=None):
+        '''Take commands until bye.'''
+        self.loop = asyncio.get_running_loop()
+        lines = iter(commands) if commands is not None else None
+        while True:
+            if lines is None:
+                try:
+                    line = await self.loop.run_in_executor(None, input, 'Sim> ')
+                except EOFError:
+                    line = 'bye'
+            else:
+                line = next(lines, 'bye')
+            try:
+                if not await self.execute(line):
+                    break
+            except Exception as error:
+                self.output("Oh! No! ,It's an error, My Friend! {}".format(error))
+        return({ name: job.sim.history for (name, job) in self.jobs.items() })
+
+    # The job named in A[1] if there is one, else the current one.
+    def job(self, A):
+        '''Job a command is about.'''
+        name = A[1] if len(A) > 1 and A[1] in self.jobs else self.current
+        if name not in self.jobs:
+            raise ValueError('no simulation, start with new')
+        return(self.jobs[name])
+
+    # Shows a snapshot sent by a run (day None: the run is over).
+    def show(self, job, day, rows):
+        '''Print a snapshot of a run.'''
+        if day is None:
+            self.output('{}: {}{}'.format(job.name, job.state, ' ({})'.format(job.error) if job.error is not None else ''))
+        else:
+            self.output('{} day {}: {}'.format(job.name, day, '  '.join([ '{} {}'.format(d, row) for (d, row) in rows.items() ])))
+
+    # Runs one command, returns False on bye.
+    async def execute(self, line):
+        '''Run a command of the shell.'''
+        # only the command is lowered here, the file names keep their case
+        # (see parseCommand())
+        A = line.split()
+        if A:
+            A[0] = A[0].lower()
+        if not A:
+            self.output("Please, try again by putting a valid command , Thank you :)")
+        elif A[0] == 'new':
+            name = A[4] if len(A) > 4 else 'sim{}'.format(len(self.jobs) + 1)
+            if name in self.jobs and self.jobs[name].state in ['running', 'paused']:
+                raise ValueError('{} is running'.format(name))
+            (D, m, cpList) = parseCommand(A[:4])[1:4]
+            S = Simulation(D, m=m, cpList=cpList)
+            self.jobs[name] = Job(name, S)
+            self.current = name
+            self.output('{}: Simulation with {} days, {} mixing probability, {} contact probability(cp) list'.format(name, A[1], A[2], A[3]))
+        elif A[0] == 'use':
+            if A[1] not in self.jobs:
+                raise ValueError('no simulation {}'.format(A[1]))
+            self.current = A[1]
+        elif A[0] == 'run':
+            job = self.job(A)
+            if job.state != 'ready':
+                raise ValueError('{} is {}'.format(job.name, job.state))
+            job.start(self.loop, self.show)
+            self.output('{}: running'.format(job.name))
+        elif A[0] == 'watch':
+            job = self.job(A)
+            every = A[-1].lower() if len(A) > 1 and A[-1] not in self.jobs else 'on'
+            job.watch = { 'on': 1, 'off': 0 }[every] if every in ['on', 'off'] else int(every)
+        elif A[0] == 'status':
+            for job in self.jobs.values():
+                self.output(repr(job))
+        elif A[0] == 'history':
+            job = self.job(A)
+            k = int(A[-1]) if len(A) > 1 and A[-1].isdigit() else 10
+            for (disease, h) in list(job.sim.history.items()):
+                h = h[-k:]
+                for (x, row) in enumerate(h):
+                    self.output('{} {} day {}: {}'.format(job.name, disease, len(job.sim.history[disease]) - len(h) + x, row))
+        elif A[0] in ['pause', 'resume', 'cancel']:
+            job = self.job(A)
+            if job.state not in ['running', 'paused']:
+                raise ValueError('{} is {}'.format(job.name, job.state))
+            getattr(job, A[0])()
+        elif A[0] == 'wait':
+            job = self.job(A)
+            if job.done is not None:
+                await job.done.wait()
+        elif A[0] == 'bye':
+            for job in self.jobs.values():
+                if job.state in ['running', 'paused']:
+                    job.cancel()
+            for job in self.jobs.values():
+                if job.done is not None:
+                    await job.done.wait()
+            self.output('Goodbye! See you again . Have a great Day!, My Friend!')
+            return(False)
+        else:
+            job = self.job(['', self.current])
+            # the set up of a simulation is done before its run
+            if job.state != 'ready':
+                raise ValueError('{} is {}'.format(job.name, job.state))
+            if not shellCommand(job.sim, A, self.output):
+                self.output("Oh! No! ,It's an error, My Friend!"
+                            "Please! print a valid command")
+        return(True)
+
+# One configuration file of the command line (see main()): runs it runs
+# times (seeds streamSeed(seed, 0..runs-1)) and writes the histories to
+# the CSV file target, one line per run, disease and day. Returns the
+# file name and the error that stopped it (None if none).
+def batchRun(job):
+    '''Run a configuration file into a file of results.'''
+    (filename, target, runs, seed, D, m, cpList, engine, cache) = job
+    try:
+        scenario = compileScenario(filename, D, m, cpList, engine, cache)
+        part = target + '.part'
+        with open(part, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['run', 'disease', 'day', 'E', 'I', 'S', 'Q'])
+            for i in range(runs):
+                for (name, history) in runScenario((scenario, streamSeed(seed, i))).items():
+                    writer.writerows([ (i, name, day) + tuple(row) for (day, row) in enumerate(history) ])
+        os.replace(part, target)
+        return(filename, None)
+    except Exception as error:
+        return(filename, '{}: {}'.format(type(error).__name__, error))
+
+# Command line: runs configuration files in a pool of worker processes,
+# each into output/<path of the file>.csv (see batchRun()), without a
+# word unless --verbose; the files whose results are already there are
+# skipped, so an interrupted batch carries on where it stopped. Errors go
+# to stderr and make the exit status 1:
+#   python discrete_event.py scenarios/*.txt --runs 10 --workers 8 --output results
+def main(argv=None):
+    '''Command line of the batch runs.'''
+    parser = argparse.ArgumentParser(description='Run configuration files of discrete_event.Simulation.')
+    parser.add_argument('files', nargs='+', help='configuration files')
+    parser.add_argument('--output', default='results', help='directory of the results')
+    parser.add_argument('--runs', type=int, default=1, help='runs of each file')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the runs')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (1: none)')
+    parser.add_argument('--days', type=int, default=500, help='D of the files without a new line')
+    parser.add_argument('--mixing', type=float, default=0.001, help='m of the files without a new line')
+    parser.add_argument('--cplist', default='[[1.0]]', help='cpList of the files without a new line')
+    parser.add_argument('--engine', default='object', choices=ENGINES, help='engine of the files without a new line')
+    parser.add_argument('--cache', default=None, help='directory of the compiled files (none: compile every time)')
+    parser.add_argument('--force', action='store_true', help='run the files that already have results')
+    parser.add_argument('--verbose', action='store_true', help='tell when each file is done')
+    args = parser.parse_args(argv)
+    cpList = parseCommand(['new', '1', '0', args.cplist])[3]
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+    jobs = []
+    targets = {}
+    for filename in args.files:
+        # the results keep the path of the file (without its .. parts)
+        parts = [ x for x in os.path.normpath(os.path.relpath(filename)).split(os.sep) if x not in [os.pardir, ''] ]
+        target = os.path.join(args.output, *parts) + '.csv'
+        if target in targets:
+            parser.error('{} and {} would both write {}'.format(targets[target], filename, target))
+        targets[target] = filename
+        if not os.path.isdir(os.path.dirname(target)):
+            os.makedirs(os.path.dirname(target))
+        if args.force or not os.path.isfile(target):
+            jobs.append((filename, target, args.runs, args.seed, args.days, args.mixing, cpList, args.engine, args.cache))
+    failed = 0
+    pool = ProcessPoolExecutor(args.workers) if args.workers != 1 and len(jobs) > 1 else None
+    try:
+        for (filename, error) in (map(batchRun, jobs) if pool is None else pool.map(batchRun, jobs)):
+            if error is not None:
+                failed = failed + 1
+                print('{}: {}'.format(filename, error), file=sys.stderr)
+            elif args.verbose:
+                print('{}: done'.format(filename))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return(1 if failed else 0)
+
+if __name__ == '__main__':
+    sys.exit(main())